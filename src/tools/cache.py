@@ -0,0 +1,104 @@
+"""
+Shared on-disk cache location and JSON persistence helpers.
+
+All persistent caches and indexes (structure fingerprints, analysis results,
+etc.) live under one directory, `~/.vaspgo_cache` by default. Set the
+VASPGO_CACHE_DIR environment variable to move it, e.g. to a shared project
+directory on the cluster.
+"""
+
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, writers may race
+    fcntl = None
+
+
+def get_cache_dir(*parts: str) -> Path:
+    """
+    Get (and create) a directory inside the vaspgo cache.
+
+    Args:
+        *parts: Optional sub-directory components.
+
+    Returns:
+        Path: The cache directory.
+    """
+    base = Path(os.getenv("VASPGO_CACHE_DIR") or Path.home() / ".vaspgo_cache")
+    path = base.joinpath(*parts)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def load_json(path: str | Path, default: Any = None) -> Any:
+    """
+    Load a JSON file, returning `default` if it is missing or unreadable.
+
+    Args:
+        path: JSON file path.
+        default: Value returned when the file cannot be loaded.
+
+    Returns:
+        Any: Parsed JSON content or default.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def save_json(path: str | Path, data: Any) -> None:
+    """
+    Atomically write JSON data (write to a temp file, then rename).
+
+    Concurrent readers never see a partially written file.
+
+    Args:
+        path: Target JSON file path.
+        data: JSON-serializable data.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+@contextmanager
+def locked(path: str | Path) -> Iterator[None]:
+    """
+    Hold an exclusive advisory lock on `<path>.lock` for a read-modify-write.
+
+    Processes updating the same JSON file (e.g. tool pool workers) wrap the
+    load/modify/save sequence in this lock so none of them loses the others'
+    entries. Readers that only load the file do not need it.
+
+    Args:
+        path: File being updated.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path.with_name(path.name + ".lock"), "a") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+__all__ = ["get_cache_dir", "load_json", "save_json", "locked"]
@@ -0,0 +1,200 @@
+"""
+Packaged example catalogs with pre-rendered, typo-tolerant lookups.
+
+The INCAR and task example catalogs ship as JSON files inside the vaspgo
+package (vaspgo/data). `ExampleCatalog` loads such a file through
+`importlib.resources`, so it is found independently of the working
+directory, renders every entry to its final tool output once, and resolves
+keys case-insensitively and with typos tolerated: a lookup always returns
+the best matching entry instead of an error, so the model never needs an
+extra turn to retry with the right key. Resolved keys are memoized.
+
+`search` ranks all entries against a free-text request (BM25, optionally
+blended with local embeddings, see tools.retrieval) and returns the best few
+in one call, so the model does not have to guess keys.
+
+The file's mtime is checked on every lookup (one stat call); an edited
+catalog is reloaded and re-rendered without restarting the agents.
+"""
+
+import difflib
+import json
+import re
+import threading
+from importlib import resources
+from typing import Any, Callable, Optional
+
+from tools.retrieval import SearchIndex
+
+# Minimum fuzzy score for a token to count as matching a key token
+TOKEN_MATCH = 0.75
+
+
+def normalize_key(key: str) -> str:
+    """Lower-case a key and collapse everything but letters and digits to single spaces."""
+    return " ".join(re.findall(r"[a-z0-9]+", key.casefold()))
+
+
+def _key_score(query: str, key: str) -> float:
+    """Similarity of two normalized keys in [0, 1]."""
+    if not query or not key:
+        return 0.0
+    if query == key:
+        return 1.0
+    # Whole query contained in the key (e.g. "dos" in "density of states dos calculation")
+    padded_key, padded_query = f" {key} ", f" {query} "
+    if padded_query in padded_key:
+        return 0.9 + 0.05 * len(query) / len(key)
+    key_tokens = key.split()
+    token_scores = [
+        max(difflib.SequenceMatcher(None, token, other).ratio() for other in key_tokens)
+        for token in query.split()
+    ]
+    token_score = sum(s for s in token_scores if s >= TOKEN_MATCH) / len(token_scores)
+    whole_score = difflib.SequenceMatcher(None, query, key).ratio()
+    return 0.85 * max(token_score, whole_score) + 0.05 * whole_score
+
+
+class ExampleCatalog:
+    """
+    A JSON catalog (key -> entry) from package data with memoized, fuzzy lookups.
+
+    Args:
+        resource: File name relative to the package, e.g. "data/incar_examples.json".
+        render: Function rendering (key, entry) to the tool output string.
+        package: Package containing the resource.
+        describe: Function giving the search text of (key, entry); defaults to
+            the rendered entry.
+
+    Example:
+        catalog = ExampleCatalog("data/incar_examples.json", _format_incar_details)
+        catalog.lookup("band structure")
+        catalog.search("HSE band with SOC", k=2)
+    """
+
+    def __init__(
+        self,
+        resource: str,
+        render: Callable[[str, Any], str],
+        package: str = "vaspgo",
+        describe: Optional[Callable[[str, Any], str]] = None,
+    ):
+        self.path = resources.files(package).joinpath(*resource.split("/"))
+        self.render = render
+        self.describe = describe
+        self._lock = threading.Lock()
+        self._mtime: Optional[int] = None
+        self._data: dict[str, Any] = {}
+        self._rendered: dict[str, str] = {}
+        self._normalized: dict[str, str] = {}
+        self._resolved: dict[str, str] = {}
+        self._index: Optional[SearchIndex] = None
+
+    def _current_mtime(self) -> Optional[int]:
+        try:
+            return self.path.stat().st_mtime_ns
+        except (AttributeError, OSError):
+            # Not a plain file (e.g. zipped package): load once, never reload
+            return self._mtime if self._data else 0
+
+    def _refresh(self) -> None:
+        mtime = self._current_mtime()
+        if self._data and mtime == self._mtime:
+            return
+        with self._lock:
+            if self._data and mtime == self._mtime:
+                return
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            self._rendered = {key: self.render(key, entry) for key, entry in data.items()}
+            self._normalized = {normalize_key(key): key for key in data}
+            self._resolved = {}
+            self._index = None
+            self._data = data
+            self._mtime = mtime
+
+    @property
+    def data(self) -> dict[str, Any]:
+        """The raw catalog (reloaded if the file changed)."""
+        self._refresh()
+        return self._data
+
+    def keys(self) -> list[str]:
+        """Catalog keys in file order."""
+        return list(self.data)
+
+    def resolve(self, key: str) -> tuple[str, bool]:
+        """
+        Best matching catalog key for a (possibly misspelled) key.
+
+        Args:
+            key: Requested key.
+
+        Returns:
+            tuple: (catalog key, exact), where exact is True if the key matched
+            up to case and punctuation.
+        """
+        self._refresh()
+        if key in self._data:
+            return key, True
+        resolved = self._resolved.get(key)
+        if resolved is None:
+            query = normalize_key(key)
+            resolved = self._normalized.get(query)
+            if resolved is None:
+                resolved = max(self._data, key=lambda k: _key_score(query, normalize_key(k)))
+            self._resolved[key] = resolved
+        return resolved, normalize_key(resolved) == normalize_key(key)
+
+    def lookup(self, key: str) -> str:
+        """
+        Pre-rendered entry for a key; never fails.
+
+        An inexact match is prefixed with a note naming the matched key and
+        listing the other keys.
+
+        Args:
+            key: Requested key.
+
+        Returns:
+            str: Rendered catalog entry.
+        """
+        if not self.data:
+            return "The example catalog is empty."
+        resolved, exact = self.resolve(key)
+        rendered = self._rendered[resolved]
+        if exact:
+            return rendered
+        others = ", ".join(k for k in self._data if k != resolved)
+        return (f"Note: no category named '{key}'; showing the closest match '{resolved}'.\n"
+                f"Other categories: {others}\n\n{rendered}")
+
+    def search(self, query: str, k: int = 3) -> str:
+        """
+        Pre-rendered entries best matching a free-text request; never fails.
+
+        Args:
+            query: Free-text description of the calculation.
+            k: Maximum number of entries.
+
+        Returns:
+            str: The matching entries, best first. Falls back to the closest
+            key (as in `lookup`) if no entry shares a term with the query.
+        """
+        if not self.data:
+            return "The example catalog is empty."
+        index = self._index
+        if index is None:
+            with self._lock:
+                if self._index is None:
+                    describe = self.describe or self.render
+                    self._index = SearchIndex([f"{key}\n{describe(key, entry)}" for key, entry in self._data.items()])
+                index = self._index
+        keys = list(self._data)
+        hits = index.search(query, k=max(k, 1))
+        if not hits:
+            return self.lookup(query)
+        return "\n".join(f"[Match {rank}: '{keys[i]}', score {score:.2f}]\n{self._rendered[keys[i]]}"
+                         for rank, (i, score) in enumerate(hits, 1))
+
+
+__all__ = ["ExampleCatalog", "normalize_key"]
@@ -0,0 +1,457 @@
+"""
+K-point and ENCUT convergence scans submitted as one PBS job array.
+
+A scan is a ladder of calculations that differ only in the k-point density
+or the plane-wave cutoff:
+- `setup_convergence_scan` writes one directory per ladder point, a job
+  array script and a scan manifest (scan.json)
+- `submit_convergence_scan` submits the whole ladder with a single qsub
+  (PBS Pro job array, `#PBS -J`)
+- `check_convergence_scan` reads the finished energies, and once two
+  consecutive points agree within the tolerance it cancels the remaining
+  (more expensive) points and records the converged setting
+- `get_converged_settings` returns recorded settings, so later tasks on the
+  same material (same formula and space group) reuse them instead of
+  scanning again
+"""
+
+import os
+import re
+import shutil
+import time
+from typing import Annotated, Literal, Optional
+
+import numpy as np
+from autogen_core.tools import FunctionTool, StaticWorkbench
+
+from tools.cache import get_cache_dir, load_json, locked, save_json
+from tools.fingerprint import reduced_formula, structure_key
+from tools.incar_rules import set_incar_tag
+from tools.poscar_io import load_structure
+from tools.workspace import outcar_finished
+
+MANIFEST_NAME = "scan.json"
+SCRIPT_NAME = "scan_array.pbs"
+
+
+def _material_key(structure) -> str:
+    """Formula and space group (atom count dropped so supercells share settings)."""
+    formula, _, spacegroup = structure_key(structure).split("|")
+    return f"{formula}|{spacegroup}"
+
+
+def _settings_path():
+    return get_cache_dir() / "converged_settings.json"
+
+
+def _recorded_settings(structure) -> tuple[Optional[str], dict]:
+    """
+    Recorded settings of a material as (material key, settings).
+
+    The space group (spglib, seconds for large cells) is only determined when
+    settings are recorded for the reduced formula; otherwise (None, {}).
+    """
+    settings = load_json(_settings_path(), default={})
+    prefix = f"{reduced_formula(structure)}|"
+    if not any(key.startswith(prefix) for key in settings):
+        return None, {}
+    material = _material_key(structure)
+    return material, settings.get(material, {})
+
+
+def _parse_values(values: str) -> list[float]:
+    """Parse '300,400,500' or 'start:stop:step' (stop inclusive)."""
+    if ':' in values:
+        start, stop, step = (float(x) for x in values.split(':'))
+        return np.round(np.arange(start, stop + step / 2, step), 6).tolist()
+    return [float(x) for x in values.split(',') if x.strip()]
+
+
+def _final_energy(directory: str) -> Optional[float]:
+    """Final E0 (sigma -> 0) of a finished calculation, or None if not finished."""
+    outcar = os.path.join(directory, "OUTCAR")
+    oszicar = os.path.join(directory, "OSZICAR")
+    if not (os.path.isfile(outcar) and os.path.isfile(oszicar)):
+        return None
+    if not outcar_finished(outcar):
+        return None
+    energy = None
+    with open(oszicar, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            match = re.search(r"E0=\s*([-+0-9.Ee]+)", line)
+            if match:
+                energy = float(match.group(1))
+    return energy
+
+
+def setup_convergence_scan(
+    structure_path: Annotated[
+        str,
+        "Path to the structure file (POSCAR) to converge."
+    ],
+    incar_path: Annotated[
+        str,
+        "Path to the base INCAR (typically a high-precision SCF)."
+    ],
+    potcar_path: Annotated[
+        str,
+        "Path to the POTCAR for the structure."
+    ],
+    scan_dir: Annotated[
+        str,
+        "Directory in which the ladder of calculations is created."
+    ],
+    parameter: Annotated[
+        Literal["kpoints", "encut"],
+        "Setting to converge: 'kpoints' (k-point length density) or 'encut' (cutoff in eV)."
+    ],
+    values: Annotated[
+        str,
+        "Ladder values as list '300,400,500' or range 'start:stop:step' (stop inclusive). "
+        "K-point length densities for 'kpoints' (e.g. '10:60:5'), ENCUT in eV for 'encut' (e.g. '300:700:50')."
+    ],
+    kpoints_path: Annotated[
+        Optional[str],
+        "KPOINTS used by every point of an 'encut' scan. Required for parameter='encut'."
+    ] = None,
+    run_command: Annotated[
+        str,
+        "Command that runs VASP inside each point directory."
+    ] = "mpirun -np 32 vasp_std",
+    pbs_resources: Annotated[
+        str,
+        "PBS resource request for each array sub-job (the value of '#PBS -l')."
+    ] = "select=1:ncpus=32:mpiprocs=32"
+) -> str:
+    """
+    Create a k-point or ENCUT convergence ladder and its PBS job array script.
+
+    Each ladder point gets its own directory with POSCAR, POTCAR, INCAR and
+    KPOINTS. K-point densities that give the same mesh are merged, so no
+    calculation is duplicated. If converged settings are already recorded for
+    this material, they are reported and nothing is created.
+
+    Args:
+        structure_path: Structure to converge.
+        incar_path: Base INCAR.
+        potcar_path: POTCAR for the structure.
+        scan_dir: Output directory of the scan.
+        parameter: 'kpoints' or 'encut'.
+        values: Ladder values (list or range).
+        kpoints_path: Fixed KPOINTS for an ENCUT scan.
+        run_command: VASP run command.
+        pbs_resources: PBS resources per sub-job.
+
+    Returns:
+        str: Ladder table and the path of the job array script.
+
+    Example:
+        setup_convergence_scan("POSCAR", "INCAR", "POTCAR", "conv_k", "kpoints", "10:60:5")
+    """
+    structure = load_structure(structure_path)
+    material = _material_key(structure)
+    recorded = load_json(_settings_path(), default={}).get(material, {}).get(parameter)
+    if recorded:
+        return (f"Converged {parameter} already recorded for {material}: {recorded['value']:g} "
+                f"(tolerance {recorded['tolerance']} eV/atom, from {recorded['scan_dir']}). No scan created.")
+
+    if parameter == "encut" and not kpoints_path:
+        return "Error: kpoints_path is required for an ENCUT scan."
+    try:
+        ladder = sorted(set(_parse_values(values)))
+    except ValueError as e:
+        return f"Error: Invalid values '{values}'. {e}"
+    if len(ladder) < 2:
+        return "Error: A convergence scan needs at least two ladder values."
+
+    with open(incar_path, "r", encoding="utf-8") as f:
+        base_incar = f.read()
+
+    points = []
+    if parameter == "kpoints":
+        meshes = np.ceil(np.array(ladder)[:, None] / structure.abc[None, :]).astype(int)
+        seen = set()
+        for density, mesh in zip(ladder, meshes):
+            if tuple(mesh) in seen:
+                continue
+            seen.add(tuple(mesh))
+            points.append({"value": density, "mesh": mesh.tolist()})
+    else:
+        points = [{"value": encut} for encut in ladder]
+
+    os.makedirs(scan_dir, exist_ok=True)
+    for index, point in enumerate(points):
+        label = "x".join(map(str, point["mesh"])) if parameter == "kpoints" else f"{point['value']:g}"
+        point_dir = os.path.join(scan_dir, f"{index:02d}_{parameter}_{label}")
+        os.makedirs(point_dir, exist_ok=True)
+        structure.write(os.path.join(point_dir, "POSCAR"))
+        shutil.copyfile(potcar_path, os.path.join(point_dir, "POTCAR"))
+        if parameter == "kpoints":
+            incar = base_incar
+            with open(os.path.join(point_dir, "KPOINTS"), "w", encoding="utf-8") as f:
+                f.write(f"k-point length density {point['value']:g}\n0\nGamma\n"
+                        + " ".join(map(str, point["mesh"])) + "\n")
+        else:
+            incar = set_incar_tag(base_incar, "ENCUT", f"{point['value']:g}")
+            shutil.copyfile(kpoints_path, os.path.join(point_dir, "KPOINTS"))
+        with open(os.path.join(point_dir, "INCAR"), "w", encoding="utf-8") as f:
+            f.write(incar)
+        point.update(index=index, dir=os.path.basename(point_dir), status="pending", energy=None)
+
+    # One PBS Pro array job (-J): sub-job i runs ladder point i
+    dirs = " ".join(f'"{p["dir"]}"' for p in points)
+    script = (
+        "#!/bin/bash\n"
+        f"#PBS -N conv_{parameter}\n"
+        f"#PBS -l {pbs_resources}\n"
+        f"#PBS -J 0-{len(points) - 1}\n"
+        "cd \"$PBS_O_WORKDIR\" || exit 1\n"
+        f"POINTS=({dirs})\n"
+        "cd \"${POINTS[$PBS_ARRAY_INDEX]}\" || exit 1\n"
+        f"{run_command}\n"
+    )
+    with open(os.path.join(scan_dir, SCRIPT_NAME), "w", encoding="utf-8", newline="\n") as f:
+        f.write(script)
+
+    save_json(os.path.join(scan_dir, MANIFEST_NAME), {
+        "parameter": parameter,
+        "material": material,
+        "n_atoms": len(structure),
+        "job_id": None,
+        "converged": None,
+        "points": points,
+    })
+
+    rows = [f"  {p['index']:>3}  {p['dir']}" for p in points]
+    return (f"Convergence scan prepared in {scan_dir} ({parameter}, {len(points)} points)\n"
+            + "\n".join(rows) + "\n"
+            f"  Job array script: {os.path.join(scan_dir, SCRIPT_NAME)}")
+
+
+def submit_convergence_scan(
+    scan_dir: Annotated[
+        str,
+        "Scan directory created by setup_convergence_scan."
+    ],
+    queue: Annotated[
+        Optional[str],
+        "PBS queue name. None uses the default queue."
+    ] = None
+) -> str:
+    """
+    Submit all points of a convergence scan as one PBS job array.
+
+    Args:
+        scan_dir: Scan directory.
+        queue: Optional PBS queue.
+
+    Returns:
+        str: Array job ID or the qsub error.
+
+    Example:
+        submit_convergence_scan("conv_k", "workq")
+    """
+    from tools.pbs_tools import qsub
+
+    manifest_path = os.path.join(scan_dir, MANIFEST_NAME)
+    manifest = load_json(manifest_path)
+    if manifest is None:
+        return f"Error: No convergence scan found in {scan_dir}."
+
+    # qsub runs in the scan directory, which becomes $PBS_O_WORKDIR of the array
+    result = qsub(SCRIPT_NAME, queue=queue, cwd=os.path.abspath(scan_dir))
+    if result["status"] != "success":
+        return f"Error: {result['message']}"
+
+    manifest["job_id"] = result["job_id"]
+    for point in manifest["points"]:
+        point["status"] = "submitted"
+    save_json(manifest_path, manifest)
+    return f"Convergence scan submitted: array job {result['job_id']} ({len(manifest['points'])} points)"
+
+
+def check_convergence_scan(
+    scan_dir: Annotated[
+        str,
+        "Scan directory created by setup_convergence_scan."
+    ],
+    tolerance: Annotated[
+        float,
+        "Energy tolerance in eV/atom between consecutive ladder points."
+    ] = 1e-3,
+    cancel_remaining: Annotated[
+        bool,
+        "Cancel the not yet finished, more expensive points once converged."
+    ] = True
+) -> str:
+    """
+    Check a convergence scan, stop it early when converged and record the result.
+
+    The scan is converged at the first ladder point whose energy differs from
+    the next point by less than the tolerance (per atom). The remaining
+    sub-jobs of the array are then cancelled and the converged setting is
+    recorded for the material.
+
+    Args:
+        scan_dir: Scan directory.
+        tolerance: Convergence tolerance in eV/atom.
+        cancel_remaining: Whether to cancel unfinished points after convergence.
+
+    Returns:
+        str: Energy table and the convergence status.
+
+    Example:
+        check_convergence_scan("conv_k", 1e-3)
+    """
+    from tools.pbs_tools import qdel
+
+    manifest_path = os.path.join(scan_dir, MANIFEST_NAME)
+    manifest = load_json(manifest_path)
+    if manifest is None:
+        return f"Error: No convergence scan found in {scan_dir}."
+
+    points = manifest["points"]
+    n_atoms = manifest["n_atoms"]
+    for point in points:
+        if point["status"] in ("finished", "cancelled"):
+            continue
+        energy = _final_energy(os.path.join(scan_dir, point["dir"]))
+        if energy is not None:
+            point.update(status="finished", energy=energy)
+
+    converged = manifest["converged"]
+    if converged is None:
+        for current, following in zip(points, points[1:]):
+            if current["energy"] is None or following["energy"] is None:
+                continue
+            if abs(following["energy"] - current["energy"]) / n_atoms < tolerance:
+                converged = current["index"]
+                break
+
+    cancelled = []
+    if converged is not None and manifest["converged"] is None:
+        manifest["converged"] = converged
+        point = points[converged]
+
+        # Scans of other materials may record their settings concurrently
+        with locked(_settings_path()):
+            settings = load_json(_settings_path(), default={})
+            settings.setdefault(manifest["material"], {})[manifest["parameter"]] = {
+                "value": point["value"],
+                "mesh": point.get("mesh"),
+                "tolerance": tolerance,
+                "scan_dir": os.path.abspath(scan_dir),
+                "recorded_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            }
+            save_json(_settings_path(), settings)
+
+        job_id = manifest.get("job_id")
+        remaining = [p for p in points if p["index"] > converged + 1 and p["status"] != "finished"]
+        if cancel_remaining and job_id and remaining:
+            # PBS Pro sub-job IDs: 1234[].server -> 1234[5].server
+            qdel([job_id.replace("[]", f"[{p['index']}]") for p in remaining])
+            for p in remaining:
+                p["status"] = "cancelled"
+                cancelled.append(p["dir"])
+    save_json(manifest_path, manifest)
+
+    rows = []
+    previous = None
+    for p in points:
+        energy = f"{p['energy']:.6f}" if p["energy"] is not None else "-"
+        delta = (f"{(p['energy'] - previous) / n_atoms * 1000:+.2f}"
+                 if p["energy"] is not None and previous is not None else "-")
+        marker = "  ← converged" if p["index"] == manifest["converged"] else ""
+        rows.append(f"  {p['dir']:<28} {p['status']:<10} {energy:>14} {delta:>10}{marker}")
+        previous = p["energy"] if p["energy"] is not None else previous
+
+    if manifest["converged"] is None:
+        status = f"Not converged yet (tolerance {tolerance} eV/atom)."
+    else:
+        point = points[manifest["converged"]]
+        status = (f"Converged {manifest['parameter']}: {point['value']:g}"
+                  + (f" (mesh {'x'.join(map(str, point['mesh']))})" if point.get("mesh") else "")
+                  + f", recorded for {manifest['material']}.")
+        if cancelled:
+            status += f" Cancelled {len(cancelled)} remaining points."
+
+    return (f"Convergence scan {scan_dir} ({manifest['parameter']})\n"
+            f"  {'point':<28} {'status':<10} {'E0 (eV)':>14} {'dE meV/at':>10}\n"
+            + "\n".join(rows) + "\n  " + status)
+
+
+def converged_value(structure, parameter: str) -> Optional[float]:
+    """
+    Recorded converged value for a material, for programmatic reuse.
+
+    Args:
+        structure: ArrayStructure of the material.
+        parameter: "kpoints" (k-point length density) or "encut" (eV).
+
+    Returns:
+        float | None: The converged value, or None if not recorded.
+    """
+    recorded = _recorded_settings(structure)[1].get(parameter)
+    return recorded["value"] if recorded else None
+
+
+def get_converged_settings(
+    structure_path: Annotated[
+        str,
+        "Path to the structure file (POSCAR) of the material."
+    ]
+) -> str:
+    """
+    Get the recorded converged ENCUT and k-point density for a material.
+
+    Settings are shared by all structures with the same reduced formula and
+    space group (e.g. supercells of the converged cell).
+
+    Args:
+        structure_path: Structure file of the material.
+
+    Returns:
+        str: Recorded settings, or a note that none are recorded.
+
+    Example:
+        get_converged_settings("POSCAR")
+    """
+    structure = load_structure(structure_path)
+    material, recorded = _recorded_settings(structure)
+    if not recorded:
+        return f"No converged settings recorded for {material or reduced_formula(structure)}."
+
+    lines = [f"Converged settings for {material}:"]
+    if "encut" in recorded:
+        lines.append(f"  ENCUT = {recorded['encut']['value']:g} eV "
+                     f"(tolerance {recorded['encut']['tolerance']} eV/atom)")
+    if "kpoints" in recorded:
+        k = recorded["kpoints"]
+        lines.append(f"  K-point length density = {k['value']:g}"
+                     + (f" (mesh {'x'.join(map(str, k['mesh']))} for the scanned cell)" if k.get("mesh") else "")
+                     + f" (tolerance {k['tolerance']} eV/atom)")
+    return "\n".join(lines)
+
+
+def create_convergence_workbench() -> StaticWorkbench:
+    """
+    Create a workbench with the convergence scan tools.
+
+    Returns:
+        StaticWorkbench: Workbench containing setup, submit, check and lookup tools.
+    """
+    setup_tool = FunctionTool(setup_convergence_scan, description=setup_convergence_scan.__doc__)
+    submit_tool = FunctionTool(submit_convergence_scan, description=submit_convergence_scan.__doc__)
+    check_tool = FunctionTool(check_convergence_scan, description=check_convergence_scan.__doc__)
+    settings_tool = FunctionTool(get_converged_settings, description=get_converged_settings.__doc__)
+    return StaticWorkbench([setup_tool, submit_tool, check_tool, settings_tool])
+
+
+__all__ = [
+    "setup_convergence_scan",
+    "submit_convergence_scan",
+    "check_convergence_scan",
+    "get_converged_settings",
+    "converged_value",
+    "create_convergence_workbench",
+]
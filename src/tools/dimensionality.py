@@ -0,0 +1,216 @@
+"""
+Fast dimensionality detection and an on-disk cache of its results.
+
+`detect_dimensionality` is a lightweight replacement for pymatgen's
+CrystalNN + Larsen pipeline on large cells: bonds are found from covalent
+radii with pymatgen's cell-list neighbour search (periodic images
+included), and the dimensionality is the rank of the lattice translations
+connecting each bonded component to its own periodic images (Larsen et al.,
+Phys. Rev. Materials 3, 034003). It also returns the real vacuum (2D) or
+periodic (1D) axis.
+
+Bonding analysis is the slowest part of KPOINTS generation, and
+consecutive tasks of a workflow usually hand over nearly the same structure
+(POSCAR -> relaxed CONTCAR). Results are stored per composition in the
+vaspgo cache directory and reused for any structure with the same atoms in
+the same order whose lattice and positions differ only by a
+relaxation-sized amount. Each record keeps the detection method; a lookup
+only returns results of the requested method or a stricter one (a "fast"
+result never answers a "larsen" request).
+"""
+
+import hashlib
+import time
+from typing import Optional
+
+import numpy as np
+
+from tools.cache import get_cache_dir, load_json, save_json
+from tools.poscar_io import ArrayStructure
+
+# Tolerances for reusing a cached result
+LATTICE_TOL = 0.05      # relative change of lattice vector lengths
+ANGLE_TOL = 3.0         # degrees
+POSITION_TOL = 0.5      # Angstrom, largest atomic displacement
+MAX_RECORDS = 32        # records kept per composition
+
+# Detection methods from least to most strict
+METHOD_RANK = {"fast": 0, "larsen": 1}
+
+# Bond criterion: d < BOND_TOLERANCE * (r_cov(i) + r_cov(j))
+BOND_TOLERANCE = 1.2
+DEFAULT_RADIUS = 1.5
+
+
+def _covalent_radii(species: np.ndarray) -> np.ndarray:
+    from pymatgen.analysis.molecule_structure_comparator import CovalentRadius
+
+    symbols, inverse = np.unique(species, return_inverse=True)
+    radii = np.array([CovalentRadius.radius.get(str(el), DEFAULT_RADIUS) for el in symbols])
+    return radii[inverse]
+
+
+def _bonds(structure: ArrayStructure, tolerance: float) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Bonded pairs (i, j, image of j) from a periodic cell-list neighbour search."""
+    from pymatgen.optimization.neighbors import find_points_in_spheres
+
+    radii = _covalent_radii(structure.species)
+    cart = np.ascontiguousarray(structure.cart_coords, dtype=float)
+    centers, neighbors, images, distances = find_points_in_spheres(
+        cart, cart, float(2 * tolerance * radii.max()), np.array([1, 1, 1], dtype=np.int64),
+        np.ascontiguousarray(structure.lattice, dtype=float), tol=1e-8,
+    )
+    bonded = (distances > 1e-8) & (distances < tolerance * (radii[centers] + radii[neighbors]))
+    return centers[bonded], neighbors[bonded], np.round(images[bonded]).astype(np.int64)
+
+
+def detect_dimensionality(
+    structure: ArrayStructure,
+    tolerance: float = BOND_TOLERANCE,
+) -> tuple[int, Optional[int]]:
+    """
+    Dimensionality (0-3) of a structure from its covalent-radius bond graph.
+
+    Every bonded component is unwrapped along a spanning tree; each bond
+    that closes a cycle into another periodic image contributes the lattice
+    translation between the two images. The rank of those translations is
+    the periodicity of the component, and the structure's dimensionality is
+    the largest one.
+
+    Args:
+        structure: Structure to analyze.
+        tolerance: Bond length tolerance factor on the sum of covalent radii.
+
+    Returns:
+        tuple: (dimensionality, axis), where axis is the lattice index of the
+        vacuum direction for 2D, the periodic direction for 1D, else None.
+    """
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import breadth_first_order, connected_components
+
+    n_atoms = len(structure)
+    i, j, images = _bonds(structure, tolerance)
+    if len(i) == 0:
+        return 0, None
+
+    # One (arbitrary) bond per atom pair for the spanning trees
+    _, first = np.unique(i * n_atoms + j, return_index=True)
+    graph = csr_matrix((first + 1, (i[first], j[first])), shape=(n_atoms, n_atoms))
+    _, labels = connected_components(graph, directed=False)
+
+    # Image offset of every atom in its unwrapped component
+    offsets = np.zeros((n_atoms, 3), dtype=np.int64)
+    visited = np.zeros(n_atoms, dtype=bool)
+    for start in range(n_atoms):
+        if visited[start]:
+            continue
+        order, predecessors = breadth_first_order(graph, start, directed=False, return_predecessors=True)
+        visited[order] = True
+        nodes = order[1:]
+        if len(nodes) == 0:
+            continue
+        parents = predecessors[nodes]
+        edges = np.asarray(graph[parents, nodes]).ravel() - 1
+        # Parents precede their children in BFS order
+        for node, parent, edge in zip(nodes, parents, edges):
+            offsets[node] = offsets[parent] + images[edge]
+
+    # Lattice translations closed by each bond, grouped per component
+    cycles = offsets[i] + images - offsets[j]
+    nonzero = np.any(cycles != 0, axis=1)
+    best_rank, best_vectors = 0, None
+    for component in np.unique(labels[i[nonzero]]):
+        vectors = np.unique(cycles[nonzero & (labels[i] == component)], axis=0)
+        rank = int(np.linalg.matrix_rank(vectors.astype(float)))
+        if rank > best_rank:
+            best_rank, best_vectors = rank, vectors
+        if best_rank == 3:
+            break
+
+    axis = None
+    if best_rank == 2:
+        # Miller index of the periodic plane: its largest component is the vacuum axis
+        _, _, vh = np.linalg.svd(best_vectors.astype(float))
+        axis = int(np.argmax(np.abs(vh[-1])))
+    elif best_rank == 1:
+        axis = int(np.argmax(np.abs(best_vectors).max(axis=0)))
+    return best_rank, axis
+
+
+def _lattice_params(lattice: np.ndarray) -> np.ndarray:
+    a, b, c = np.linalg.norm(lattice, axis=1)
+    cos = [lattice[1] @ lattice[2] / (b * c), lattice[0] @ lattice[2] / (a * c), lattice[0] @ lattice[1] / (a * b)]
+    return np.concatenate(([a, b, c], np.degrees(np.arccos(np.clip(cos, -1.0, 1.0)))))
+
+
+def _cache_file(structure: ArrayStructure):
+    digest = hashlib.sha1("|".join(structure.species.tolist()).encode("utf-8")).hexdigest()
+    return get_cache_dir("dimensionality") / f"{digest}.json"
+
+
+def _same_structure(record: dict, structure: ArrayStructure) -> bool:
+    params = _lattice_params(structure.lattice)
+    other = np.asarray(record["lattice_params"])
+    if np.any(np.abs(params[:3] - other[:3]) > LATTICE_TOL * other[:3]):
+        return False
+    if np.any(np.abs(params[3:] - other[3:]) > ANGLE_TOL):
+        return False
+    diff = structure.frac_coords - np.asarray(record["frac_coords"])
+    diff -= np.round(diff)
+    return float(np.linalg.norm(diff @ structure.lattice, axis=1).max(initial=0.0)) < POSITION_TOL
+
+
+def lookup_dimensionality(structure: ArrayStructure, method: str = "fast") -> Optional[dict]:
+    """
+    Find a cached dimensionality result for an (almost) identical structure.
+
+    Args:
+        structure: Structure to look up.
+        method: Requested detection method; results of this method or a
+            stricter one (see METHOD_RANK) are returned, the strictest first.
+
+    Returns:
+        dict | None: {"dimensionality", "axis", "method"} or None if not cached.
+    """
+    min_rank = METHOD_RANK.get(method, max(METHOD_RANK.values()))
+    best = None
+    for record in load_json(_cache_file(structure), default=[]):
+        rank = METHOD_RANK.get(record.get("method"), -1)
+        if rank >= min_rank and _same_structure(record, structure):
+            if best is None or rank > METHOD_RANK[best["method"]]:
+                best = record
+    if best is None:
+        return None
+    return {key: best[key] for key in ("dimensionality", "axis", "method")}
+
+
+def store_dimensionality(
+    structure: ArrayStructure,
+    dimensionality: int,
+    axis: Optional[int],
+    method: str,
+) -> None:
+    """
+    Store a dimensionality result in the cache.
+
+    Args:
+        structure: Analyzed structure.
+        dimensionality: Detected dimensionality (0-3).
+        axis: Vacuum axis (2D) or periodic axis (1D) as lattice index 0-2, else None.
+        method: Detection method, e.g. "larsen".
+    """
+    path = _cache_file(structure)
+    records = [r for r in load_json(path, default=[])
+               if r.get("method") != method or not _same_structure(r, structure)]
+    records.append({
+        "dimensionality": int(dimensionality),
+        "axis": None if axis is None else int(axis),
+        "method": method,
+        "lattice_params": np.round(_lattice_params(structure.lattice), 5).tolist(),
+        "frac_coords": np.round(structure.frac_coords, 5).tolist(),
+        "added_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+    })
+    save_json(path, records[-MAX_RECORDS:])
+
+
+__all__ = ["detect_dimensionality", "lookup_dimensionality", "store_dimensionality", "METHOD_RANK"]
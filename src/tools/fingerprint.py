@@ -0,0 +1,417 @@
+"""
+Structure fingerprints used as cache keys and duplicate detectors.
+
+Fingerprints are computed directly on `ArrayStructure` arrays so they are
+cheap enough to evaluate for every structure a tool reads or writes:
+- `structure_hash`: exact hash, used as a cache key
+- `slab_fingerprint`: layer profile of a slab termination
+- `StructureIndex`: persistent index of generated/computed structures used
+  to flag or skip equivalent structures before they become VASP jobs. The
+  index is sharded by composition and stores only cheap invariants (volume
+  per atom, a smeared pair-distance descriptor and the exact hash), which
+  select candidates; matches are confirmed with pymatgen's StructureMatcher
+  up to MATCHER_MAX_ATOMS, since the descriptor cannot tell apart e.g.
+  different substitution patterns with the same pair statistics, and by
+  exact hash above it. Records whose file was deleted or rewritten are
+  ignored and pruned, so they can never cause a new output to be dropped.
+"""
+
+import hashlib
+import math
+import os
+import time
+from functools import reduce
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from tools.cache import get_cache_dir, load_json, locked, save_json
+from tools.poscar_io import ArrayStructure, load_structure
+
+# Largest structures confirmed with StructureMatcher (its cost grows steeply with size)
+MATCHER_MAX_ATOMS = 200
+# Largest structures registered in the index at all
+INDEX_MAX_ATOMS = 2000
+
+_MATCHER = None
+
+
+def _structure_matcher():
+    """Shared pymatgen StructureMatcher (default tolerances)."""
+    global _MATCHER
+    if _MATCHER is None:
+        from pymatgen.analysis.structure_matcher import StructureMatcher
+        _MATCHER = StructureMatcher()
+    return _MATCHER
+
+
+def structure_hash(structure: ArrayStructure, decimals: int = 4) -> str:
+    """
+    Exact fingerprint of a structure (lattice, species and coordinates).
+
+    Two structures get the same hash only if they have the same atoms in the
+    same order at the same positions (after rounding). Use it as a cache key
+    for expensive per-structure analyses.
+
+    Args:
+        structure: Structure to fingerprint.
+        decimals: Number of decimals kept for lattice (Angstrom) and fractional coordinates.
+
+    Returns:
+        str: Hex digest.
+    """
+    frac = np.mod(np.round(structure.frac_coords, decimals), 1.0)
+    digest = hashlib.sha1()
+    digest.update(np.round(structure.lattice, decimals).astype(np.float64).tobytes())
+    digest.update("|".join(structure.species.tolist()).encode("utf-8"))
+    digest.update(np.round(frac, decimals).astype(np.float64).tobytes())
+    return digest.hexdigest()
+
+
+def surface_normal_heights(structure: ArrayStructure) -> np.ndarray:
+    """
+    Atom heights along the surface normal (perpendicular to the a-b plane).
+
+    Slabs that wrap across the periodic boundary along c are unwrapped at the
+    largest gap (the vacuum), so heights are contiguous and start at zero.
+
+    Args:
+        structure: Slab structure with the surface in the a-b plane.
+
+    Returns:
+        np.ndarray: Height of each atom in Angstroms, shape (N,).
+    """
+    normal = np.cross(structure.lattice[0], structure.lattice[1])
+    normal /= np.linalg.norm(normal)
+
+    frac_c = np.mod(structure.frac_coords[:, 2], 1.0)
+    sorted_c = np.sort(frac_c)
+    gaps = np.diff(np.concatenate((sorted_c, [sorted_c[0] + 1.0])))
+    bottom = sorted_c[(np.argmax(gaps) + 1) % len(sorted_c)]
+    return np.mod(frac_c - bottom, 1.0) * float(structure.lattice[2] @ normal)
+
+
+def slab_fingerprint(structure: ArrayStructure, resolution: float = 0.1) -> str:
+    """
+    Fast fingerprint of a slab termination.
+
+    The slab is described by its in-plane cell area and its layer profile:
+    the sorted (height above the bottom atom, element) pairs along the surface
+    normal, rounded to `resolution`. In-plane translations and flipping the
+    slab upside down give the same fingerprint, so equivalent terminations
+    produced by a SlabGenerator collapse to one entry.
+
+    Args:
+        structure: Slab structure with the surface in the a-b plane.
+        resolution: Height resolution in Angstroms.
+
+    Returns:
+        str: Hex digest.
+    """
+    heights = surface_normal_heights(structure)
+    area = np.linalg.norm(np.cross(structure.lattice[0], structure.lattice[1]))
+
+    def profile(h: np.ndarray) -> str:
+        levels = np.round((h - h.min()) / resolution).astype(int)
+        order = np.lexsort((structure.species, levels))
+        return ";".join(f"{levels[i]}:{structure.species[i]}" for i in order)
+
+    # Upside-down slab: heights mirrored about the normal
+    canonical = min(profile(heights), profile(-heights))
+    digest = hashlib.sha1(f"{round(area / resolution)}|{canonical}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def reduced_formula(structure: ArrayStructure) -> str:
+    """
+    Reduced formula with elements in alphabetical order, e.g. "Fe2O3".
+
+    Args:
+        structure: Structure to describe.
+
+    Returns:
+        str: Reduced formula.
+    """
+    composition = structure.composition
+    divisor = reduce(math.gcd, composition.values())
+    return "".join(f"{el}{n // divisor if n // divisor > 1 else ''}"
+                   for el, n in sorted(composition.items()))
+
+
+def structure_key(structure: ArrayStructure, symprec: float = 0.1) -> str:
+    """
+    Coarse key of a structure: reduced formula, atom count and space group number.
+
+    Runs spglib, which takes seconds for cells with thousands of atoms;
+    compare `reduced_formula` first where that is enough to rule out a match.
+
+    Args:
+        structure: Structure to describe.
+        symprec: Symmetry tolerance passed to spglib.
+
+    Returns:
+        str: Key such as "Fe2O3|N=30|SG=167".
+    """
+    import spglib
+
+    formula = reduced_formula(structure)
+    _, numbers = np.unique(structure.species, return_inverse=True)
+    dataset = spglib.get_symmetry_dataset(
+        (structure.lattice, structure.frac_coords, numbers), symprec=symprec
+    )
+    spacegroup = dataset.number if dataset is not None else 0
+    return f"{formula}|N={len(structure)}|SG={spacegroup}"
+
+
+def pair_distance_descriptor(
+    structure: ArrayStructure,
+    r_max: float = 6.0,
+    bin_width: float = 0.05,
+    sigma: float = 0.1,
+) -> np.ndarray:
+    """
+    Gaussian-smeared pair-distance distribution per element pair, per atom.
+
+    Structures related by symmetry (e.g. equivalent adsorption sites or
+    substitution patterns) give identical descriptors; small relaxations only
+    move them slightly because of the smearing.
+
+    Args:
+        structure: Structure to describe.
+        r_max: Cutoff radius in Angstroms.
+        bin_width: Histogram bin width in Angstroms.
+        sigma: Gaussian smearing width in Angstroms.
+
+    Returns:
+        np.ndarray: Flattened descriptor of shape (n_pairs * n_bins,), with
+        element pairs in sorted order.
+    """
+    from pymatgen.optimization.neighbors import find_points_in_spheres
+
+    cart = np.ascontiguousarray(structure.cart_coords, dtype=float)
+    centers, neighbors, _, distances = find_points_in_spheres(
+        cart, cart, r_max, np.array([1, 1, 1], dtype=np.int64),
+        np.ascontiguousarray(structure.lattice, dtype=float), tol=1e-8,
+    )
+    keep = distances > 1e-8
+    centers, neighbors, distances = centers[keep], neighbors[keep], distances[keep]
+
+    elements, numbers = np.unique(structure.species, return_inverse=True)
+    n_el = len(elements)
+    pair_i = np.minimum(numbers[centers], numbers[neighbors])
+    pair_j = np.maximum(numbers[centers], numbers[neighbors])
+    pair_index = pair_i * n_el + pair_j
+
+    n_bins = int(round(r_max / bin_width))
+    hist = np.zeros((n_el * n_el, n_bins))
+    bins = np.minimum((distances / bin_width).astype(int), n_bins - 1)
+    np.add.at(hist, (pair_index, bins), 1.0)
+
+    # Smear with a Gaussian kernel along the distance axis
+    half = int(math.ceil(3 * sigma / bin_width))
+    kernel = np.exp(-0.5 * (np.arange(-half, half + 1) * bin_width / sigma) ** 2)
+    kernel /= kernel.sum()
+    smeared = np.apply_along_axis(lambda row: np.convolve(row, kernel, mode="same"), 1, hist)
+
+    upper = np.triu_indices(n_el)
+    return (smeared.reshape(n_el, n_el, n_bins)[upper] / max(len(structure), 1)).ravel()
+
+
+class StructureIndex:
+    """Persistent fingerprint index of generated and computed structures."""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        tolerance: float = 0.02,
+        max_atoms: int = INDEX_MAX_ATOMS,
+    ) -> None:
+        """
+        Initialize StructureIndex.
+
+        Args:
+            path: Index directory (one JSON shard per composition); defaults to
+                structure_index/ in the vaspgo cache
+            tolerance: Maximum relative descriptor difference for an indexed
+                structure to be a match candidate
+            max_atoms: Structures with more atoms are neither registered nor looked up
+        """
+        self.path = Path(path) if path else get_cache_dir("structure_index")
+        self.tolerance = tolerance
+        self.max_atoms = max_atoms
+
+    def _shard(self, structure: ArrayStructure) -> Path:
+        key = f"{reduced_formula(structure)}|N={len(structure)}"
+        return self.path / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]}.json"
+
+    def _is_candidate(self, record: dict, volume_per_atom: float, descriptor: np.ndarray) -> bool:
+        if abs(record["volume_per_atom"] - volume_per_atom) > 0.01 * volume_per_atom:
+            return False
+        other = np.asarray(record["descriptor"])
+        if other.shape != descriptor.shape:
+            return False
+        scale = max(np.abs(descriptor).sum(), 1e-12)
+        return np.abs(other - descriptor).sum() / scale < self.tolerance
+
+    @staticmethod
+    def _file_stamp(path: str) -> Optional[dict]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+    @classmethod
+    def _is_current(cls, record: dict) -> bool:
+        """Whether the record's file still holds the structure that was indexed."""
+        stamp = cls._file_stamp(record["path"])
+        return stamp is not None and all(record.get(k) == v for k, v in stamp.items())
+
+    def _find_match(self, records: list, described: tuple, pmg_cache: dict) -> Optional[dict]:
+        """First current record equivalent to the described structure."""
+        structure, volume_per_atom, descriptor, digest = described
+        query = None
+        for record in records:
+            if not self._is_candidate(record, volume_per_atom, descriptor) or not self._is_current(record):
+                continue
+            if record["hash"] == digest:
+                return record
+            if len(structure) > MATCHER_MAX_ATOMS:
+                continue
+            path = record["path"]
+            if path not in pmg_cache:
+                try:
+                    pmg_cache[path] = load_structure(path).to_pymatgen()
+                except Exception:
+                    # Cannot confirm: never report an unverified duplicate
+                    pmg_cache[path] = None
+            if pmg_cache[path] is None:
+                continue
+            if query is None:
+                query = structure.to_pymatgen()
+            if _structure_matcher().fit(query, pmg_cache[path]):
+                return record
+        return None
+
+    @staticmethod
+    def _public(record: dict) -> dict:
+        return {k: record[k] for k in ("path", "status", "added_at")}
+
+    @staticmethod
+    def _describe(structure: ArrayStructure) -> tuple[ArrayStructure, float, np.ndarray, str]:
+        return (
+            structure,
+            structure.volume / max(len(structure), 1),
+            np.round(pair_distance_descriptor(structure), 5),
+            structure_hash(structure),
+        )
+
+    def lookup(self, structure: ArrayStructure) -> Optional[dict]:
+        """
+        Find an indexed structure equivalent to `structure`.
+
+        Args:
+            structure: Structure to look up.
+
+        Returns:
+            dict | None: The matching record (path, status, added_at), or None.
+        """
+        if len(structure) > self.max_atoms:
+            return None
+        records = load_json(self._shard(structure), default=[])
+        if not records:
+            return None
+        match = self._find_match(records, self._describe(structure), {})
+        return self._public(match) if match is not None else None
+
+    def register(
+        self,
+        structure: ArrayStructure,
+        path: str,
+        status: str = "generated",
+    ) -> Optional[dict]:
+        """
+        Register a structure, unless an equivalent one is already indexed.
+
+        Args:
+            structure: Structure to register.
+            path: File the structure was written to (or read from).
+            status: "generated" for new inputs, "computed" for finished calculations.
+
+        Returns:
+            dict | None: The existing equivalent record (the structure is a
+            duplicate), or None if the structure was newly added.
+        """
+        return self.register_many([(structure, path)], status)[0]
+
+    def register_many(
+        self,
+        items: list[tuple[ArrayStructure, str]],
+        status: str = "generated",
+    ) -> list[Optional[dict]]:
+        """
+        Register several structures with a single read and write per shard.
+
+        Structures within `items` are also checked against each other. A
+        "generated" record is upgraded to "computed" when an equivalent
+        structure is later registered as computed; re-registering the same
+        file is not reported as a duplicate. Records whose file no longer
+        exists or has changed since it was indexed are dropped from the
+        shards that are written. Structures above `max_atoms` are skipped.
+
+        Args:
+            items: (structure, path) pairs; the files must already be written.
+            status: "generated" for new inputs, "computed" for finished calculations.
+
+        Returns:
+            list: For each item, the existing equivalent record or None.
+        """
+        results: list[Optional[dict]] = [None] * len(items)
+        shards: dict[Path, list[int]] = {}
+        for i, (structure, _) in enumerate(items):
+            if len(structure) <= self.max_atoms:
+                shards.setdefault(self._shard(structure), []).append(i)
+
+        pmg_cache: dict = {}
+        for shard, positions in shards.items():
+            # Lock the read-modify-write so concurrent pool workers don't drop each other's records
+            with locked(shard):
+                records = [r for r in load_json(shard, default=[]) if self._is_current(r)]
+                for i in positions:
+                    structure, path = items[i]
+                    path = str(Path(path).resolve())
+                    described = self._describe(structure)
+                    match = self._find_match(records, described, pmg_cache)
+                    stamp = self._file_stamp(path) or {}
+                    if match is None:
+                        records.append({
+                            "path": path,
+                            "status": status,
+                            "added_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+                            "volume_per_atom": round(described[1], 5),
+                            "descriptor": described[2].tolist(),
+                            "hash": described[3],
+                            **stamp,
+                        })
+                    elif match["path"] == path or (status == "computed" and match["status"] != "computed"):
+                        # Same file registered again, or a generated structure has now been computed
+                        if status == "computed":
+                            match.update(path=path, status=status, hash=described[3], **stamp)
+                    else:
+                        results[i] = self._public(match)
+                save_json(shard, records)
+        return results
+
+
+__all__ = [
+    "structure_hash",
+    "slab_fingerprint",
+    "surface_normal_heights",
+    "reduced_formula",
+    "structure_key",
+    "pair_distance_descriptor",
+    "StructureIndex",
+    "MATCHER_MAX_ATOMS",
+    "INDEX_MAX_ATOMS",
+]
@@ -0,0 +1,542 @@
+"""
+Deterministic rule engine for INCARs of standard VASP tasks.
+
+Most checklist tasks (relaxation, SCF, DOS, PBE/HSE06 bands, DFT+U, ...) need
+an INCAR that is the matching example of incar_examples.json plus a few
+overrides, which the INCAR agent otherwise produces in several LLM turns.
+`build_incar` derives it directly from a checklist entry:
+
+1. the task name and requirements select an example category (`INCAR_RULES`),
+   an optional functional (HSE06, meta-GGA) whose defining tags are layered
+   over it, and optional modifiers (spin polarization, SOC, DFT+U, vdW, dipole);
+2. the precision level sets PREC/ENCUT/SIGMA/EDIFF/EDIFFG (the same reference
+   table the INCAR agent uses; DFPT and optics keep a tighter template EDIFF,
+   since linear response needs well converged orbitals); ENCUT is raised to 1.3 x max ENMAX and, for
+   high/ultrahigh, to a recorded converged ENCUT when the structure is known;
+3. dependencies set ISTART/ICHARG (WAVECAR/CHGCAR reuse, ICHARG = 11 for
+   non-self-consistent runs) and upstream tasks whose WAVECAR/CHGCAR is used
+   later get LWAVE/LCHARG = .TRUE.;
+4. explicit TAG=VALUE requirements override everything, TAG!=VALUE are checked.
+
+Tasks whose category or requirements are not recognized are reported as
+unmatched and left to the LLM.
+"""
+
+import os
+import re
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+# Reference values per precision level (also in the INCAR agent prompt)
+PRECISION_SETTINGS = {
+    "low": {"PREC": "Med", "ENCUT": 300, "SIGMA": 0.1, "EDIFF": "1E-3", "EDIFFG": -0.2},
+    "medium": {"PREC": "Normal", "ENCUT": 400, "SIGMA": 0.05, "EDIFF": "1E-4", "EDIFFG": -0.05},
+    "high": {"PREC": "Accurate", "ENCUT": 500, "SIGMA": 0.05, "EDIFF": "1E-5", "EDIFFG": -0.02},
+    "ultrahigh": {"PREC": "Accurate", "ENCUT": 600, "SIGMA": 0.02, "EDIFF": "1E-6", "EDIFFG": -0.01},
+}
+PRECISION_SETTINGS["only-gamma"] = PRECISION_SETTINGS["low"]
+
+# (example category, pattern on task name + requirements). Method rules come
+# first and win; among property rules the one matching earliest in the task
+# name wins ("SCF for band structure" -> SCF). Functional rules only select a
+# category when no property rule matches ("HSE06 calculation"); otherwise the
+# functional's tags are layered over the property category
+# ("Structure relaxation with HSE06" -> relaxation + HSE06 tags).
+METHOD_RULES = [
+    ("Density functional perturbation theory (DFPT)", r"\bdfpt\b|phonon"),
+    ("optical property/dielectric function", r"optic|dielectric|absorption"),
+]
+FUNCTIONAL_RULES = [
+    ("HSE06 calculation", r"\bhse|hybrid"),
+    ("MetaGGA calculation", r"meta-?gga|r2scan|\bscan\b"),
+]
+PROPERTY_RULES = [
+    ("work function", r"work[\s-]*function"),
+    ("Density of states (DOS)", r"\bdos\b|\bpdos\b|density of states"),
+    ("PBE band", r"\bband"),
+    ("self-consistant field (SCF)", r"\bscf\b|self[\s-]*consist|static"),
+    ("Structure Relaxation", r"relax|optimi[sz]|geometry"),
+]
+INCAR_RULES = METHOD_RULES + FUNCTIONAL_RULES + PROPERTY_RULES
+# Tags of the functional examples that define the functional
+FUNCTIONAL_TAGS = {
+    "HSE06 calculation": ("LHFCALC", "AEXX", "HFSCREEN", "ALGO", "TIME", "PRECFOCK"),
+    "MetaGGA calculation": ("METAGGA", "LASPH"),
+}
+DFT_U_CATEGORY = "DFT+U"
+
+# Modifiers applied on top of the category: (pattern, tags)
+MODIFIERS = [
+    (r"spin[\s-]*polari[sz]|magnetic|\bispin", {"ISPIN": 2}),
+    (r"\bsoc\b|spin[\s-]*orbit|lsorbit", {"LSORBIT": ".TRUE."}),
+    (r"\bvdw\b|van der waals|\bd3\b", {"IVDW": 11}),
+    (r"dipole", {"LDIPOL": ".TRUE.", "IDIPOL": 3}),
+]
+DFT_U_PATTERN = r"\+\s*u\b|hubbard|\bldau"
+
+# Default U values (eV) for d elements, as used by Materials Project for oxides/fluorides
+DEFAULT_U = {"Co": 3.32, "Cr": 3.7, "Fe": 5.3, "Mn": 3.9, "Mo": 4.38, "Ni": 6.2, "V": 3.25, "W": 6.2}
+F_ELEMENTS = frozenset(
+    "La Ce Pr Nd Pm Sm Eu Gd Tb Dy Ho Er Tm Yb Lu Ac Th Pa U Np Pu Am Cm".split()
+)
+
+# Requirement words that carry no extra instruction
+GENERIC_WORDS = frozenset("""
+a an and as at be by default defaults recommended recommend setting settings standard usual typical
+normal coarse fine accurate precise quick fast final calculation calculations calc for from in into
+is of on or the to use using with without via step task previous structure structures relaxation
+relax relaxed optimization scf self consistent field band bands structure dos density states
+important very must should keep all only same please ev mev required requirement requirements
+parameter parameters value values no none eg e g skip dft gga pbe
+""".split())
+
+_TAG_ASSIGNMENT = re.compile(r"\b([A-Z][A-Z0-9_]+)\s*(!=|=)\s*([^,;\s]+(?:\s*\*\s*[^,;\s]+)?)")
+_U_VALUE = re.compile(r"\bU\s*\(\s*([A-Z][a-z]?)\s*\)\s*=\s*([-\d.]+)|\b([A-Z][a-z]?)\s*:\s*U\s*=\s*([-\d.]+)")
+# Misspelled tags found in the examples -> VASP tag
+_TAG_ALIASES = {"LOPTICAL": "LOPTICS"}
+_OUTPUT_FILES = ("WAVECAR", "CHGCAR", "CONTCAR", "OUTCAR", "WAVEDER", "CHG")
+
+
+class Dependency(BaseModel):
+    """A checklist dependency: files taken from an earlier task."""
+    task: int = Field(description="Index of the task providing the files.")
+    files: list[str] = Field(default_factory=list, description="VASP files taken from that task.")
+    text: str = Field(default="", description="Original dependency text.")
+
+
+class ChecklistTask(BaseModel):
+    """One entry of the VASP task checklist (task_note.md)."""
+    index: int
+    name: str
+    precision: str = "null"
+    deps: list[Dependency] = Field(default_factory=list)
+    reqs: str = ""
+    dir: Optional[str] = None
+
+
+def parse_checklist(text: str) -> list[ChecklistTask]:
+    """
+    Parse the "VASP Task Checklist" format written by the task agent.
+
+    Args:
+        text: Checklist text.
+
+    Returns:
+        list[ChecklistTask]: Tasks in checklist order.
+
+    Example:
+        parse_checklist("1. SCF Calculation [high]\\n   deps: []\\n   reqs: Default recommended settings")
+    """
+    tasks = []
+    header = re.compile(r"^\s*(\d+)\.\s+(.+?)\s*\[([\w-]+)\](.*)$")
+    for line in text.splitlines():
+        match = header.match(line)
+        if match:
+            tasks.append(ChecklistTask(index=int(match.group(1)), name=match.group(2).strip(),
+                                       precision=match.group(3).strip().lower()))
+            continue
+        if not tasks:
+            continue
+        field = re.match(r"^\s*(deps|reqs|dir)\s*:\s*(.*)$", line)
+        if field is None:
+            continue
+        key, value = field.group(1), field.group(2).strip()
+        if key == "deps":
+            for dep in re.findall(r"\[([^\[\]]*)\]", value):
+                task_ref = re.search(r"Task\s*(\d+)", dep, re.IGNORECASE)
+                if task_ref:
+                    files = [f for f in _OUTPUT_FILES if re.search(rf"\b{f}\b", dep, re.IGNORECASE)]
+                    tasks[-1].deps.append(Dependency(task=int(task_ref.group(1)), files=files, text=dep.strip()))
+        elif key == "reqs":
+            tasks[-1].reqs = value
+        elif value:
+            tasks[-1].dir = value
+    return tasks
+
+
+def _parse_value(value: str):
+    value = re.sub(r"(?i)(?<=\d)\s*m?ev$", "", value.strip())
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+def _format_value(value) -> str:
+    if isinstance(value, float):
+        return f"{value:g}"
+    if isinstance(value, (list, tuple)):
+        return " ".join(_format_value(v) for v in value)
+    return str(value)
+
+
+def format_incar(params: dict, system: str) -> str:
+    """
+    Render INCAR text: SYSTEM first, then the tags in insertion order.
+
+    Args:
+        params: INCAR tags.
+        system: SYSTEM name.
+
+    Returns:
+        str: INCAR file content.
+    """
+    lines = [f"SYSTEM = {system}"]
+    lines.extend(f"{tag} = {_format_value(value)}" for tag, value in params.items() if tag != "SYSTEM")
+    return "\n".join(lines) + "\n"
+
+
+def set_incar_tag(incar_text: str, tag: str, value) -> str:
+    """
+    Replace (or append) one tag of INCAR text, keeping all other lines.
+
+    Args:
+        incar_text: INCAR file content.
+        tag: INCAR tag, matched case-insensitively.
+        value: New value.
+
+    Returns:
+        str: Updated INCAR content.
+    """
+    pattern = re.compile(rf"^\s*{tag}\s*=.*$", re.IGNORECASE | re.MULTILINE)
+    line = f"{tag} = {_format_value(value)}"
+    if pattern.search(incar_text):
+        return pattern.sub(line, incar_text, count=1)
+    return incar_text.rstrip("\n") + f"\n{line}\n"
+
+
+def _match_rules(rules: list, text: str) -> Optional[str]:
+    return next((category for category, pattern in rules if re.search(pattern, text)), None)
+
+
+def match_category(task: ChecklistTask) -> Optional[str]:
+    """
+    Example category of a task from its name and requirements.
+
+    Args:
+        task: Checklist task.
+
+    Returns:
+        str | None: Category of incar_examples.json, or None if no rule matches.
+    """
+    for text in (task.name.lower(), task.reqs.lower()):
+        method = _match_rules(METHOD_RULES, text)
+        if method:
+            return method
+        positions = []
+        for category, pattern in PROPERTY_RULES:
+            match = re.search(pattern, text)
+            if match:
+                positions.append((match.start(), category))
+        if positions:
+            return min(positions)[1]
+        functional = _match_rules(FUNCTIONAL_RULES, text)
+        if functional:
+            return functional
+        if re.search(DFT_U_PATTERN, text):
+            return DFT_U_CATEGORY
+    return None
+
+
+def match_functional(task: ChecklistTask) -> Optional[str]:
+    """
+    Functional requested by a task (HSE06, meta-GGA), if any.
+
+    Args:
+        task: Checklist task.
+
+    Returns:
+        str | None: Functional category of incar_examples.json, or None for the default GGA.
+    """
+    for text in (task.name.lower(), task.reqs.lower()):
+        functional = _match_rules(FUNCTIONAL_RULES, text)
+        if functional:
+            return functional
+    return None
+
+
+
+def _unrecognized_words(task: ChecklistTask) -> list[str]:
+    text = _TAG_ASSIGNMENT.sub(" ", task.reqs)
+    text = _U_VALUE.sub(" ", text).lower()
+    for pattern in [p for _, p in INCAR_RULES] + [p for p, _ in MODIFIERS] + [DFT_U_PATTERN]:
+        text = re.sub(rf"[a-z0-9+-]*(?:{pattern})[a-z0-9+-]*", " ", text)
+    allowed = GENERIC_WORDS | set(re.findall(r"[a-z0-9]+", task.name.lower()))
+    return [word for word in re.findall(r"[a-z][a-z0-9]*", text) if word not in allowed]
+
+
+def _dft_u_tags(symbols: list[str], reqs: str) -> dict:
+    u_values = dict(DEFAULT_U)
+    for match in _U_VALUE.finditer(reqs):
+        element = match.group(1) or match.group(3)
+        u_values[element] = float(match.group(2) or match.group(4))
+    ldaul = [(3 if s in F_ELEMENTS else 2) if u_values.get(s) else -1 for s in symbols]
+    return {
+        "LDAU": ".TRUE.",
+        "LDAUTYPE": 2,
+        "LDAUL": ldaul,
+        "LDAUU": [u_values.get(s, 0.0) if l > 0 else 0.0 for s, l in zip(symbols, ldaul)],
+        "LDAUJ": [0.0] * len(symbols),
+        "LMAXMIX": 6 if 3 in ldaul else 4,
+    }
+
+
+def build_incar(
+    task: ChecklistTask,
+    checklist: list[ChecklistTask],
+    examples: dict,
+    structure_path: Optional[str] = None,
+) -> dict:
+    """
+    Build the INCAR of one checklist task from the rules.
+
+    Args:
+        task: Task to build.
+        checklist: The whole checklist (for LWAVE/LCHARG of downstream dependencies).
+        examples: The INCAR example catalog (category -> tags).
+        structure_path: Structure of the task, if known (DFT+U, NBANDS, ENCUT).
+
+    Returns:
+        dict: {"incar": dict | None, "category", "notes": list[str], "reason": str | None}.
+        "incar" is None (with a reason) when the task must be left to the LLM.
+    """
+    result = {"incar": None, "category": None, "notes": [], "reason": None}
+    if task.precision == "null":
+        result["reason"] = "non-computational task (precision null)"
+        return result
+    category = match_category(task)
+    result["category"] = category
+    if category is None or category not in examples:
+        result["reason"] = "no rule matches the task name"
+        return result
+    functional = match_functional(task)
+    if functional == category:
+        functional = None
+    if functional is not None:
+        # Hybrid/meta-GGA linear response and non-self-consistent runs need more than a tag layer
+        if (functional not in examples or category in dict(METHOD_RULES)
+                or str(examples[category].get("ICHARG", "")).strip() == "11"):
+            result["reason"] = f"{functional} combined with {category} has no rule"
+            return result
+        result["category"] = f"{category} + {functional}"
+    unrecognized = _unrecognized_words(task)
+    if unrecognized:
+        result["reason"] = f"unrecognized requirements: {' '.join(unrecognized)}"
+        return result
+
+    text = f"{task.name} {task.reqs}".lower()
+    precision = PRECISION_SETTINGS.get(task.precision, PRECISION_SETTINGS["medium"])
+    if task.precision not in PRECISION_SETTINGS:
+        result["notes"].append(f"unknown precision '{task.precision}', used medium")
+
+    incar = {"PREC": precision["PREC"]}
+    incar.update((_TAG_ALIASES.get(tag, tag), value) for tag, value in examples[category].items())
+    if functional is not None:
+        incar.update((tag, examples[functional][tag]) for tag in FUNCTIONAL_TAGS.get(functional, ())
+                     if tag in examples[functional])
+    template_ediff = incar.get("EDIFF")
+    incar.update({"ENCUT": precision["ENCUT"], "SIGMA": precision["SIGMA"], "EDIFF": precision["EDIFF"]})
+    if category in dict(METHOD_RULES) and template_ediff is not None:
+        if float(_parse_value(str(template_ediff))) < float(precision["EDIFF"]):
+            incar["EDIFF"] = template_ediff
+    if int(_parse_value(str(incar.get("NSW", 0))) or 0) > 1:
+        incar["EDIFFG"] = precision["EDIFFG"]
+    nscf = str(incar.get("ICHARG", "")).strip() == "11"
+
+    for pattern, tags in MODIFIERS:
+        if re.search(pattern, text):
+            incar.update(tags)
+
+    structure, symbols, counts = None, None, None
+    if structure_path and os.path.isfile(structure_path):
+        from tools.poscar_io import load_structure
+        structure = load_structure(structure_path)
+        symbols, counts = structure.symbol_blocks
+
+    if category == DFT_U_CATEGORY or re.search(DFT_U_PATTERN, text):
+        if symbols is None:
+            result["reason"] = "DFT+U needs the structure (species order) to set LDAUL/LDAUU/LDAUJ"
+            return result
+        for tag in ("LDAUL", "LDAUU", "LDAUJ", "LMAXMIX"):
+            incar.pop(tag, None)
+        incar.update(_dft_u_tags(symbols, task.reqs))
+    if "LSORBIT" in incar:
+        incar.setdefault("LMAXMIX", 4)
+        result["notes"].append("SOC: run with vasp_ncl")
+
+    # ENCUT: at least 1.3 x max ENMAX, and a converged ENCUT for high/ultrahigh
+    if symbols is not None:
+        try:
+            from tools.potcar_metadata import electronic_parameters
+            electronic = electronic_parameters(symbols, counts, ispin=int(incar.get("ISPIN", 1)))
+        except Exception:
+            electronic = None
+        if electronic is not None:
+            incar["ENCUT"] = max(incar["ENCUT"], int(electronic["encut"]))
+        if task.precision in ("high", "ultrahigh"):
+            from tools.convergence import converged_value
+            converged = converged_value(structure, "encut")
+            if converged:
+                incar["ENCUT"] = max(incar["ENCUT"], int(converged))
+    else:
+        electronic = None
+
+    # NBANDS given as a multiple of the SCF value (optics)
+    nbands = str(incar.get("NBANDS", ""))
+    factor = re.match(r"\s*(\d+)\s*\*\s*NBANDS", nbands)
+    if factor:
+        base = _scf_nbands(task, checklist)
+        if base is None and electronic is not None:
+            base = electronic["nbands"]
+            result["notes"].append("NBANDS from the estimated SCF default (POTCAR metadata)")
+        if base is None:
+            result["reason"] = "NBANDS needs the SCF OUTCAR or the structure"
+            return result
+        incar["NBANDS"] = int(factor.group(1)) * base
+
+    # Dependencies: restart from WAVECAR / CHGCAR of earlier tasks
+    dep_files = {f for dep in task.deps for f in dep.files}
+    incar["ISTART"] = 1 if "WAVECAR" in dep_files else 0
+    if nscf:
+        incar["ICHARG"] = 11
+        if "CHGCAR" not in dep_files:
+            result["notes"].append("ICHARG = 11 needs the CHGCAR of the SCF task")
+    elif "CHGCAR" in dep_files:
+        incar["ICHARG"] = 1
+    elif incar["ISTART"] == 0:
+        incar["ICHARG"] = 2
+    else:
+        incar.pop("ICHARG", None)
+
+    # Keep outputs that later tasks depend on
+    downstream = {f for other in checklist for dep in other.deps if dep.task == task.index for f in dep.files}
+    if "WAVECAR" in downstream:
+        incar["LWAVE"] = ".TRUE."
+    if "CHGCAR" in downstream or "CHG" in downstream:
+        incar["LCHARG"] = ".TRUE."
+
+    # Explicit requirements win; TAG!=VALUE are constraints
+    for tag, op, value in _TAG_ASSIGNMENT.findall(task.reqs):
+        if op == "=":
+            incar[tag] = _parse_value(value)
+        elif _format_value(incar.get(tag, "")).strip().lower() == _format_value(_parse_value(value)).lower():
+            result["reason"] = f"requirement {tag}!={value} conflicts with the {category} template"
+            return result
+
+    result["incar"] = incar
+    return result
+
+
+def _scf_nbands(task: ChecklistTask, checklist: list[ChecklistTask]) -> Optional[int]:
+    """NBANDS from the OUTCAR of a finished dependency, if available."""
+    by_index = {t.index: t for t in checklist}
+    for dep in task.deps:
+        source = by_index.get(dep.task)
+        if source is None or not source.dir:
+            continue
+        outcar = os.path.join(source.dir, "OUTCAR")
+        if not os.path.isfile(outcar):
+            continue
+        with open(outcar, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                match = re.search(r"NBANDS\s*=\s*(\d+)", line)
+                if match:
+                    return int(match.group(1))
+    return None
+
+
+def _task_structure(task: ChecklistTask, by_index: dict, structure_path: Optional[str]) -> Optional[str]:
+    """Structure of a task: its own POSCAR, else that of the tasks it depends on, else the fallback."""
+    seen = set()
+    stack = [task]
+    while stack:
+        current = stack.pop()
+        if current.index in seen:
+            continue
+        seen.add(current.index)
+        if current.dir:
+            for name in ("POSCAR", "CONTCAR"):
+                path = os.path.join(current.dir, name)
+                if os.path.isfile(path) and os.path.getsize(path) > 0:
+                    return path
+        stack.extend(by_index[dep.task] for dep in current.deps if dep.task in by_index)
+    return structure_path
+
+
+def generate_incars(
+    checklist_text: str,
+    examples: dict,
+    output_dir: str = ".",
+    structure_path: Optional[str] = None,
+    note_name: str = "incar_note.md",
+) -> dict:
+    """
+    Write rule-based INCARs for all matching checklist tasks.
+
+    INCARs go to `<task dir>/INCAR`, or `<output_dir>/INCAR_<n>` for tasks
+    without a directory. The INCAR note (same format as the INCAR agent's) is
+    written to `output_dir`, with unmatched tasks marked incomplete.
+
+    Args:
+        checklist_text: The VASP task checklist.
+        examples: The INCAR example catalog (category -> tags).
+        output_dir: Directory for the note and for INCARs of tasks without a directory.
+        structure_path: Fallback structure for tasks without a POSCAR.
+        note_name: File name of the note.
+
+    Returns:
+        dict: {"generated": [(task, path, category, notes)], "unmatched": [(task, path, reason)],
+        "skipped": [(task, reason)], "note_path": str}.
+    """
+    tasks = parse_checklist(checklist_text)
+    by_index = {task.index: task for task in tasks}
+    generated, unmatched, skipped = [], [], []
+    note_lines = []
+    os.makedirs(output_dir, exist_ok=True)
+
+    for task in tasks:
+        path = os.path.join(task.dir, "INCAR") if task.dir else os.path.join(output_dir, f"INCAR_{task.index}")
+        result = build_incar(task, tasks, examples, _task_structure(task, by_index, structure_path))
+        if task.precision == "null":
+            skipped.append((task, result["reason"]))
+            continue
+        if result["incar"] is None:
+            unmatched.append((task, path, result["reason"]))
+            note_lines.append(f"- [❌]: {path}, desc: {task.name} [{task.precision}], note: {result['reason']}")
+            continue
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(format_incar(result["incar"], task.name))
+        generated.append((task, path, result["category"], result["notes"]))
+        notes = "; ".join(result["notes"]) or "none"
+        note_lines.append(f"- [✅]: {path}, desc: {task.name} [{task.precision}] "
+                          f"(rule-based, {result['category']}), note: {notes}")
+
+    note_path = os.path.join(output_dir, note_name)
+    if note_lines:
+        with open(note_path, "w", encoding="utf-8") as f:
+            f.write("# INCAR Note\n\n" + "\n".join(note_lines) + "\n")
+    return {"generated": generated, "unmatched": unmatched, "skipped": skipped, "note_path": note_path}
+
+
+__all__ = [
+    "PRECISION_SETTINGS",
+    "METHOD_RULES",
+    "FUNCTIONAL_RULES",
+    "PROPERTY_RULES",
+    "INCAR_RULES",
+    "Dependency",
+    "ChecklistTask",
+    "parse_checklist",
+    "format_incar",
+    "set_incar_tag",
+    "match_category",
+    "match_functional",
+    "build_incar",
+    "generate_incars",
+]
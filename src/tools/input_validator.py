@@ -0,0 +1,573 @@
+"""
+Rule-based consistency checks of VASP input sets.
+
+`check_inputs` reads INCAR, POSCAR, POTCAR and KPOINTS of a task directory
+with light-weight parsers (no pymatgen objects) and checks them against each
+other in a few milliseconds: POTCAR order vs POSCAR species, MAGMOM and
+LDAU* lengths, hybrid runs restarted non-self-consistently, missing LMAXMIX
+for DFT+U, ENCUT below ENMAX, too few bands, tetrahedron smearing with too few
+k-points, and similar mistakes that otherwise only show up after the job has
+spent its core-hours.
+
+Issues are "error" (the job would fail or give wrong results) or "warning".
+`validate_job_script` finds the task directories a PBS script runs in and is
+used by `tools.pbs_tools.qsub` as a pre-submission gate. `submit_vasp_job`
+is the agent-facing submit tool built on it, so agents submit through the
+gate instead of running qsub themselves.
+"""
+
+import os
+import re
+import shlex
+from typing import Annotated, Iterable, Optional
+
+from tools.poscar_io import load_structure
+
+INPUT_FILES = ("INCAR", "POSCAR", "POTCAR", "KPOINTS")
+
+_TRUE = (".true.", "true", "t", ".t.")
+
+
+def read_incar(path: str) -> dict[str, str]:
+    """
+    Parse an INCAR into upper-case tags and raw string values.
+
+    Comments (# or !) are dropped and ';' separates several tags on a line.
+
+    Args:
+        path: INCAR file.
+
+    Returns:
+        dict: Tag -> value string.
+    """
+    tags = {}
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            line = re.split(r"[#!]", line, maxsplit=1)[0]
+            for statement in line.split(";"):
+                if "=" in statement:
+                    tag, value = statement.split("=", 1)
+                    tag = tag.strip().upper()
+                    if tag:
+                        tags[tag] = value.strip()
+    return tags
+
+
+def _as_bool(value: Optional[str]) -> bool:
+    return value is not None and value.strip().lower() in _TRUE
+
+
+def _as_number(value: Optional[str]) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        return float(value.split()[0].lower().replace("d", "e"))
+    except (ValueError, IndexError):
+        return None
+
+
+def _expand_list(value: str) -> list[float]:
+    """Expand VASP list syntax ("2*5.0 1") to numbers."""
+    numbers = []
+    for token in value.split():
+        if "*" in token:
+            count, number = token.split("*", 1)
+            numbers.extend([float(number)] * int(float(count)))
+        else:
+            numbers.append(float(token))
+    return numbers
+
+
+def read_potcar_headers(path: str) -> list[dict]:
+    """
+    Symbol, element, functional, ZVAL and ENMAX of every entry in a POTCAR.
+
+    Args:
+        path: POTCAR file.
+
+    Returns:
+        list[dict]: One dict per concatenated single-element POTCAR.
+    """
+    entries = []
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            if "TITEL" in line:
+                titel = line.split("=", 1)[1].split()
+                symbol = titel[1] if len(titel) > 1 else titel[0]
+                entries.append({
+                    "functional": titel[0],
+                    "symbol": symbol,
+                    "element": re.split(r"[_.]", symbol)[0],
+                    "zval": None,
+                    "enmax": None,
+                })
+            elif entries and "ZVAL" in line and entries[-1]["zval"] is None:
+                match = re.search(r"ZVAL\s*=\s*([-\d.]+)", line)
+                if match:
+                    entries[-1]["zval"] = float(match.group(1))
+            elif entries and "ENMAX" in line and entries[-1]["enmax"] is None:
+                match = re.search(r"ENMAX\s*=\s*([-\d.]+)", line)
+                if match:
+                    entries[-1]["enmax"] = float(match.group(1))
+    return entries
+
+
+def read_kpoints(path: str) -> dict:
+    """
+    Mode and mesh of a KPOINTS file.
+
+    Args:
+        path: KPOINTS file.
+
+    Returns:
+        dict: {"mode": "automatic" | "explicit" | "line", "mesh": list[int] | None,
+        "gamma": True for Gamma-centered meshes, "count": number of k-points of
+        explicit and line-mode files, otherwise None}.
+    """
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        lines = [line.strip() for line in f]
+    count = int(float(lines[1].split()[0])) if len(lines) > 1 and lines[1] else 0
+    style = lines[2][:1].lower() if len(lines) > 2 and lines[2] else ""
+    if count == 0 and style in ("g", "m"):
+        mesh = [int(float(x)) for x in lines[3].split()[:3]] if len(lines) > 3 else None
+        return {"mode": "automatic", "mesh": mesh, "gamma": style == "g", "count": None}
+    if count == 0:
+        return {"mode": "automatic", "mesh": None, "gamma": False, "count": None}
+    if style == "l":
+        n_segments = sum(1 for line in lines[4:] if line.split()) // 2
+        return {"mode": "line", "mesh": None, "gamma": False, "count": count * n_segments}
+    return {"mode": "explicit", "mesh": None, "gamma": False, "count": count}
+
+
+def check_inputs(directory: str, incar_name: str = "INCAR", produced: Iterable[str] = ()) -> list[dict]:
+    """
+    Check the VASP input set of a task directory for inconsistencies.
+
+    Args:
+        directory: Task directory.
+        incar_name: INCAR file name inside the directory.
+        produced: Input files the job script creates in the directory before
+            VASP runs (e.g. POSCAR copied from a previous CONTCAR, POTCAR from
+            vaspkit). They are not read, and their absence is only a warning.
+
+    Returns:
+        list[dict]: Issues as {"level": "error" | "warning", "file": ..., "message": ...}.
+    """
+    issues = []
+    produced = set(produced)
+
+    def add(level: str, file: str, message: str) -> None:
+        issues.append({"level": level, "file": file, "message": message})
+
+    paths = {name: os.path.join(directory, incar_name if name == "INCAR" else name) for name in INPUT_FILES}
+    incar = read_incar(paths["INCAR"]) if os.path.isfile(paths["INCAR"]) else None
+    if incar is None:
+        add("error", "INCAR", f"{incar_name} is missing.")
+        incar = {}
+    # A file the job writes replaces the one on disk, so only files it does not create are read
+    available = {name: name not in produced and os.path.isfile(path) for name, path in paths.items()}
+    for name in ("POSCAR", "POTCAR", "KPOINTS"):
+        if name in produced and not os.path.isfile(paths[name]):
+            add("warning", name, f"{name} is not present yet; the job script creates it, "
+                                 f"so the checks that need it are skipped.")
+    for name in ("POSCAR", "POTCAR"):
+        if name not in produced and not available[name]:
+            add("error", name, f"{name} is missing.")
+    if "KPOINTS" not in produced and not available["KPOINTS"] and "KSPACING" not in incar:
+        add("error", "KPOINTS", "KPOINTS is missing and KSPACING is not set.")
+
+    symbols, counts = [], []
+    if available["POSCAR"]:
+        try:
+            symbols, counts = load_structure(paths["POSCAR"]).symbol_blocks
+        except Exception as e:
+            add("error", "POSCAR", f"POSCAR cannot be read: {e}")
+    nions = int(sum(counts))
+
+    potcars = read_potcar_headers(paths["POTCAR"]) if available["POTCAR"] else []
+    if available["POTCAR"] and not potcars:
+        add("error", "POTCAR", "POTCAR contains no TITEL entries.")
+    if potcars and symbols:
+        elements = [p["element"] for p in potcars]
+        if elements != symbols:
+            add("error", "POTCAR", f"POTCAR order {' '.join(elements)} does not match POSCAR species "
+                                   f"{' '.join(symbols)}.")
+    functionals = {p["functional"] for p in potcars}
+    if len(functionals) > 1:
+        add("error", "POTCAR", f"POTCAR mixes functionals: {', '.join(sorted(functionals))}.")
+
+    # Spin and MAGMOM
+    noncollinear = _as_bool(incar.get("LNONCOLLINEAR")) or _as_bool(incar.get("LSORBIT"))
+    ispin = int(_as_number(incar.get("ISPIN")) or 1)
+    if "MAGMOM" in incar and nions:
+        try:
+            magmom = _expand_list(incar["MAGMOM"])
+            expected = 3 * nions if noncollinear else nions
+            if len(magmom) != expected:
+                add("error", "INCAR", f"MAGMOM has {len(magmom)} values, expected {expected} "
+                                      f"({nions} ions{', noncollinear' if noncollinear else ''}).")
+        except ValueError:
+            add("error", "INCAR", f"MAGMOM cannot be parsed: {incar['MAGMOM']}")
+        if ispin != 2 and not noncollinear:
+            add("warning", "INCAR", "MAGMOM is set but ISPIN != 2; moments are ignored.")
+
+    # Charge density / wavefunction restarts
+    icharg = _as_number(incar.get("ICHARG"))
+    hybrid = _as_bool(incar.get("LHFCALC"))
+    if icharg is not None and icharg >= 10 and hybrid:
+        add("error", "INCAR", "ICHARG >= 10 (non-self-consistent) is not possible with LHFCALC = .TRUE.; "
+                              "hybrid band structures need zero-weight k-points in a self-consistent run.")
+    if (icharg is not None and int(icharg) % 10 == 1 and "CHGCAR" not in produced
+            and not os.path.isfile(os.path.join(directory, "CHGCAR"))):
+        add("warning", "CHGCAR", f"ICHARG = {int(icharg)} reads CHGCAR, which is not in the directory yet.")
+    if (int(_as_number(incar.get("ISTART")) or 0) > 0 and "WAVECAR" not in produced
+            and not os.path.isfile(os.path.join(directory, "WAVECAR"))):
+        add("warning", "WAVECAR", "ISTART > 0 but WAVECAR is not in the directory yet.")
+
+    # DFT+U
+    if _as_bool(incar.get("LDAU")):
+        ldaul = None
+        for tag in ("LDAUL", "LDAUU", "LDAUJ"):
+            if tag not in incar:
+                add("error", "INCAR", f"LDAU = .TRUE. but {tag} is missing.")
+                continue
+            try:
+                values = _expand_list(incar[tag])
+            except ValueError:
+                add("error", "INCAR", f"{tag} cannot be parsed: {incar[tag]}")
+                continue
+            if symbols and len(values) != len(symbols):
+                add("error", "INCAR", f"{tag} has {len(values)} values for {len(symbols)} species.")
+            if tag == "LDAUL":
+                ldaul = values
+        needed = 6 if ldaul and max(ldaul) >= 3 else 4 if ldaul and max(ldaul) >= 2 else None
+        lmaxmix = _as_number(incar.get("LMAXMIX"))
+        if needed and (lmaxmix is None or lmaxmix < needed):
+            level = "error" if icharg is not None and icharg >= 10 else "warning"
+            add(level, "INCAR", f"DFT+U with l = {int(max(ldaul))} needs LMAXMIX = {needed} "
+                                f"(is {'unset' if lmaxmix is None else int(lmaxmix)}).")
+
+    # Basis set and bands from the POTCAR data
+    if potcars and all(p["enmax"] for p in potcars):
+        max_enmax = max(p["enmax"] for p in potcars)
+        encut = _as_number(incar.get("ENCUT"))
+        if encut is not None and encut < max_enmax:
+            add("error", "INCAR", f"ENCUT = {encut:g} is below the largest ENMAX ({max_enmax:g} eV).")
+        elif (encut is not None and encut < 1.3 * max_enmax
+              and int(_as_number(incar.get("ISIF")) or 2) >= 3 and int(_as_number(incar.get("NSW")) or 0) > 0):
+            add("warning", "INCAR", f"Cell relaxation with ENCUT = {encut:g} < 1.3 x ENMAX "
+                                    f"({1.3 * max_enmax:.0f} eV) suffers from Pulay stress.")
+    if potcars and counts and len(potcars) == len(counts) and all(p["zval"] for p in potcars):
+        nelect = _as_number(incar.get("NELECT")) or sum(p["zval"] * n for p, n in zip(potcars, counts))
+        nbands = _as_number(incar.get("NBANDS"))
+        minimum = nelect if noncollinear else nelect / 2
+        if nbands is not None and nbands < minimum:
+            add("error", "INCAR", f"NBANDS = {int(nbands)} is too small for {nelect:g} electrons "
+                                  f"(at least {int(minimum + 0.999)}).")
+
+    # Ionic steps
+    ibrion = _as_number(incar.get("IBRION"))
+    nsw = int(_as_number(incar.get("NSW")) or 0)
+    if nsw > 0 and ibrion == -1:
+        add("warning", "INCAR", f"NSW = {nsw} but IBRION = -1: ions are not moved.")
+    if ibrion in (5, 6, 7, 8) and (int(_as_number(incar.get("NCORE")) or 1) > 1 or "NPAR" in incar):
+        add("error", "INCAR", f"IBRION = {int(ibrion)} (finite differences/DFPT) does not support NCORE/NPAR.")
+
+    # k-points
+    kpoints = None
+    if available["KPOINTS"]:
+        try:
+            kpoints = read_kpoints(paths["KPOINTS"])
+        except (ValueError, IndexError) as e:
+            add("error", "KPOINTS", f"KPOINTS cannot be parsed: {e}")
+    if kpoints and kpoints["mesh"] is not None and any(n < 1 for n in kpoints["mesh"]):
+        add("error", "KPOINTS", f"Invalid k-mesh {kpoints['mesh']}.")
+    ismear = _as_number(incar.get("ISMEAR"))
+    if ismear is not None and ismear <= -4 and kpoints:
+        n_kpoints = (kpoints["mesh"][0] * kpoints["mesh"][1] * kpoints["mesh"][2]
+                     if kpoints["mesh"] else kpoints["count"])
+        if kpoints["mode"] == "line" or (n_kpoints is not None and n_kpoints < 4):
+            add("error", "INCAR", f"ISMEAR = {int(ismear)} (tetrahedron) needs a regular mesh of at least 4 k-points.")
+    return issues
+
+
+# vaspkit tasks that write VASP input files
+_VASPKIT_OUTPUTS = {"101": ("INCAR",), "102": ("KPOINTS", "POTCAR"), "103": ("POTCAR",), "104": ("POTCAR",)}
+_COMMAND_SEPARATOR = re.compile(r"&&|\|\||;|\|")
+_ASSIGNMENT = re.compile(r"^(?:export\s+)?([A-Za-z_]\w*)=(\S*)$")
+_ARRAY_ASSIGNMENT = re.compile(r"^(?:export\s+)?[A-Za-z_]\w*=\((.*)\)$")
+_VARIABLE = re.compile(r"\$(?:\{([A-Za-z_]\w*)\}|([A-Za-z_]\w*))")
+_REDIRECT = re.compile(r"(?<![\d&<])>>?\s*([^\s;&|<>()]+)")
+_HEREDOC = re.compile(r"<<-?\s*['\"]?(\w+)['\"]?")
+
+
+def _split_words(command: str) -> list[str]:
+    try:
+        return shlex.split(command, comments=True)
+    except ValueError:
+        return command.split()
+
+
+def _scan_script(script_file: str, cwd: str, base: str, found: dict) -> None:
+    """
+    Follow a shell script line by line, tracking the working directory.
+
+    Records in `found` the task directories (directories with an INCAR the
+    script changes into or names), the input files the script creates in each
+    directory (cp/mv/ln targets, redirections, tee, vaspkit) and the shell
+    scripts it runs, which are scanned from the directory they are run in.
+    """
+    try:
+        with open(script_file, "r", encoding="utf-8", errors="replace") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return
+    found["scripts"].add(script_file)
+    variables = {"PBS_O_WORKDIR": base}
+    stack: list[str] = []
+    heredoc = None
+
+    def resolve(token: str) -> Optional[str]:
+        if "$" in token or "`" in token or not token:
+            return None
+        return os.path.normpath(os.path.join(cwd, os.path.expanduser(token)))
+
+    def note_path(path: Optional[str]) -> None:
+        if path and path not in found["directories"] and os.path.isfile(os.path.join(path, "INCAR")):
+            found["directories"].append(path)
+
+    def creates(path: Optional[str]) -> None:
+        if path and os.path.basename(path) in INPUT_FILES + ("CHGCAR", "WAVECAR"):
+            found["produced"].setdefault(os.path.dirname(path), set()).add(os.path.basename(path))
+
+    for line in lines:
+        if heredoc is not None:
+            if line.strip() == heredoc:
+                heredoc = None
+            continue
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        line = _VARIABLE.sub(lambda m: variables.get(m.group(1) or m.group(2), m.group(0)), line)
+        match = _HEREDOC.search(line)
+        if match:
+            heredoc = match.group(1)
+        if "vaspkit" in line:
+            for task in re.findall(r"(?<!\d)(10[1-4])(?!\d)", line):
+                for name in _VASPKIT_OUTPUTS[task]:
+                    creates(os.path.join(cwd, name))
+
+        for command in _COMMAND_SEPARATOR.split(line):
+            # Subshells "( ... )" restore the working directory; "{ ... }" groups do not
+            command = re.sub(r"^\{\s+|\s*\}$", "", command.strip())
+            opened = command.lstrip("( ")
+            stack.extend([cwd] * command[:len(command) - len(opened)].count("("))
+            command = opened
+            array = _ARRAY_ASSIGNMENT.match(command)
+            if array:
+                # NAME=(a b c): the elements may name task directories
+                for word in _split_words(array.group(1)):
+                    note_path(resolve(word))
+                continue
+            closes = max(0, command.count(")") - command.count("("))
+            if closes:
+                command = command.rstrip(") ")
+            for target in _REDIRECT.findall(command):
+                creates(resolve(target))
+            words = [w for w in _split_words(_REDIRECT.sub(" ", command))
+                     if w not in ("do", "then", "else", "!", "time", "exec")]
+            if words:
+                assignment = _ASSIGNMENT.match(words[0]) if len(words) == 1 else None
+                name = words[0]
+                if assignment:
+                    variables[assignment.group(1)] = assignment.group(2)
+                elif name == "cd" and len(words) > 1 and resolve(words[1]):
+                    cwd = resolve(words[1])
+                elif name in ("cp", "mv", "ln") and len([w for w in words[1:] if not w.startswith("-")]) > 1:
+                    *sources, target = [w for w in words[1:] if not w.startswith("-")]
+                    target = resolve(target)
+                    if target and (os.path.isdir(target) or len(sources) > 1 or words[-1].endswith("/")):
+                        for source in sources:
+                            creates(os.path.join(target, os.path.basename(source)))
+                    else:
+                        creates(target)
+                elif name == "tee":
+                    for word in words[1:]:
+                        if not word.startswith("-"):
+                            creates(resolve(word))
+                for word in words:
+                    path = resolve(word)
+                    if path and path.endswith(".sh") and os.path.isfile(path):
+                        if path not in found["scripts"]:
+                            _scan_script(path, cwd, base, found)
+                    else:
+                        note_path(path)
+                if name == "cd":
+                    note_path(cwd)
+            for _ in range(closes):
+                if stack:
+                    cwd = stack.pop()
+
+
+def validate_job_script(script_path: str) -> dict[str, list[dict]]:
+    """
+    Check every task directory a job script runs in.
+
+    The script is followed command by command from its own directory
+    ($PBS_O_WORKDIR): `cd` (including subshells and simple variables) moves
+    the working directory, and every directory with an INCAR that the script
+    changes into or names is checked. Shell scripts the job script runs (e.g.
+    `bash run_vasp_workflow.sh`) are followed the same way. Input files the
+    scripts create before running VASP (`cp ../1_relax/CONTCAR POSCAR`,
+    `vaspkit -task 103`, `cat > KPOINTS << EOF`, ...) may be missing.
+
+    Args:
+        script_path: PBS job script.
+
+    Returns:
+        dict: Task directory -> issues.
+    """
+    script_path = os.path.abspath(script_path)
+    if not os.path.isfile(script_path):
+        return {}
+    base = os.path.dirname(script_path)
+    found = {"directories": [], "produced": {}, "scripts": set()}
+    if os.path.isfile(os.path.join(base, "INCAR")):
+        found["directories"].append(base)
+    _scan_script(script_path, base, base, found)
+    return {directory: check_inputs(directory, produced=found["produced"].get(directory, ()))
+            for directory in found["directories"]}
+
+
+def format_issues(results: dict[str, list[dict]]) -> str:
+    """
+    Human-readable report of validation results.
+
+    Args:
+        results: Directory -> issues.
+
+    Returns:
+        str: Report, one line per issue.
+    """
+    lines = []
+    for directory, issues in results.items():
+        n_errors = sum(issue["level"] == "error" for issue in issues)
+        status = "❌" if n_errors else "✅"
+        lines.append(f"[{status}] {directory}: {n_errors} errors, {len(issues) - n_errors} warnings")
+        lines.extend(f"    {issue['level'].upper()} {issue['file']}: {issue['message']}" for issue in issues)
+    return "\n".join(lines)
+
+
+def validate_vasp_inputs(
+    directory: Annotated[
+        str,
+        "Task directory (with INCAR, POSCAR, POTCAR, KPOINTS), a root directory of many task directories, "
+        "or a job/workflow script (e.g. submit.pbs, run_vasp_workflow.sh) whose task directories are checked."
+    ],
+    recursive: Annotated[
+        bool,
+        "Check every task directory (any directory with an INCAR) below `directory`."
+    ] = False
+) -> str:
+    """
+    Check VASP input sets for inconsistencies before submission.
+
+    Rule-based and fast (milliseconds per directory): POTCAR order vs POSCAR
+    species, MAGMOM/LDAU* lengths, LMAXMIX for DFT+U, ICHARG=11 with hybrids,
+    ENCUT vs ENMAX, NBANDS vs NELECT, NCORE/NPAR with DFPT, tetrahedron method
+    with too few k-points, missing files and restart files.
+
+    Given a job or workflow script, the task directories it runs in are
+    checked as `submit_vasp_job` does: input files the script creates before
+    running VASP (POSCAR from a previous CONTCAR, POTCAR from vaspkit, ...)
+    may be missing.
+
+    Args:
+        directory: Task directory, root directory or job script.
+        recursive: Check all task directories below `directory`.
+
+    Returns:
+        str: Errors and warnings per task directory.
+
+    Example:
+        validate_vasp_inputs("calculations", recursive=True)
+        validate_vasp_inputs("run_vasp_workflow.sh")
+    """
+    if os.path.isfile(directory):
+        results = validate_job_script(directory)
+        if not results:
+            return f"No task directories (with INCAR) found in {directory}."
+        n_bad = sum(any(i["level"] == "error" for i in issues) for issues in results.values())
+        return f"Checked {len(results)} task directories, {n_bad} with errors.\n" + format_issues(results)
+    if not os.path.isdir(directory):
+        return f"Error: Not a directory: {directory}"
+    if recursive:
+        from tools.workspace import find_task_dirs
+        directories = find_task_dirs(directory, require=("INCAR",))
+    else:
+        directories = [directory]
+    if not directories:
+        return f"No task directories (with INCAR) found in {directory}."
+    results = {d: check_inputs(d) for d in directories}
+    n_bad = sum(any(i["level"] == "error" for i in issues) for issues in results.values())
+    return f"Checked {len(results)} task directories, {n_bad} with errors.\n" + format_issues(results)
+
+
+def submit_vasp_job(
+    script_path: Annotated[
+        str,
+        "PBS job script to submit (e.g. submit.pbs); qsub runs in its directory."
+    ],
+    queue: Annotated[
+        Optional[str],
+        "PBS queue name. None uses the default queue."
+    ] = None
+) -> str:
+    """
+    Validate the VASP inputs of a PBS job and submit it.
+
+    Every task directory the script (and any shell script it runs) works in
+    is checked with the rules of `validate_vasp_inputs` first. The job is not
+    submitted if any directory has errors; warnings are reported but do not
+    block the submission. qsub runs in the script's directory, which becomes
+    $PBS_O_WORKDIR of the job.
+
+    Args:
+        script_path: PBS job script.
+        queue: Optional PBS queue.
+
+    Returns:
+        str: Job ID, or the validation errors / qsub error.
+
+    Example:
+        submit_vasp_job("calc/submit.pbs", "workq")
+    """
+    from tools.pbs_tools import qsub
+
+    if not os.path.isfile(script_path):
+        return f"Error: Job script not found: {script_path}"
+    results = validate_job_script(script_path)
+    failed = {d: issues for d, issues in results.items() if any(i["level"] == "error" for i in issues)}
+    if failed:
+        return (f"Error: Input validation failed in {len(failed)} of {len(results)} task directories, "
+                f"job not submitted. Fix these inputs and submit again:\n{format_issues(failed)}")
+
+    directory, name = os.path.split(os.path.abspath(script_path))
+    result = qsub(name, queue=queue, cwd=directory, validate=False)
+    if result["status"] != "success":
+        return f"Error: {result['message']}"
+    warnings = {d: issues for d, issues in results.items() if issues}
+    return (f"Job submitted: {result['job_id']}"
+            + (f"\nWarnings:\n{format_issues(warnings)}" if warnings else ""))
+
+
+__all__ = [
+    "read_incar",
+    "read_potcar_headers",
+    "read_kpoints",
+    "check_inputs",
+    "validate_job_script",
+    "format_issues",
+    "validate_vasp_inputs",
+    "submit_vasp_job",
+]
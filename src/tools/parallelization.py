@@ -0,0 +1,514 @@
+"""
+KPAR / NCORE / MPI rank tuning for VASP jobs.
+
+VASP distributes the irreducible k-points over KPAR groups, the bands of a
+k-point over band groups, and the plane-wave coefficients (FFTs) of a band
+over NCORE ranks. Good values depend on the workload, so `tune_parallelization`
+estimates it before the job runs:
+- irreducible k-points from the KPOINTS mesh (or KSPACING) with spglib
+- NBANDS and ENCUT from the INCAR, the POTCAR or the POTCAR metadata index
+- the FFT grid and number of plane waves from the cell and ENCUT
+
+and evaluates a simple cost model for every valid (ranks, KPAR, NCORE)
+combination on the requested node layout. The model counts FFT work per
+rank, with a parallel efficiency that drops with every doubling of NCORE or
+of the band groups, once NCORE exceeds the FFT planes, and for FFT groups
+spanning nodes; it adds the bands VASP appends to fill all band groups and
+the orthogonalization work per k-point group. It ranks settings; it does not predict wall times.
+
+Measured timings override the model: `record_loop_timings` reads the LOOP
+times and the actual distribution (ranks, KPAR, NCORE) of finished OUTCARs
+into the vaspgo cache, and a later tuning of the same workload (composition,
+irreducible k-points, ENCUT) on the same number of cores picks the fastest
+measured setting.
+"""
+
+import math
+import os
+import re
+import time
+from typing import Annotated, Optional
+
+import numpy as np
+
+from tools.cache import get_cache_dir, load_json, locked, save_json
+from tools.input_validator import read_incar, read_kpoints, read_potcar_headers
+from tools.poscar_io import load_structure
+
+# hbar^2 / 2m_e in eV A^2: |G|max = sqrt(ENCUT / HBAR2_2M)
+HBAR2_2M = 3.80998212
+# Grid size in units of the cutoff sphere diameter per PREC (VASP's wrap-around free grid)
+FFT_GRID_FACTOR = {"accurate": 2.0, "high": 2.0, "normal": 1.5, "single": 1.5, "low": 1.5, "medium": 1.5}
+
+# Cost model constants: parallel efficiency per doubling of NCORE / band groups
+FFT_EFFICIENCY = 0.85
+BAND_EFFICIENCY = 0.9
+CROSS_NODE_PENALTY = 2.0    # FFT groups spanning nodes communicate over the network
+SUBSPACE_WEIGHT = 0.02      # weight of orthogonalization/subspace work (NBANDS^2 x NPLW)
+RANK_TOLERANCE = 0.03       # fewer ranks are preferred if within this fraction of the best cost
+
+# (mtime_ns of timings.json, parsed records); reloaded when another process rewrites the file
+_TIMINGS_CACHE: Optional[tuple[int, dict]] = None
+
+
+def fft_friendly(n: int) -> int:
+    """Smallest even number >= n whose prime factors are 2, 3, 5 and 7."""
+    n = max(int(n), 2)
+    while True:
+        if n % 2 == 0:
+            m = n
+            for p in (2, 3, 5, 7):
+                while m % p == 0:
+                    m //= p
+            if m == 1:
+                return n
+        n += 1
+
+
+def fft_grid(lattice, encut: float, prec: str = "normal") -> tuple[list[int], int]:
+    """
+    Estimated FFT grid and number of plane waves per k-point.
+
+    Args:
+        lattice: 3x3 lattice matrix in Angstroms (rows are lattice vectors).
+        encut: Plane-wave cutoff in eV.
+        prec: INCAR PREC (Normal, Accurate, ...).
+
+    Returns:
+        tuple: ([NGX, NGY, NGZ], number of plane waves).
+    """
+    lattice = np.asarray(lattice, dtype=float)
+    gcut = math.sqrt(encut / HBAR2_2M)
+    factor = FFT_GRID_FACTOR.get(prec.strip().lower(), 1.5)
+    lengths = np.linalg.norm(lattice, axis=1)
+    grid = [fft_friendly(math.ceil(factor * 2 * gcut * length / (2 * math.pi))) for length in lengths]
+    volume = abs(np.linalg.det(lattice))
+    n_plane_waves = int(4 / 3 * math.pi * gcut ** 3 * volume / (2 * math.pi) ** 3)
+    return grid, max(n_plane_waves, 1)
+
+
+def irreducible_kpoints(
+    structure,
+    mesh,
+    gamma: bool = True,
+    symprec: float = 1e-3,
+    time_reversal: bool = True,
+) -> int:
+    """
+    Number of irreducible k-points of a regular mesh (spglib).
+
+    Args:
+        structure: ArrayStructure.
+        mesh: Subdivisions along the reciprocal lattice vectors.
+        gamma: Gamma-centered mesh; False shifts even subdivisions (Monkhorst-Pack).
+        symprec: Symmetry tolerance.
+        time_reversal: Use time-reversal symmetry (k = -k).
+
+    Returns:
+        int: Number of irreducible k-points.
+    """
+    import spglib
+
+    _, numbers = np.unique(structure.species, return_inverse=True)
+    mesh = [int(n) for n in mesh]
+    shift = [0 if gamma else (n + 1) % 2 for n in mesh]
+    cell = (structure.lattice, structure.frac_coords, numbers)
+    result = spglib.get_ir_reciprocal_mesh(mesh, cell, is_shift=shift, is_time_reversal=time_reversal,
+                                           symprec=symprec)
+    if result is None:
+        return int(np.prod(mesh))
+    mapping, _ = result
+    return len(np.unique(mapping))
+
+
+def _divisors(n: int) -> list[int]:
+    return [d for d in range(1, n + 1) if n % d == 0]
+
+
+def _cost(n_kpoints: int, nbands: int, grid: list[int], n_plane_waves: int,
+          ranks: int, kpar: int, ncore: int, cores_per_node: int) -> tuple[float, int]:
+    """Relative cost of one electronic step and the NBANDS VASP would use."""
+    band_groups = ranks // (kpar * ncore)
+    nbands_used = math.ceil(nbands / band_groups) * band_groups
+    k_per_group = math.ceil(n_kpoints / kpar)
+    n_fft = int(np.prod(grid))
+    efficiency = FFT_EFFICIENCY ** math.log2(ncore) * BAND_EFFICIENCY ** math.log2(band_groups)
+    # Real-space FFT planes are distributed over the NCORE ranks
+    efficiency *= min(1.0, min(grid) / ncore)
+    if ncore > cores_per_node:
+        efficiency /= CROSS_NODE_PENALTY
+    fft = nbands_used * n_fft * math.log2(n_fft) / (ncore * band_groups * efficiency)
+    subspace = SUBSPACE_WEIGHT * nbands_used ** 2 * n_plane_waves / (ranks // kpar)
+    return k_per_group * (fft + subspace), nbands_used
+
+
+def rank_settings(
+    n_kpoints: int,
+    nbands: int,
+    grid: list[int],
+    n_plane_waves: int,
+    nodes: int,
+    cores_per_node: int,
+    allow_ncore: bool = True,
+) -> list[dict]:
+    """
+    All valid (ranks, KPAR, NCORE) settings, best first, by the cost model.
+
+    Ranks are the same on every node and divide the cores per node; KPAR
+    divides the ranks and is at most the number of k-points; NCORE divides
+    the ranks per k-point group, and there are at most NBANDS band groups.
+
+    Args:
+        n_kpoints: Irreducible k-points.
+        nbands: Number of bands.
+        grid: FFT grid.
+        n_plane_waves: Plane waves per k-point.
+        nodes: Number of nodes.
+        cores_per_node: Cores per node.
+        allow_ncore: False forces NCORE = 1 (e.g. finite differences / DFPT).
+
+    Returns:
+        list[dict]: {"ranks", "kpar", "ncore", "band_groups", "nbands", "cost"}.
+    """
+    settings = []
+    for per_node in _divisors(cores_per_node):
+        ranks = nodes * per_node
+        for kpar in _divisors(ranks):
+            if kpar > n_kpoints:
+                break
+            for ncore in _divisors(ranks // kpar) if allow_ncore else [1]:
+                band_groups = ranks // (kpar * ncore)
+                if band_groups > nbands:
+                    continue
+                cost, nbands_used = _cost(n_kpoints, nbands, grid, n_plane_waves,
+                                          ranks, kpar, ncore, cores_per_node)
+                settings.append({"ranks": ranks, "kpar": kpar, "ncore": ncore, "band_groups": band_groups,
+                                 "nbands": nbands_used, "cost": cost})
+    settings.sort(key=lambda s: (s["cost"], s["ranks"]))
+    if settings:
+        # Spare cores are worth more than the last few percent of speed-up
+        limit = settings[0]["cost"] * (1 + RANK_TOLERANCE)
+        near = sorted((s for s in settings if s["cost"] <= limit), key=lambda s: (s["ranks"], s["cost"]))
+        settings = near + [s for s in settings if s["cost"] > limit]
+    return settings
+
+
+def workload_key(composition: dict, n_kpoints: int, encut: float) -> str:
+    """Key identifying a workload in the timing records."""
+    formula = "".join(f"{element}{composition[element]}" for element in sorted(composition))
+    return f"{formula}|k{n_kpoints}|e{round(encut)}"
+
+
+def _timings_path():
+    return get_cache_dir("parallelization") / "timings.json"
+
+
+def _load_timings() -> dict:
+    """Timing records, re-read whenever timings.json changed on disk."""
+    global _TIMINGS_CACHE
+    path = _timings_path()
+    try:
+        mtime = path.stat().st_mtime_ns
+    except OSError:
+        return {}
+    if _TIMINGS_CACHE is None or _TIMINGS_CACHE[0] != mtime:
+        _TIMINGS_CACHE = (mtime, load_json(path, default={}))
+    return _TIMINGS_CACHE[1]
+
+
+_OUTCAR_PATTERNS = {
+    "ranks": re.compile(r"running on\s+(\d+)\s+total cores|running\s+(\d+)\s+mpi-ranks"),
+    "kpar": re.compile(r"distrk:\s+each k-point on\s+\d+\s+cores,\s+(\d+)\s+groups"),
+    "ncore": re.compile(r"distr:\s+one band on(?: NCORE=)?\s+(\d+)\s+cores"),
+    "nkpts": re.compile(r"NKPTS\s*=\s*(\d+)"),
+    "nbands": re.compile(r"NBANDS\s*=\s*(\d+)"),
+    "encut": re.compile(r"ENCUT\s*=\s*([\d.]+)"),
+    "ions": re.compile(r"ions per type\s*=\s*([\d\s]+)"),
+    "titel": re.compile(r"TITEL\s*=\s*\S+\s+(\S+)"),
+}
+_LOOP = re.compile(r"LOOP:\s+cpu time\s+[\d.]+:\s*real time\s+([\d.]+)")
+
+
+def parse_outcar_timing(outcar_path: str) -> Optional[dict]:
+    """
+    Parallel distribution, workload and mean LOOP (electronic step) time of an OUTCAR.
+
+    Args:
+        outcar_path: OUTCAR file.
+
+    Returns:
+        dict | None: {"key", "ranks", "kpar", "ncore", "nbands", "seconds", "steps"}
+        or None if the OUTCAR lacks any of them.
+    """
+    values = {}
+    loops = []
+    elements = []
+    with open(outcar_path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            if "LOOP:" in line:
+                match = _LOOP.search(line)
+                if match:
+                    loops.append(float(match.group(1)))
+                continue
+            for name, pattern in _OUTCAR_PATTERNS.items():
+                if name in values and name != "titel":
+                    continue
+                match = pattern.search(line)
+                if match is None:
+                    continue
+                if name == "titel":
+                    elements.append(re.split(r"[_.]", match.group(1))[0])
+                else:
+                    values[name] = next(g for g in match.groups() if g is not None)
+    required = ("ranks", "nkpts", "nbands", "encut", "ions")
+    if not loops or not elements or any(name not in values for name in required):
+        return None
+    counts = [int(n) for n in values["ions"].split()]
+    if len(counts) != len(elements):
+        return None
+    composition = {}
+    for element, count in zip(elements, counts):
+        composition[element] = composition.get(element, 0) + count
+    return {
+        "key": workload_key(composition, int(values["nkpts"]), float(values["encut"])),
+        "ranks": int(values["ranks"]),
+        "kpar": int(values.get("kpar", 1)),
+        "ncore": int(values.get("ncore", 1)),
+        "nbands": int(values["nbands"]),
+        "seconds": sum(loops) / len(loops),
+        "steps": len(loops),
+    }
+
+
+def record_loop_timings(
+    directory: Annotated[
+        str,
+        "Calculation directory; every OUTCAR below it is read."
+    ]
+) -> str:
+    """
+    Learn from finished jobs: store their LOOP timings for the parallelization tuner.
+
+    Reads the mean electronic-step (LOOP) wall time, the MPI rank count,
+    KPAR and NCORE and the workload (composition, irreducible k-points,
+    ENCUT) of every OUTCAR below `directory`. `tune_parallelization` later
+    uses the fastest measured setting for the same workload and core count.
+
+    Args:
+        directory: Calculation directory.
+
+    Returns:
+        str: Number of timings recorded per workload.
+
+    Example:
+        record_loop_timings("calculations")
+    """
+    from tools.workspace import find_files
+
+    if not os.path.isdir(directory):
+        return f"Error: Not a directory: {directory}"
+    parsed = []
+    for outcar in find_files(directory, ("OUTCAR",)):
+        outcar = os.path.abspath(outcar)
+        try:
+            timing = parse_outcar_timing(outcar)
+            mtime = os.path.getmtime(outcar)
+        except OSError:
+            continue
+        if timing is not None:
+            parsed.append((outcar, mtime, timing))
+
+    recorded = {}
+    if parsed:
+        # Read-modify-write under the lock so concurrent recorders don't drop each other's records
+        with locked(_timings_path()):
+            timings = load_json(_timings_path(), default={})
+            for outcar, mtime, timing in parsed:
+                key = timing.pop("key")
+                records = [r for r in timings.get(key, []) if r["source"] != outcar]
+                records.append(dict(timing, source=outcar, mtime=mtime, recorded_at=time.time()))
+                timings[key] = records
+                recorded[key] = recorded.get(key, 0) + 1
+            save_json(_timings_path(), timings)
+    if not recorded:
+        return f"No OUTCARs with LOOP timings found in {directory}."
+    return (f"Recorded {sum(recorded.values())} timings for {len(recorded)} workloads:\n"
+            + "\n".join(f"  {key}: {n}" for key, n in sorted(recorded.items())))
+
+
+def measured_best(key: str, ranks: int) -> Optional[dict]:
+    """Fastest recorded (KPAR, NCORE) for a workload on a given number of ranks."""
+    records = [r for r in _load_timings().get(key, []) if r["ranks"] == ranks]
+    return min(records, key=lambda r: r["seconds"]) if records else None
+
+
+def _workload(directory: str) -> dict:
+    """Structure, k-points, bands and FFT grid of a task directory."""
+    structure = load_structure(os.path.join(directory, "POSCAR"))
+    incar_path = os.path.join(directory, "INCAR")
+    incar = read_incar(incar_path) if os.path.isfile(incar_path) else {}
+    symbols, counts = structure.symbol_blocks
+
+    def number(tag):
+        try:
+            return float(incar[tag].split()[0].lower().replace("d", "e"))
+        except (KeyError, ValueError, IndexError):
+            return None
+
+    ispin = int(number("ISPIN") or 1)
+    noncollinear = any(incar.get(tag, "").strip().lower() in (".true.", "true", "t", ".t.")
+                       for tag in ("LSORBIT", "LNONCOLLINEAR"))
+    potcar_path = os.path.join(directory, "POTCAR")
+    potcars = read_potcar_headers(potcar_path) if os.path.isfile(potcar_path) else []
+    if len(potcars) == len(symbols) and all(p["zval"] and p["enmax"] for p in potcars):
+        from tools.potcar_metadata import default_nbands
+
+        nelect = sum(p["zval"] * n for p, n in zip(potcars, counts))
+        default_encut = math.ceil(1.3 * max(p["enmax"] for p in potcars) / 10) * 10
+        default_bands = default_nbands(nelect, int(sum(counts)), ispin)
+    else:
+        from tools.potcar_data import potcar_symbols
+        from tools.potcar_metadata import electronic_parameters
+
+        params = electronic_parameters(potcar_symbols(structure), counts, ispin=ispin)
+        default_encut, default_bands = params["encut"], params["nbands"]
+    encut = number("ENCUT") or default_encut
+    nbands = int(number("NBANDS") or (2 * default_bands if noncollinear else default_bands))
+
+    kpoints_path = os.path.join(directory, "KPOINTS")
+    kpoints = read_kpoints(kpoints_path) if os.path.isfile(kpoints_path) else None
+    if kpoints is not None and kpoints["count"] is not None:
+        n_kpoints, mesh = kpoints["count"], None
+    else:
+        if kpoints is not None and kpoints["mesh"] is not None:
+            mesh, gamma = kpoints["mesh"], kpoints["gamma"]
+        elif "KSPACING" in incar or kpoints is None:
+            spacing = number("KSPACING") or 0.5
+            reciprocal = 2 * math.pi * np.linalg.norm(np.linalg.inv(structure.lattice).T, axis=1)
+            mesh = [max(1, math.ceil(b / spacing)) for b in reciprocal]
+            gamma = incar.get("KGAMMA", ".TRUE.").strip().lower() in (".true.", "true", "t", ".t.")
+        else:
+            raise ValueError("KPOINTS without an explicit mesh (fully automatic mode) is not supported.")
+        if number("ISYM") in (0, -1):
+            n_kpoints = int(np.prod(mesh))
+        else:
+            n_kpoints = irreducible_kpoints(structure, mesh, gamma=gamma, time_reversal=not noncollinear)
+    grid, n_plane_waves = fft_grid(structure.lattice, encut, incar.get("PREC", "normal"))
+    ibrion = number("IBRION")
+    return {
+        "composition": structure.composition,
+        "mesh": mesh,
+        "n_kpoints": n_kpoints,
+        "nbands": nbands,
+        "encut": encut,
+        "ispin": ispin,
+        "grid": grid,
+        "n_plane_waves": n_plane_waves,
+        "allow_ncore": ibrion not in (5, 6, 7, 8),
+        "incar_path": incar_path if incar else None,
+    }
+
+
+def tune_parallelization(
+    directory: Annotated[
+        str,
+        "Task directory with a POSCAR and optionally INCAR, KPOINTS and POTCAR."
+    ],
+    nodes: Annotated[
+        int,
+        "Number of nodes requested for the job."
+    ] = 1,
+    cores_per_node: Annotated[
+        int,
+        "Physical cores per node."
+    ] = 64,
+    update_incar: Annotated[
+        bool,
+        "Write the chosen KPAR and NCORE into the task's INCAR."
+    ] = False
+) -> str:
+    """
+    Choose KPAR, NCORE and the MPI rank count for a VASP job on a node layout.
+
+    Uses the irreducible k-points (spglib, from KPOINTS or KSPACING), NBANDS
+    and ENCUT (INCAR, POTCAR or the POTCAR metadata index) and the FFT grid
+    estimated from the cell. Settings measured faster on earlier runs of the
+    same workload (see record_loop_timings) take precedence over the model.
+
+    Args:
+        directory: Task directory.
+        nodes: Number of nodes.
+        cores_per_node: Cores per node.
+        update_incar: Write KPAR/NCORE into the INCAR.
+
+    Returns:
+        str: Workload summary, recommended KPAR/NCORE/ranks and alternatives.
+
+    Example:
+        tune_parallelization("scf", nodes=2, cores_per_node=128, update_incar=True)
+    """
+    if nodes < 1 or cores_per_node < 1:
+        return "Error: nodes and cores_per_node must be positive."
+    if not os.path.isfile(os.path.join(directory, "POSCAR")):
+        return f"Error: No POSCAR in {directory}."
+    try:
+        workload = _workload(directory)
+    except (KeyError, ValueError, OSError) as e:
+        return f"Error: {e.args[0] if e.args else e}"
+
+    settings = rank_settings(workload["n_kpoints"], workload["nbands"], workload["grid"],
+                             workload["n_plane_waves"], nodes, cores_per_node, workload["allow_ncore"])
+    if not settings:
+        return "Error: No valid parallelization found."
+    best = settings[0]
+    key = workload_key(workload["composition"], workload["n_kpoints"], workload["encut"])
+    measured = measured_best(key, nodes * cores_per_node)
+    source = "cost model"
+    if measured is not None:
+        band_groups = measured["ranks"] // (measured["kpar"] * measured["ncore"])
+        best = {"ranks": measured["ranks"], "kpar": measured["kpar"], "ncore": measured["ncore"],
+                "band_groups": band_groups, "nbands": measured["nbands"], "cost": None}
+        source = f"fastest of earlier runs ({measured['seconds']:.1f} s per electronic step)"
+
+    mesh = "x".join(map(str, workload["mesh"])) if workload["mesh"] else "explicit"
+    lines = [
+        f"Parallelization for {directory} on {nodes} node(s) x {cores_per_node} cores:",
+        f"  Workload: {workload['n_kpoints']} irreducible k-points (mesh {mesh}), NBANDS = {workload['nbands']}, "
+        f"ENCUT = {workload['encut']:g}, FFT grid {'x'.join(map(str, workload['grid']))}, "
+        f"~{workload['n_plane_waves']} plane waves",
+        f"  Recommended: KPAR = {best['kpar']}, NCORE = {best['ncore']}, "
+        f"MPI ranks = {best['ranks']} ({best['ranks'] // nodes} per node)",
+        f"  Band groups = {best['band_groups']}, NBANDS used = {best['nbands']}",
+        f"  Source: {source}",
+    ]
+    if not workload["allow_ncore"]:
+        lines.append("  NCORE = 1: finite differences / DFPT (IBRION = 5-8) do not support band parallelization.")
+    if best["cost"] is not None and len(settings) > 1:
+        lines.append("  Alternatives (relative cost):")
+        for s in settings[1:4]:
+            lines.append(f"    KPAR = {s['kpar']}, NCORE = {s['ncore']}, ranks = {s['ranks']}: "
+                         f"{s['cost'] / settings[0]['cost']:.2f}")
+
+    if update_incar:
+        from tools.incar_rules import set_incar_tag
+
+        incar_path = os.path.join(directory, "INCAR")
+        text = open(incar_path, encoding="utf-8").read() if os.path.isfile(incar_path) else ""
+        text = set_incar_tag(text, "KPAR", best["kpar"])
+        text = set_incar_tag(text, "NCORE", best["ncore"])
+        with open(incar_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        lines.append(f"  Updated {incar_path}: KPAR = {best['kpar']}, NCORE = {best['ncore']}")
+    return "\n".join(lines)
+
+
+__all__ = [
+    "fft_grid",
+    "irreducible_kpoints",
+    "rank_settings",
+    "workload_key",
+    "parse_outcar_timing",
+    "record_loop_timings",
+    "measured_best",
+    "tune_parallelization",
+]
@@ -2,16 +2,18 @@
 PBS (Portable Batch System) management tools for querying and managing jobs.
 Provides common PBS operations like qstat, qsub, qdel, qhold, qrls.
 """
+import os
 import subprocess
-from typing import Dict, List, Optional, Tuple, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 
-def _run_pbs_command(command: List[str]) -> Tuple[str, int]:
+def _run_pbs_command(command: List[str], cwd: Optional[str] = None) -> Tuple[str, int]:
     """
     Execute a PBS command and return output and exit code.
     
     Args:
         command: List of command and arguments
+        cwd: Working directory of the command (None: current directory)
         
     Returns:
         Tuple of (stdout, exit_code)
@@ -21,7 +23,8 @@ def _run_pbs_command(command: List[str]) -> Tuple[str, int]:
             command,
             capture_output=True,
             text=True,
-            timeout=30
+            timeout=30,
+            cwd=cwd
         )
         return result.stdout, result.returncode
     except subprocess.TimeoutExpired:
@@ -251,19 +254,41 @@ def qstat_finished() -> Dict[str, Union[str, List[Dict]]]:
     }
 
 
-def qsub(script_path: str, queue: Optional[str] = None, options: Optional[List[str]] = None) -> Dict[str, str]:
+def qsub(script_path: str, queue: Optional[str] = None, options: Optional[List[str]] = None,
+         validate: bool = True, cwd: Optional[str] = None) -> Dict[str, Any]:
     """
     Submit a PBS job script.
     Equivalent to: qsub [-q queue] [-l options...] script_path
 
+    Unless validate is False, the VASP inputs of the task directories the
+    script runs in (see tools.input_validator.validate_job_script) are checked
+    first, and the job is not submitted if any check fails with an error.
+
     Args:
         script_path: Path to the PBS job script file
         queue: Optional queue name to submit to (e.g., "workq", "gpuq")
         options: Optional list of additional qsub options (e.g., ["-l", "nodes=2:ppn=16"])
+        validate: Check the VASP inputs before submitting
+        cwd: Directory qsub is run from (becomes $PBS_O_WORKDIR); script_path
+            is relative to it. None uses the current directory.
 
     Returns:
-        Dictionary with submission status and job ID if successful
+        Dictionary with submission status and job ID if successful; if the
+        validation fails, "issues" maps each failing task directory to its issues
     """
+    if validate:
+        from tools.input_validator import format_issues, validate_job_script
+
+        results = validate_job_script(os.path.join(cwd, script_path) if cwd else script_path)
+        failed = {d: issues for d, issues in results.items() if any(i["level"] == "error" for i in issues)}
+        if failed:
+            return {
+                "status": "error",
+                "message": f"Input validation failed in {len(failed)} of {len(results)} task directories, "
+                           f"job not submitted:\n{format_issues(failed)}",
+                "issues": failed
+            }
+
     command = ["qsub"]
 
     # Add queue option if specified
@@ -277,7 +302,7 @@ def qsub(script_path: str, queue: Optional[str] = None, options: Optional[List[s
     # Add the script path
     command.append(script_path)
 
-    stdout, exit_code = _run_pbs_command(command)
+    stdout, exit_code = _run_pbs_command(command, cwd=cwd)
 
     if exit_code == 0:
         # qsub typically returns the job ID on success
@@ -0,0 +1,435 @@
+"""
+Fast POSCAR/CONTCAR I/O backed by NumPy arrays.
+
+pymatgen's `Structure` keeps one `PeriodicSite` object per atom, which makes
+parsing and writing 5k-20k atom supercells or MD snapshots slow. This module
+provides a lightweight `ArrayStructure` that keeps the lattice, species and
+coordinates as plain arrays:
+- Vectorized POSCAR/CONTCAR reader and writer (VASP 4 and 5 formats)
+- Selective dynamics flags
+- Array-based supercell construction and species grouping
+- Conversion to/from pymatgen only when the full object model is needed
+"""
+
+import fnmatch
+import io
+import os
+from typing import Optional
+
+import numpy as np
+
+
+# Filename patterns handled by the fast POSCAR reader/writer
+POSCAR_PATTERNS = ["*POSCAR*", "*CONTCAR*", "*.vasp"]
+
+
+def is_poscar_file(path: str) -> bool:
+    """
+    Check whether a path looks like a VASP POSCAR/CONTCAR file.
+
+    Args:
+        path: File path to check.
+
+    Returns:
+        bool: True if the file name matches a POSCAR-like pattern.
+    """
+    name = os.path.basename(path)
+    return any(fnmatch.fnmatch(name, pattern) for pattern in POSCAR_PATTERNS)
+
+
+class ArrayStructure:
+    """NumPy-backed periodic structure for fast POSCAR handling."""
+
+    def __init__(
+        self,
+        lattice: np.ndarray,
+        species: np.ndarray,
+        frac_coords: np.ndarray,
+        selective_dynamics: Optional[np.ndarray] = None,
+        comment: str = "",
+    ) -> None:
+        """
+        Initialize ArrayStructure.
+
+        Args:
+            lattice: 3x3 lattice matrix in Angstroms, one lattice vector per row
+            species: Element symbol of each atom, shape (N,)
+            frac_coords: Fractional coordinates, shape (N, 3)
+            selective_dynamics: Optional boolean flags, shape (N, 3)
+            comment: Comment line (first line of the POSCAR)
+        """
+        self.lattice = np.asarray(lattice, dtype=float).reshape(3, 3)
+        self.species = np.asarray(species, dtype=str)
+        self.frac_coords = np.asarray(frac_coords, dtype=float).reshape(-1, 3)
+        self.selective_dynamics = (
+            None if selective_dynamics is None
+            else np.asarray(selective_dynamics, dtype=bool).reshape(-1, 3)
+        )
+        self.comment = comment
+
+        if len(self.species) != len(self.frac_coords):
+            raise ValueError(
+                f"Got {len(self.species)} species but {len(self.frac_coords)} coordinates."
+            )
+
+    def __len__(self) -> int:
+        return len(self.species)
+
+    @property
+    def cart_coords(self) -> np.ndarray:
+        """Cartesian coordinates in Angstroms, shape (N, 3)."""
+        return self.frac_coords @ self.lattice
+
+    @property
+    def volume(self) -> float:
+        """Cell volume in cubic Angstroms."""
+        return float(abs(np.linalg.det(self.lattice)))
+
+    @property
+    def abc(self) -> np.ndarray:
+        """Lattice vector lengths a, b, c in Angstroms."""
+        return np.linalg.norm(self.lattice, axis=1)
+
+    @property
+    def symbol_blocks(self) -> tuple[list[str], list[int]]:
+        """
+        Species blocks as written in the POSCAR header.
+
+        Consecutive atoms of the same element form one block, exactly as
+        VASP (and POTCAR ordering) expects.
+
+        Returns:
+            tuple: (symbols, counts) for each consecutive block.
+        """
+        if len(self.species) == 0:
+            return [], []
+        change = np.flatnonzero(self.species[1:] != self.species[:-1]) + 1
+        starts = np.concatenate(([0], change))
+        counts = np.diff(np.concatenate((starts, [len(self.species)])))
+        return self.species[starts].tolist(), counts.tolist()
+
+    @property
+    def composition(self) -> dict[str, int]:
+        """Element counts, in order of first appearance."""
+        symbols, first_idx, counts = np.unique(self.species, return_index=True, return_counts=True)
+        order = np.argsort(first_idx)
+        return {str(symbols[i]): int(counts[i]) for i in order}
+
+    def copy(self) -> "ArrayStructure":
+        """Return a deep copy of the structure."""
+        return ArrayStructure(
+            self.lattice.copy(),
+            self.species.copy(),
+            self.frac_coords.copy(),
+            None if self.selective_dynamics is None else self.selective_dynamics.copy(),
+            self.comment,
+        )
+
+    def replace_species(self, indices, symbol: str) -> "ArrayStructure":
+        """
+        Return a copy with the atoms at `indices` changed to another element.
+
+        Args:
+            indices: Atom indices (or boolean mask) to replace.
+            symbol: New element symbol.
+
+        Returns:
+            ArrayStructure: Modified copy; atom order is unchanged.
+        """
+        new = self.copy()
+        new.species = new.species.astype(np.result_type(new.species, np.array(symbol)))
+        new.species[indices] = symbol
+        return new
+
+    def group_species(self) -> "ArrayStructure":
+        """
+        Reorder atoms so that each element forms a single POSCAR block.
+
+        Elements keep the order of their first appearance and atoms keep their
+        relative order within each element (stable sort).
+
+        Returns:
+            ArrayStructure: New structure with grouped species.
+        """
+        _, first_idx, inverse = np.unique(self.species, return_index=True, return_inverse=True)
+        rank = np.argsort(np.argsort(first_idx))
+        order = np.argsort(rank[inverse], kind="stable")
+        return ArrayStructure(
+            self.lattice,
+            self.species[order],
+            self.frac_coords[order],
+            None if self.selective_dynamics is None else self.selective_dynamics[order],
+            self.comment,
+        )
+
+    def make_supercell(self, scaling_matrix) -> "ArrayStructure":
+        """
+        Build a supercell without creating per-site objects.
+
+        Atom ordering matches pymatgen's `Structure.make_supercell`: all images
+        of the first atom, then all images of the second atom, and so on.
+
+        Args:
+            scaling_matrix: 3x3 integer matrix, or 3 diagonal factors.
+
+        Returns:
+            ArrayStructure: The supercell, with coordinates folded into [0, 1).
+        """
+        matrix = np.asarray(scaling_matrix, dtype=int)
+        if matrix.shape == (3,):
+            matrix = np.diag(matrix)
+        if matrix.shape != (3, 3):
+            raise ValueError("Scaling matrix must be 3 values or a 3x3 matrix.")
+        det = int(round(abs(np.linalg.det(matrix))))
+        if det == 0:
+            raise ValueError("Scaling matrix is singular.")
+
+        inv_matrix = np.linalg.inv(matrix)
+
+        # Original lattice points inside the supercell (in supercell fractional coordinates)
+        corners = np.array(np.meshgrid([0, 1], [0, 1], [0, 1], indexing="ij")).reshape(3, -1).T
+        d_points = corners @ matrix
+        mins = d_points.min(axis=0)
+        maxes = d_points.max(axis=0) + 1
+        grid = np.array(np.meshgrid(
+            np.arange(mins[0], maxes[0]),
+            np.arange(mins[1], maxes[1]),
+            np.arange(mins[2], maxes[2]),
+            indexing="ij",
+        )).reshape(3, -1).T
+        frac_points = grid @ inv_matrix
+        inside = np.all((frac_points >= -1e-10) & (frac_points < 1 - 1e-10), axis=1)
+        t_vecs = frac_points[inside]
+        if len(t_vecs) != det:
+            raise ValueError("The number of lattice points does not match the supercell volume.")
+
+        # (N, 1, 3) + (1, P, 3) -> (N, P, 3): site-major ordering
+        new_frac = (self.frac_coords @ inv_matrix)[:, None, :] + t_vecs[None, :, :]
+        new_frac = np.mod(new_frac.reshape(-1, 3), 1.0)
+        new_frac[np.isclose(new_frac, 1.0, atol=1e-8)] = 0.0
+
+        return ArrayStructure(
+            matrix @ self.lattice,
+            np.repeat(self.species, det),
+            new_frac,
+            None if self.selective_dynamics is None
+            else np.repeat(self.selective_dynamics, det, axis=0),
+            self.comment,
+        )
+
+    @classmethod
+    def from_str(cls, text: str) -> "ArrayStructure":
+        """
+        Parse POSCAR/CONTCAR content.
+
+        Supports VASP 4 (species taken from the comment line) and VASP 5
+        formats, negative (volume) and per-axis scale factors, selective
+        dynamics and both Direct and Cartesian coordinates. Trailing data such
+        as CONTCAR velocities or per-line species labels is ignored.
+
+        Args:
+            text: POSCAR file content.
+
+        Returns:
+            ArrayStructure: Parsed structure.
+        """
+        lines = text.splitlines()
+        if len(lines) < 8:
+            raise ValueError("POSCAR content is too short.")
+
+        comment = lines[0].strip()
+        scale = np.array(lines[1].split()[:3], dtype=float)
+        lattice = np.array([ln.split()[:3] for ln in lines[2:5]], dtype=float)
+
+        # VASP 5 has a species line before the counts line
+        tokens = lines[5].split()
+        if tokens and not tokens[0].lstrip("+-").isdigit():
+            symbols = [t.split("/")[0].split("_")[0] for t in tokens]
+            counts = [int(x) for x in lines[6].split()[:len(symbols)]]
+            idx = 7
+        else:
+            counts = [int(x) for x in tokens if x.lstrip("+-").isdigit()]
+            symbols = comment.split()[:len(counts)]
+            if len(symbols) != len(counts):
+                raise ValueError(
+                    "VASP 4 POSCAR without species line: element symbols must be given "
+                    "in the comment line."
+                )
+            idx = 6
+
+        selective = lines[idx].strip()[:1].lower() == "s"
+        if selective:
+            idx += 1
+        cartesian = lines[idx].strip()[:1].lower() in ("c", "k")
+        idx += 1
+
+        n_atoms = sum(counts)
+        coord_lines = lines[idx:idx + n_atoms]
+        if len(coord_lines) < n_atoms:
+            raise ValueError(f"Expected {n_atoms} coordinate lines, found {len(coord_lines)}.")
+
+        coords = np.loadtxt(coord_lines, usecols=(0, 1, 2), dtype=float, ndmin=2, comments=None)
+        flags = None
+        if selective:
+            raw_flags = np.loadtxt(coord_lines, usecols=(3, 4, 5), dtype=str, ndmin=2, comments=None)
+            flags = np.char.upper(np.char.lstrip(raw_flags, ".")) == "T"
+
+        # Apply scale factor (negative single value means target volume)
+        if len(scale) == 1 and scale[0] < 0:
+            scale_vec = np.full(3, (-scale[0] / abs(np.linalg.det(lattice))) ** (1.0 / 3.0))
+        else:
+            scale_vec = np.broadcast_to(scale, (3,))
+        lattice = lattice * scale_vec[None, :]
+
+        if cartesian:
+            coords = np.linalg.solve(lattice.T, (coords * scale_vec[None, :]).T).T
+
+        species = np.repeat(np.array(symbols, dtype=str), counts)
+        return cls(lattice, species, coords, flags, comment)
+
+    @classmethod
+    def from_file(cls, path: str) -> "ArrayStructure":
+        """
+        Read a POSCAR/CONTCAR file.
+
+        Args:
+            path: Path to the POSCAR/CONTCAR file.
+
+        Returns:
+            ArrayStructure: Parsed structure.
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_str(f.read())
+
+    def to_str(self, comment: Optional[str] = None) -> str:
+        """
+        Render the structure in VASP 5 POSCAR format (Direct coordinates).
+
+        Args:
+            comment: Optional comment line; defaults to the stored comment or formula.
+
+        Returns:
+            str: POSCAR file content.
+        """
+        symbols, counts = self.symbol_blocks
+        if comment is None:
+            comment = self.comment or " ".join(f"{s}{c}" for s, c in self.composition.items())
+
+        buf = io.StringIO()
+        buf.write(comment.replace("\n", " ") + "\n")
+        buf.write("1.0\n")
+        np.savetxt(buf, self.lattice, fmt="%22.16f")
+        buf.write(" ".join(symbols) + "\n")
+        buf.write(" ".join(str(c) for c in counts) + "\n")
+        if self.selective_dynamics is not None:
+            buf.write("Selective dynamics\n")
+        buf.write("direct\n")
+
+        if self.selective_dynamics is None:
+            np.savetxt(buf, self.frac_coords, fmt="%.16f")
+        else:
+            flags = np.where(self.selective_dynamics, "T", "F")
+            table = np.empty((len(self), 6), dtype=object)
+            table[:, :3] = self.frac_coords
+            table[:, 3:] = flags
+            np.savetxt(buf, table, fmt=["%.16f"] * 3 + ["%s"] * 3)
+        return buf.getvalue()
+
+    def write(self, path: str, comment: Optional[str] = None) -> None:
+        """
+        Write the structure to a file.
+
+        POSCAR-like file names are written directly; any other format (CIF, etc.)
+        goes through pymatgen.
+
+        Args:
+            path: Output file path.
+            comment: Optional POSCAR comment line.
+        """
+        if is_poscar_file(path) or not os.path.splitext(path)[1]:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(self.to_str(comment))
+        else:
+            self.to_pymatgen().to(filename=path)
+
+    @classmethod
+    def from_pymatgen(cls, structure) -> "ArrayStructure":
+        """
+        Convert a pymatgen Structure (or Slab) into an ArrayStructure.
+
+        Args:
+            structure: pymatgen Structure.
+
+        Returns:
+            ArrayStructure: Array-backed copy of the structure.
+
+        Raises:
+            ValueError: If the structure has partially occupied (disordered) sites.
+        """
+        if not structure.is_ordered:
+            raise ValueError(
+                "Disordered structures (partial occupancies) cannot be written as a POSCAR; "
+                "order the structure first (e.g. OrderDisorderedStructureTransformation)."
+            )
+        flags = None
+        if "selective_dynamics" in structure.site_properties:
+            # Sites without flags (None, e.g. after merging an adsorbate into a slab) are free
+            flags = [
+                [True] * 3 if site_flags is None
+                else [True if flag is None else bool(flag) for flag in site_flags]
+                for site_flags in structure.site_properties["selective_dynamics"]
+            ]
+        return cls(
+            structure.lattice.matrix,
+            [sp.symbol for sp in structure.species],
+            structure.frac_coords,
+            flags,
+            structure.formula,
+        )
+
+    def to_pymatgen(self):
+        """
+        Convert to a pymatgen Structure.
+
+        Returns:
+            Structure: pymatgen structure with selective dynamics as site property.
+        """
+        from pymatgen.core import Structure
+
+        site_properties = None
+        if self.selective_dynamics is not None:
+            site_properties = {"selective_dynamics": self.selective_dynamics.tolist()}
+        return Structure(
+            self.lattice,
+            self.species.tolist(),
+            self.frac_coords,
+            site_properties=site_properties,
+        )
+
+
+def load_structure(path: str) -> ArrayStructure:
+    """
+    Load any structure file as an ArrayStructure.
+
+    POSCAR/CONTCAR/*.vasp files and files without extension (as written by
+    `ArrayStructure.write`) use the fast reader; other formats (CIF, etc.) are
+    parsed by pymatgen and converted.
+
+    Args:
+        path: Path to the structure file.
+
+    Returns:
+        ArrayStructure: Loaded structure.
+    """
+    if is_poscar_file(path) or not os.path.splitext(path)[1]:
+        return ArrayStructure.from_file(path)
+
+    from pymatgen.core import Structure
+    return ArrayStructure.from_pymatgen(Structure.from_file(path))
+
+
+__all__ = [
+    "ArrayStructure",
+    "is_poscar_file",
+    "load_structure",
+]
@@ -0,0 +1,285 @@
+"""
+POTCAR library lookup and assembly.
+
+`potcar_index` lists every pseudopotential available in the configured
+PMG_VASP_PSP_DIR for a functional, following the same directory layout as
+pymatgen's `PotcarSingle.from_symbol_and_functional`. The index is built once
+per process, so warm workers can resolve POTCAR paths without touching the
+file system again.
+
+`build_potcar` assembles a multi-element POTCAR by concatenating the raw
+text of each single-element POTCAR (the same output as pymatgen's
+`Potcar(symbols=...)`); raw texts are read once per process and cached
+until the file's size or modification time changes.
+
+`link_potcar` places a POTCAR in a task directory as a hardlink to a
+read-only copy in a content-addressed store, keyed by functional, element
+sequence and the path, size and modification time of each source file, so
+identical POTCARs across thousands of task directories share one file and
+an updated POTCAR library never reuses stale store files. The store lives in the vaspgo cache (`potcar_store`) unless
+VASPGO_POTCAR_STORE points elsewhere; put it on the same file system as the
+task directories (e.g. in the scratch workspace) so hardlinks are possible.
+When they are not, a plain copy is written: a symlink into the cache would
+break on compute nodes that do not mount the home directory, so symlinks are
+only used when explicitly requested.
+"""
+
+import hashlib
+import os
+import stat
+import tempfile
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Literal, Optional
+
+from tools.cache import get_cache_dir
+from tools.poscar_io import ArrayStructure
+
+LinkMode = Literal["hardlink", "symlink", "copy"]
+
+# (functional, symbol) -> (source stamp, raw single-element POTCAR text)
+_POTCAR_DATA_CACHE: dict[tuple[str, str], tuple[tuple, str]] = {}
+_POTCAR_DATA_LOCK = threading.Lock()
+
+
+def get_functional(functional: Optional[str] = None) -> str:
+    """
+    Resolve the POTCAR functional (pymatgen's PMG_DEFAULT_FUNCTIONAL by default).
+
+    Args:
+        functional: Functional name (e.g. "PBE", "PBE_54") or None.
+
+    Returns:
+        str: Functional name.
+    """
+    from pymatgen.core import SETTINGS
+
+    return functional or SETTINGS.get("PMG_DEFAULT_FUNCTIONAL", "PBE")
+
+
+@lru_cache(maxsize=None)
+def potcar_index(functional: Optional[str] = None) -> dict[str, str]:
+    """
+    Map POTCAR symbols (e.g. "Fe_pv") to POTCAR files for a functional.
+
+    Args:
+        functional: Functional name; defaults to PMG_DEFAULT_FUNCTIONAL.
+
+    Returns:
+        dict: Symbol to POTCAR path. Empty if PMG_VASP_PSP_DIR is not configured.
+    """
+    from pymatgen.core import SETTINGS
+    from pymatgen.io.vasp.inputs import PotcarSingle
+
+    functional = get_functional(functional)
+    psp_dir = SETTINGS.get("PMG_VASP_PSP_DIR")
+    if not psp_dir:
+        return {}
+    subdir = SETTINGS.get("PMG_VASP_PSP_SUB_DIRS", {}).get(functional, PotcarSingle.functional_dir[functional])
+    root = os.path.join(os.path.expanduser(psp_dir), subdir)
+    if not os.path.isdir(root):
+        return {}
+
+    index = {}
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                for name in ("POTCAR", "POTCAR.gz", "POTCAR.bz2", "POTCAR.Z"):
+                    path = os.path.join(entry.path, name)
+                    if os.path.isfile(path):
+                        index[entry.name] = path
+                        break
+            elif entry.name.startswith("POTCAR."):
+                # Flat layout: POTCAR.<symbol>[.gz]
+                symbol = entry.name[len("POTCAR."):]
+                for ext in (".gz", ".bz2", ".Z"):
+                    if symbol.endswith(ext):
+                        symbol = symbol[:-len(ext)]
+                index.setdefault(symbol, entry.path)
+    return index
+
+
+def _source_stamp(path: str) -> tuple[str, int, int]:
+    """Path, size and modification time of a POTCAR source file."""
+    info = os.stat(path)
+    return path, info.st_size, info.st_mtime_ns
+
+
+def get_potcar_data(symbol: str, functional: Optional[str] = None) -> str:
+    """
+    Raw text of a single-element POTCAR, read once per process.
+
+    Args:
+        symbol: POTCAR symbol, e.g. "Fe" or "Fe_pv".
+        functional: Functional name; defaults to PMG_DEFAULT_FUNCTIONAL.
+
+    Returns:
+        str: POTCAR text without leading/trailing newlines.
+
+    Raises:
+        FileNotFoundError: If the symbol is not available for the functional.
+    """
+    functional = get_functional(functional)
+    path = potcar_index(functional).get(symbol)
+    if path is None:
+        raise FileNotFoundError(
+            f"No POTCAR for symbol '{symbol}' and functional '{functional}' in PMG_VASP_PSP_DIR."
+        )
+    key = (functional, symbol)
+    stamp = _source_stamp(path)
+    cached = _POTCAR_DATA_CACHE.get(key)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    from monty.io import zopen
+    with zopen(path, mode="rt", encoding="utf-8") as f:
+        data = f.read().strip("\n")
+    with _POTCAR_DATA_LOCK:
+        _POTCAR_DATA_CACHE[key] = (stamp, data)
+    return data
+
+
+def potcar_symbols(structure: ArrayStructure) -> list[str]:
+    """
+    POTCAR symbols of a structure: one per species block, in POSCAR order.
+
+    Args:
+        structure: Structure whose POTCAR is needed.
+
+    Returns:
+        list[str]: Element symbols, e.g. ["Fe", "O"].
+    """
+    return structure.symbol_blocks[0]
+
+
+def build_potcar(symbols: list[str], functional: Optional[str] = None) -> str:
+    """
+    Assemble a POTCAR by concatenating cached single-element data.
+
+    Args:
+        symbols: POTCAR symbols in POSCAR species order.
+        functional: Functional name; defaults to PMG_DEFAULT_FUNCTIONAL.
+
+    Returns:
+        str: Full POTCAR text.
+    """
+    return "\n".join(get_potcar_data(symbol, functional) for symbol in symbols) + "\n"
+
+
+def get_potcar_store() -> Path:
+    """
+    Directory of the content-addressed POTCAR store.
+
+    Returns:
+        Path: VASPGO_POTCAR_STORE if set, else <vaspgo cache>/potcar_store.
+    """
+    store = os.getenv("VASPGO_POTCAR_STORE")
+    if store:
+        path = Path(store).expanduser()
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+    return get_cache_dir("potcar_store")
+
+
+def stored_potcar(symbols: list[str], functional: Optional[str] = None) -> Path:
+    """
+    Path of the stored POTCAR for an element sequence, creating it if needed.
+
+    Store files are written atomically and made read-only, since every task
+    directory linking to them shares the same bytes. The file name includes a
+    digest of the source files' path, size and modification time, so a
+    replaced or updated POTCAR library gets new store files.
+
+    Args:
+        symbols: POTCAR symbols in POSCAR species order.
+        functional: Functional name; defaults to PMG_DEFAULT_FUNCTIONAL.
+
+    Returns:
+        Path: Store file, e.g. <store>/PBE/Fe-O.<digest>.POTCAR.
+    """
+    functional = get_functional(functional)
+    index = potcar_index(functional)
+    # Unknown symbols make build_potcar raise below
+    sources = [_source_stamp(index[symbol]) if symbol in index else (symbol,) for symbol in symbols]
+    digest = hashlib.sha1(repr(sources).encode("utf-8")).hexdigest()[:12]
+    path = get_potcar_store() / functional / f"{'-'.join(symbols)}.{digest}.POTCAR"
+    if path.exists():
+        return path
+
+    content = build_potcar(symbols, functional)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.chmod(tmp_path, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return path
+
+
+def link_potcar(
+    symbols: list[str],
+    target: str,
+    functional: Optional[str] = None,
+    link_mode: LinkMode = "hardlink",
+) -> str:
+    """
+    Place a POTCAR at `target` as a link into the content-addressed store.
+
+    Falls back to a plain copy when the requested link cannot be created
+    (e.g. a hardlink to a store on another file system); it never falls back
+    to a symlink, whose target may not be visible on compute nodes. An
+    existing file at `target` is replaced atomically.
+
+    Args:
+        symbols: POTCAR symbols in POSCAR species order.
+        target: POTCAR path in the task directory.
+        functional: Functional name; defaults to PMG_DEFAULT_FUNCTIONAL.
+        link_mode: Preferred placement: "hardlink", "symlink" (only if the
+            store is reachable from the compute nodes) or "copy".
+
+    Returns:
+        str: The placement actually used ("hardlink", "symlink", "copy" or
+        "existing" if target already was a hardlink to the stored file).
+    """
+    source = stored_potcar(symbols, functional)
+    if os.path.exists(target) and not os.path.islink(target) and os.path.samefile(source, target):
+        return "existing"
+
+    modes = [link_mode, "copy"] if link_mode != "copy" else ["copy"]
+    target_dir = os.path.dirname(os.path.abspath(target))
+    for mode in modes:
+        tmp_path = os.path.join(target_dir, f".POTCAR.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            if mode == "hardlink":
+                os.link(source, tmp_path)
+            elif mode == "symlink":
+                os.symlink(os.path.abspath(source), tmp_path)
+            else:
+                with open(source, "rb") as src, open(tmp_path, "wb") as dst:
+                    dst.write(src.read())
+            os.replace(tmp_path, target)
+            return mode
+        except OSError:
+            if os.path.lexists(tmp_path):
+                os.remove(tmp_path)
+            if mode == "copy":
+                raise
+    return "copy"
+
+
+__all__ = [
+    "get_functional",
+    "potcar_index",
+    "get_potcar_data",
+    "potcar_symbols",
+    "build_potcar",
+    "get_potcar_store",
+    "stored_potcar",
+    "link_potcar",
+]
@@ -0,0 +1,271 @@
+"""
+POTCAR metadata index and ENCUT/NELECT/NBANDS estimation.
+
+Choosing ENCUT (1.3 x the largest ENMAX), NELECT (sum of ZVAL) or NBANDS
+only needs a few header values per POTCAR. `potcar_metadata` parses the
+header of every POTCAR variant in PMG_VASP_PSP_DIR once and stores the values
+as a compact column table in the vaspgo cache, so later processes load the
+whole library's metadata from one small JSON file in milliseconds. The table
+is rebuilt automatically when a POTCAR file is added, removed or modified
+(path, size and mtime_ns of every file).
+"""
+
+import hashlib
+import math
+import os
+import re
+from typing import Annotated, Optional
+
+from tools.cache import get_cache_dir, load_json, save_json
+from tools.potcar_data import get_functional, potcar_index, potcar_symbols
+
+# Table columns; "symbol" is the POTCAR symbol, "element" the element of VRHFIN
+COLUMNS = ("symbol", "element", "titel", "zval", "enmax", "enmin", "pomass", "rcore", "lexch")
+
+ENCUT_FACTOR = 1.3
+ENCUT_STEP = 10.0
+
+# Header bytes to read; the values above all precede the atomic configuration
+_HEADER_BYTES = 4096
+_FLOAT = r"([-+]?\d+(?:\.\d*)?)"
+_PATTERNS = {
+    "titel": re.compile(r"TITEL\s*=\s*(.+)"),
+    "element": re.compile(r"VRHFIN\s*=\s*([A-Za-z]+)"),
+    "zval": re.compile(r"ZVAL\s*=\s*" + _FLOAT),
+    "enmax": re.compile(r"ENMAX\s*=\s*" + _FLOAT),
+    "enmin": re.compile(r"ENMIN\s*=\s*" + _FLOAT),
+    "pomass": re.compile(r"POMASS\s*=\s*" + _FLOAT),
+    "rcore": re.compile(r"RCORE\s*=\s*" + _FLOAT),
+    "lexch": re.compile(r"LEXCH\s*=\s*(\w+)"),
+}
+_NUMERIC = {"zval", "enmax", "enmin", "pomass", "rcore"}
+
+# functional -> {symbol: metadata}
+_METADATA_CACHE: dict[str, dict[str, dict]] = {}
+
+
+def parse_potcar_header(path: str) -> dict:
+    """
+    Parse the metadata of a single-element POTCAR from its header.
+
+    Args:
+        path: POTCAR file (plain or compressed).
+
+    Returns:
+        dict: Values for the COLUMNS except "symbol"; missing values are None.
+    """
+    from monty.io import zopen
+
+    with zopen(path, mode="rt", encoding="utf-8", errors="replace") as f:
+        header = f.read(_HEADER_BYTES)
+    values = {}
+    for key, pattern in _PATTERNS.items():
+        match = pattern.search(header)
+        if match is None:
+            values[key] = None
+        elif key in _NUMERIC:
+            values[key] = float(match.group(1))
+        else:
+            values[key] = match.group(1).strip()
+    return values
+
+
+def _table_file(functional: str):
+    return get_cache_dir("potcar_metadata") / f"{functional}.json"
+
+
+def _signature(index: dict[str, str]) -> str:
+    digest = hashlib.sha1()
+    for path in sorted(index.values()):
+        try:
+            info = os.stat(path)
+            stamp = f"{info.st_mtime_ns}:{info.st_size}"
+        except OSError:
+            stamp = "missing"
+        digest.update(f"{path}|{stamp}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def potcar_metadata(functional: Optional[str] = None) -> dict[str, dict]:
+    """
+    Metadata of every POTCAR variant available for a functional.
+
+    Loaded from the cached table, or built from the POTCAR headers when the
+    table is missing or the POTCAR library changed.
+
+    Args:
+        functional: Functional name; defaults to PMG_DEFAULT_FUNCTIONAL.
+
+    Returns:
+        dict: POTCAR symbol -> {"element", "titel", "zval", "enmax", ...}.
+        Empty if PMG_VASP_PSP_DIR is not configured.
+    """
+    functional = get_functional(functional)
+    metadata = _METADATA_CACHE.get(functional)
+    if metadata is not None:
+        return metadata
+
+    index = potcar_index(functional)
+    signature = _signature(index)
+    path = _table_file(functional)
+    table = load_json(path, default={})
+    if table.get("signature") != signature or table.get("columns") != list(COLUMNS):
+        rows = []
+        for symbol, potcar_path in sorted(index.items()):
+            try:
+                values = parse_potcar_header(potcar_path)
+            except (OSError, UnicodeError):
+                continue
+            rows.append([symbol] + [values[column] for column in COLUMNS[1:]])
+        table = {"signature": signature, "columns": list(COLUMNS), "rows": rows}
+        if index:
+            save_json(path, table)
+
+    metadata = {row[0]: dict(zip(COLUMNS[1:], row[1:])) for row in table["rows"]}
+    _METADATA_CACHE[functional] = metadata
+    return metadata
+
+
+def default_nbands(nelect: float, nions: int, ispin: int = 1) -> int:
+    """
+    VASP's default NBANDS estimate.
+
+    max(NINT((NELECT + 2) / 2) + max(NIONS / 2, 3), 0.6 * NELECT); for ISPIN = 2
+    half of the default magnetic moments (1 per ion) is added to NELECT.
+
+    Args:
+        nelect: Number of valence electrons.
+        nions: Number of ions.
+        ispin: 1 (non-spin-polarized) or 2 (spin-polarized).
+
+    Returns:
+        int: Number of bands.
+    """
+    electrons = nelect + (nions / 2 if ispin == 2 else 0)
+    return max(int(round((electrons + 2) / 2)) + max(nions // 2, 3), int(0.6 * nelect))
+
+
+def electronic_parameters(
+    symbols: list[str],
+    counts: list[int],
+    functional: Optional[str] = None,
+    ispin: int = 1,
+    encut_factor: float = ENCUT_FACTOR,
+    band_multiple: int = 1,
+) -> dict:
+    """
+    Recommended ENCUT, NELECT and NBANDS from the POTCAR metadata index.
+
+    Args:
+        symbols: POTCAR symbols, one per species block (POSCAR order).
+        counts: Number of atoms in each block.
+        functional: Functional name; defaults to PMG_DEFAULT_FUNCTIONAL.
+        ispin: 1 or 2.
+        encut_factor: ENCUT = factor x max(ENMAX), rounded up to 10 eV.
+        band_multiple: Round NBANDS up to a multiple of this (e.g. cores per band group).
+
+    Returns:
+        dict: {"encut", "max_enmax", "nelect", "nbands", "nions", "potcars"},
+        where "potcars" lists the metadata of each symbol.
+
+    Raises:
+        KeyError: If a symbol is not in the POTCAR library.
+    """
+    metadata = potcar_metadata(functional)
+    missing = [symbol for symbol in symbols if symbol not in metadata]
+    if missing:
+        raise KeyError(f"No POTCAR metadata for {', '.join(missing)} "
+                       f"(functional {get_functional(functional)}).")
+    potcars = [dict(metadata[symbol], symbol=symbol) for symbol in symbols]
+
+    max_enmax = max(p["enmax"] for p in potcars)
+    encut = math.ceil(encut_factor * max_enmax / ENCUT_STEP) * ENCUT_STEP
+    nelect = sum(p["zval"] * count for p, count in zip(potcars, counts))
+    nions = int(sum(counts))
+    nbands = default_nbands(nelect, nions, ispin)
+    if band_multiple > 1:
+        nbands = math.ceil(nbands / band_multiple) * band_multiple
+    return {
+        "encut": encut,
+        "max_enmax": max_enmax,
+        "nelect": nelect,
+        "nbands": nbands,
+        "nions": nions,
+        "potcars": potcars,
+    }
+
+
+def estimate_electronic_parameters(
+    structure_path: Annotated[
+        str,
+        "Path to the structure file (POSCAR, CONTCAR, CIF, ...)."
+    ],
+    ispin: Annotated[
+        int,
+        "1 for non-spin-polarized, 2 for spin-polarized calculations."
+    ] = 1,
+    potcar_variants: Annotated[
+        Optional[list[str]],
+        "POTCAR symbols per species block (e.g. ['Fe_pv', 'O']). None uses the symbols gen_potcar writes."
+    ] = None,
+    band_multiple: Annotated[
+        int,
+        "Round NBANDS up to a multiple of this number (e.g. cores per band group); 1 keeps VASP's default."
+    ] = 1
+) -> str:
+    """
+    Recommend ENCUT, NELECT and NBANDS for a structure without reading POTCARs.
+
+    Values come from the POTCAR metadata index: ENCUT = 1.3 x the largest ENMAX
+    (rounded up to 10 eV), NELECT = sum of ZVAL over all atoms, NBANDS = VASP's
+    default for that NELECT and number of ions.
+
+    Args:
+        structure_path: Structure file.
+        ispin: Spin polarization (1 or 2).
+        potcar_variants: POTCAR symbols per species block, if not the plain elements.
+        band_multiple: Round NBANDS up to a multiple of this.
+
+    Returns:
+        str: Recommended values and the per-POTCAR ENMAX/ZVAL table.
+
+    Example:
+        estimate_electronic_parameters("relax/POSCAR", ispin=2)
+    """
+    from tools.poscar_io import load_structure
+
+    structure = load_structure(structure_path)
+    symbols, counts = structure.symbol_blocks
+    if potcar_variants is not None:
+        if len(potcar_variants) != len(symbols):
+            return (f"Error: {len(potcar_variants)} POTCAR symbols given for "
+                    f"{len(symbols)} species blocks ({' '.join(symbols)}).")
+        symbols = list(potcar_variants)
+    else:
+        symbols = potcar_symbols(structure)
+
+    try:
+        result = electronic_parameters(symbols, counts, ispin=ispin, band_multiple=band_multiple)
+    except KeyError as e:
+        return f"Error: {e.args[0]}"
+
+    lines = [
+        f"Electronic parameters for {structure_path} ({result['nions']} atoms, ISPIN = {ispin}):",
+        f"  ENCUT  = {result['encut']:.0f}   (1.3 x max ENMAX {result['max_enmax']:.3f} eV)",
+        f"  NELECT = {result['nelect']:g}",
+        f"  NBANDS = {result['nbands']}",
+        "",
+        "  POTCAR      count   ZVAL    ENMAX",
+    ]
+    for potcar, count in zip(result["potcars"], counts):
+        lines.append(f"  {potcar['symbol']:<10}  {count:>5}  {potcar['zval']:>5g}  {potcar['enmax']:>8.3f}")
+    return "\n".join(lines)
+
+
+__all__ = [
+    "parse_potcar_header",
+    "potcar_metadata",
+    "default_nbands",
+    "electronic_parameters",
+    "estimate_electronic_parameters",
+]
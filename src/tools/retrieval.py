@@ -0,0 +1,148 @@
+"""
+Local lexical (BM25) retrieval with optional local embeddings.
+
+`SearchIndex` ranks a small document collection, such as the INCAR and task
+example catalogs, against a free-text query without any network call or
+LLM turn. Ranking is Okapi BM25 over a tokenizer that also splits
+letter/digit runs ("HSE06" -> "hse06", "hse", "06"), so short technical terms
+match.
+
+Dense embeddings are optional: with VASPGO_LOCAL_EMBEDDINGS=1 (or
+`use_embeddings=True`) the documents are also embedded with Chroma's default
+local ONNX model (the one used by the RAG memory), and the final score is the
+mean of the max-normalized BM25 score and the cosine similarity. If the model
+cannot be loaded the index silently stays lexical.
+"""
+
+import math
+import os
+import re
+from collections import Counter
+from typing import Optional
+
+import numpy as np
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_STOPWORDS = frozenset(
+    "a an and are as at be by calculation calculations compute for from in into is of on or "
+    "the to using via with".split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Lower-case word tokens; mixed letter/digit words also yield their parts.
+
+    Args:
+        text: Text to tokenize.
+
+    Returns:
+        list[str]: Tokens without stop words.
+    """
+    tokens = []
+    for word in re.findall(r"[a-z0-9]+", text.casefold()):
+        if word in _STOPWORDS:
+            continue
+        tokens.append(word)
+        parts = re.findall(r"[a-z]+|[0-9]+", word)
+        if len(parts) > 1:
+            tokens.extend(part for part in parts if part not in _STOPWORDS)
+    return tokens
+
+
+def _embedding_function():
+    from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
+
+    return DefaultEmbeddingFunction()
+
+
+class SearchIndex:
+    """
+    BM25 index over a list of documents, optionally blended with local embeddings.
+
+    Args:
+        documents: Document texts.
+        use_embeddings: Also rank by local embeddings; None reads VASPGO_LOCAL_EMBEDDINGS.
+
+    Example:
+        index = SearchIndex(["HSE06 hybrid band structure", "PBE relaxation"])
+        index.search("hse band", k=1)  # [(0, score)]
+    """
+
+    def __init__(self, documents: list[str], use_embeddings: Optional[bool] = None):
+        self.documents = documents
+        tokenized = [tokenize(doc) for doc in documents]
+        self._term_freqs = [Counter(tokens) for tokens in tokenized]
+        self._lengths = np.array([len(tokens) for tokens in tokenized], dtype=float)
+        self._avg_length = float(self._lengths.mean()) if len(documents) else 0.0
+        doc_freqs = Counter(term for freqs in self._term_freqs for term in freqs)
+        n = len(documents)
+        self._idf = {term: math.log(1 + (n - df + 0.5) / (df + 0.5)) for term, df in doc_freqs.items()}
+
+        if use_embeddings is None:
+            use_embeddings = os.getenv("VASPGO_LOCAL_EMBEDDINGS", "").strip().lower() in ("1", "true", "yes")
+        self._embed = None
+        self._doc_vectors = None
+        if use_embeddings and documents:
+            try:
+                self._embed = _embedding_function()
+                self._doc_vectors = self._normalize(self._embed(documents))
+            except Exception:
+                self._embed = None
+
+    @staticmethod
+    def _normalize(vectors) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=float)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+    def bm25_scores(self, query: str) -> np.ndarray:
+        """
+        BM25 score of every document for a query.
+
+        Args:
+            query: Free-text query.
+
+        Returns:
+            np.ndarray: One score per document.
+        """
+        scores = np.zeros(len(self.documents))
+        if not len(self.documents):
+            return scores
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * self._lengths / max(self._avg_length, 1e-9))
+        for term in set(tokenize(query)):
+            idf = self._idf.get(term)
+            if idf is None:
+                continue
+            tf = np.array([freqs.get(term, 0) for freqs in self._term_freqs], dtype=float)
+            scores += idf * tf * (BM25_K1 + 1) / (tf + norm)
+        return scores
+
+    def search(self, query: str, k: int = 3) -> list[tuple[int, float]]:
+        """
+        Best matching documents for a query.
+
+        Args:
+            query: Free-text query.
+            k: Maximum number of results.
+
+        Returns:
+            list: (document index, score) pairs, best first; documents with a
+            zero score are left out.
+        """
+        scores = self.bm25_scores(query)
+        if scores.max(initial=0.0) > 0:
+            scores = scores / scores.max()
+        if self._embed is not None:
+            try:
+                query_vector = self._normalize(self._embed([query]))[0]
+                scores = 0.5 * scores + 0.5 * np.clip(self._doc_vectors @ query_vector, 0, None)
+            except Exception:
+                pass
+        order = np.argsort(-scores, kind="stable")[:k]
+        return [(int(i), float(scores[i])) for i in order if scores[i] > 0]
+
+
+__all__ = ["tokenize", "SearchIndex"]
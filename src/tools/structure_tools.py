@@ -3,15 +3,72 @@ Structure manipulation tools using pymatgen.
 
 This module provides tools for common structure operations:
 - Supercell generation
-- Surface/slab creation
+- Surface/slab creation (single facet or all facets and terminations)
 - Adsorbate placement
 - Element substitution
 
+POSCAR/CONTCAR files are read and written with the NumPy-backed
+`ArrayStructure` (see `tools.poscar_io`); pymatgen objects are only built
+when its surface/adsorption machinery is required.
+
+Every written structure of up to INDEX_MAX_ATOMS atoms is registered in the
+persistent fingerprint index (`tools.fingerprint.StructureIndex`); outputs
+equivalent to structures that were already generated or computed are
+reported, and dropped on request.
+
 All tools are wrapped in a StaticWorkbench for use with AutoGen agents.
 """
 
+import json
+import os
+from collections import OrderedDict
 from typing import Annotated, Literal, Optional
-from autogen_core.tools import FunctionTool, StaticWorkbench
+from autogen_core.tools import StaticWorkbench
+
+from tools.fingerprint import INDEX_MAX_ATOMS, StructureIndex, slab_fingerprint, structure_hash, surface_normal_heights
+from tools.poscar_io import ArrayStructure, load_structure
+from tools.worker_pool import nested_workers, pooled_tool
+from tools.workspace import find_task_dirs, outcar_finished
+
+
+def _register_outputs(
+    items: list[tuple[ArrayStructure, str]],
+    skip_duplicates: bool = False
+) -> tuple[list[str], str]:
+    """
+    Register written structures in the fingerprint index and report duplicates.
+    
+    Args:
+        items: (structure, path) pairs that have been written.
+        skip_duplicates: Delete files that duplicate already indexed structures.
+    
+    Returns:
+        tuple: (paths that were kept, report text; empty if there is nothing to report).
+    """
+    matches = StructureIndex().register_many(items)
+    
+    kept = []
+    lines = []
+    for (_, path), match in zip(items, matches):
+        # Only drop an output while the structure it duplicates is still on disk
+        if match is None or not os.path.isfile(match["path"]):
+            kept.append(path)
+            continue
+        if skip_duplicates:
+            os.remove(path)
+        else:
+            kept.append(path)
+        lines.append(f"    - {path} ≡ {match['path']} ({match['status']}, "
+                     f"{'skipped' if skip_duplicates else 'kept'})")
+    
+    report = ""
+    unindexed = sum(len(structure) > INDEX_MAX_ATOMS for structure, _ in items)
+    if unindexed:
+        report += (f"\n  Not checked for duplicates: {unindexed} structure(s) "
+                   f"above {INDEX_MAX_ATOMS} atoms")
+    if lines:
+        report += f"\n  Duplicates of indexed structures: {len(lines)}\n" + "\n".join(lines)
+    return kept, report
 
 
 def make_supercell(
@@ -27,7 +84,12 @@ def make_supercell(
         str,
         "Scaling matrix as 'a,b,c' for diagonal (e.g., '2,2,1') or "
         "'a11,a12,a13,a21,a22,a23,a31,a32,a33' for full 3x3 matrix."
-    ]
+    ],
+    skip_duplicates: Annotated[
+        bool,
+        "If True, outputs equivalent to already generated or computed structures are not kept "
+        "(they are always reported)."
+    ] = False
 ) -> str:
     """
     Create a supercell from the input structure.
@@ -40,6 +102,7 @@ def make_supercell(
         input_path: Path to input structure file.
         output_path: Path for output supercell structure.
         scaling_matrix: Scaling factors as comma-separated string.
+        skip_duplicates: Remove outputs equivalent to already indexed structures.
     
     Returns:
         str: Success message with supercell details.
@@ -47,9 +110,7 @@ def make_supercell(
     Example:
         make_supercell("POSCAR", "POSCAR_2x2x1", "2,2,1")
     """
-    from pymatgen.core import Structure
-    
-    structure = Structure.from_file(input_path)
+    structure = load_structure(input_path)
     original_atoms = len(structure)
     
     # Parse scaling matrix
@@ -63,14 +124,16 @@ def make_supercell(
     else:
         return f"Error: Invalid scaling matrix. Use 'a,b,c' or 9 values for 3x3 matrix."
     
-    supercell = structure.make_supercell(matrix, in_place=False)
-    supercell.to(filename=output_path)
+    supercell = structure.make_supercell(matrix)
+    supercell.write(output_path)
+    _, duplicates = _register_outputs([(supercell, output_path)], skip_duplicates)
     
     return (f"Supercell created at {output_path}\n"
             f"  Original: {original_atoms} atoms\n"
             f"  Supercell: {len(supercell)} atoms\n"
             f"  Scaling: {values[0] if len(values)==3 else 'custom'}x"
-            f"{values[1] if len(values)==3 else ''}x{values[2] if len(values)==3 else ''}")
+            f"{values[1] if len(values)==3 else ''}x{values[2] if len(values)==3 else ''}"
+            + duplicates)
 
 
 def make_slab(
@@ -97,7 +160,12 @@ def make_slab(
     center_slab: Annotated[
         bool,
         "Whether to center the slab in the cell."
-    ] = True
+    ] = True,
+    skip_duplicates: Annotated[
+        bool,
+        "If True, outputs equivalent to already generated or computed structures are not kept "
+        "(they are always reported)."
+    ] = False
 ) -> str:
     """
     Create a surface slab from a bulk structure.
@@ -112,6 +180,7 @@ def make_slab(
         min_slab_size: Minimum slab thickness in Angstroms.
         min_vacuum_size: Minimum vacuum thickness in Angstroms.
         center_slab: Whether to center the slab.
+        skip_duplicates: Remove outputs equivalent to already indexed structures.
     
     Returns:
         str: Success message with slab details.
@@ -119,10 +188,9 @@ def make_slab(
     Example:
         make_slab("POSCAR_bulk", "POSCAR_slab_111", "1,1,1", 10.0, 15.0)
     """
-    from pymatgen.core import Structure
     from pymatgen.core.surface import SlabGenerator
     
-    structure = Structure.from_file(input_path)
+    structure = load_structure(input_path).to_pymatgen()
     
     # Parse Miller indices
     hkl = tuple(int(x.strip()) for x in miller_index.split(','))
@@ -145,14 +213,312 @@ def make_slab(
     
     # Take the first (most stable) slab
     slab = slabs[0]
-    slab.to(filename=output_path)
+    slab_structure = ArrayStructure.from_pymatgen(slab)
+    slab_structure.write(output_path)
+    _, duplicates = _register_outputs([(slab_structure, output_path)], skip_duplicates)
     
     return (f"Slab created at {output_path}\n"
             f"  Surface: ({hkl[0]}{hkl[1]}{hkl[2]})\n"
             f"  Atoms: {len(slab)}\n"
             f"  Slab thickness: ~{min_slab_size} Å\n"
             f"  Vacuum: ~{min_vacuum_size} Å\n"
-            f"  Total slabs generated: {len(slabs)} (saved the first one)")
+            f"  Total slabs generated: {len(slabs)} (saved the first one)"
+            + duplicates)
+
+
+# Per-worker state for parallel slab enumeration
+_WORKER_BULK = None
+_WORKER_SLAB_KWARGS: dict = {}
+
+
+def _init_slab_worker(bulk, slab_kwargs: dict) -> None:
+    """Store the bulk structure and SlabGenerator settings once per worker process."""
+    global _WORKER_BULK, _WORKER_SLAB_KWARGS
+    _WORKER_BULK = bulk
+    _WORKER_SLAB_KWARGS = slab_kwargs
+
+
+def _generate_facet_slabs(hkl: tuple) -> list[tuple]:
+    """
+    Generate all terminations of one facet (runs in a worker).
+    
+    Returns:
+        list[tuple]: (shift, ArrayStructure) for every termination.
+    """
+    from pymatgen.core.surface import SlabGenerator
+    
+    slab_gen = SlabGenerator(_WORKER_BULK, miller_index=hkl, **_WORKER_SLAB_KWARGS)
+    return [(float(slab.shift), ArrayStructure.from_pymatgen(slab)) for slab in slab_gen.get_slabs()]
+
+
+def enumerate_slabs(
+    input_path: Annotated[
+        str,
+        "Path to the input bulk structure file (POSCAR, CIF, etc.)."
+    ],
+    output_dir: Annotated[
+        str,
+        "Directory where all slab structures and the manifest will be saved."
+    ],
+    max_index: Annotated[
+        int,
+        "Maximum Miller index; all symmetrically distinct (hkl) up to this value are generated."
+    ] = 1,
+    min_slab_size: Annotated[
+        float,
+        "Minimum slab thickness in Angstroms."
+    ] = 10.0,
+    min_vacuum_size: Annotated[
+        float,
+        "Minimum vacuum thickness in Angstroms."
+    ] = 15.0,
+    center_slab: Annotated[
+        bool,
+        "Whether to center the slab in the cell."
+    ] = True,
+    max_workers: Annotated[
+        Optional[int],
+        "Number of worker processes (one facet per task). None uses all CPUs, "
+        "or runs inline when called from the tool worker pool."
+    ] = None,
+    skip_duplicates: Annotated[
+        bool,
+        "If True, outputs equivalent to already generated or computed structures are not kept "
+        "(they are always reported)."
+    ] = False
+) -> str:
+    """
+    Generate slabs for every facet and every termination up to a maximum Miller index.
+    
+    This tool enumerates all symmetrically distinct (hkl) up to max_index, generates
+    every termination of each facet in parallel worker processes, drops equivalent
+    terminations using a fast layer-profile fingerprint, and writes each unique slab
+    to output_dir as POSCAR_slab_<hkl>_<termination>. A slab_manifest.json listing
+    every slab's Miller index, termination shift, atom count and thickness is written
+    alongside. Use it for surface-energy studies instead of calling make_slab per facet.
+    
+    Args:
+        input_path: Path to input bulk structure file.
+        output_dir: Directory for output slabs and manifest.
+        max_index: Maximum Miller index.
+        min_slab_size: Minimum slab thickness in Angstroms.
+        min_vacuum_size: Minimum vacuum thickness in Angstroms.
+        center_slab: Whether to center the slabs.
+        max_workers: Worker processes for slab generation.
+        skip_duplicates: Remove outputs equivalent to already indexed structures.
+    
+    Returns:
+        str: Summary table of generated slabs and the manifest location.
+    
+    Example:
+        enumerate_slabs("POSCAR_bulk", "slabs", 2, 10.0, 15.0)
+    """
+    from pymatgen.core.surface import get_symmetrically_distinct_miller_indices
+    from concurrent.futures import ProcessPoolExecutor
+    
+    if max_index < 1:
+        return "Error: max_index must be at least 1."
+    
+    bulk = load_structure(input_path).to_pymatgen()
+    miller_indices = [tuple(int(i) for i in hkl)
+                      for hkl in get_symmetrically_distinct_miller_indices(bulk, max_index)]
+    slab_kwargs = {
+        "min_slab_size": min_slab_size,
+        "min_vacuum_size": min_vacuum_size,
+        "center_slab": center_slab,
+        "in_unit_planes": False,
+    }
+    
+    n_workers = nested_workers(max_workers, len(miller_indices))
+    if n_workers > 1:
+        with ProcessPoolExecutor(
+            max_workers=n_workers,
+            initializer=_init_slab_worker,
+            initargs=(bulk, slab_kwargs),
+        ) as executor:
+            facet_slabs = list(executor.map(_generate_facet_slabs, miller_indices))
+    else:
+        _init_slab_worker(bulk, slab_kwargs)
+        facet_slabs = [_generate_facet_slabs(hkl) for hkl in miller_indices]
+    
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = []
+    written = []
+    rows = []
+    n_total = 0
+    for hkl, slabs in zip(miller_indices, facet_slabs):
+        hkl_label = "".join(str(i) for i in hkl)
+        seen = set()
+        for shift, slab in slabs:
+            n_total += 1
+            fingerprint = slab_fingerprint(slab)
+            if fingerprint in seen:
+                continue
+            seen.add(fingerprint)
+            
+            heights = surface_normal_heights(slab)
+            path = os.path.join(output_dir, f"POSCAR_slab_{hkl_label}_{len(seen) - 1}")
+            slab.write(path, comment=f"{slab.comment} ({hkl_label}) shift={shift:.4f}")
+            written.append((slab, path))
+            manifest.append({
+                "file": os.path.basename(path),
+                "miller_index": list(hkl),
+                "termination": len(seen) - 1,
+                "shift": round(shift, 6),
+                "n_atoms": len(slab),
+                "thickness": round(float(heights.max() - heights.min()), 4),
+                "fingerprint": fingerprint,
+            })
+        rows.append(f"  ({hkl_label:>6}) {len(slabs):>12d} {len(seen):>7d}")
+    
+    n_unique = len(manifest)
+    kept, duplicates = _register_outputs(written, skip_duplicates)
+    kept_names = {os.path.basename(path) for path in kept}
+    manifest = [entry for entry in manifest if entry["file"] in kept_names]
+    
+    manifest_path = os.path.join(output_dir, "slab_manifest.json")
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    
+    return (f"Slab enumeration completed in {output_dir}\n"
+            f"  Facets: {len(miller_indices)} (max index {max_index})\n"
+            f"  Terminations: {n_total} generated, {n_unique} unique\n"
+            f"  {'facet':>8} {'terminations':>12} {'unique':>7}\n"
+            + "\n".join(rows) + "\n"
+            f"  Manifest: {manifest_path} ({len(manifest)} slabs)"
+            + duplicates)
+
+
+# Adsorbate geometries, built once per process (see _get_molecules)
+_MOLECULES_CACHE: dict | None = None
+
+# Site-finder results keyed by (slab fingerprint, height); bounded LRU
+_SITE_CACHE: "OrderedDict[tuple, tuple]" = OrderedDict()
+_SITE_CACHE_SIZE = 16
+
+# Per-worker state for parallel adsorbate structure generation
+_WORKER_ASF = None
+_WORKER_MOL = None
+
+
+def _get_molecules() -> dict:
+    """
+    Build the table of common adsorbate molecules with caching.
+    
+    Returns:
+        dict: Mapping of adsorbate name to pymatgen Molecule.
+    """
+    global _MOLECULES_CACHE
+    if _MOLECULES_CACHE is None:
+        from pymatgen.core import Molecule
+        
+        _MOLECULES_CACHE = {
+            'H': Molecule(['H'], [[0, 0, 0]]),
+            'O': Molecule(['O'], [[0, 0, 0]]),
+            'N': Molecule(['N'], [[0, 0, 0]]),
+            'C': Molecule(['C'], [[0, 0, 0]]),
+            'H2': Molecule(['H', 'H'], [[0, 0, 0], [0, 0, 0.74]]),
+            'O2': Molecule(['O', 'O'], [[0, 0, 0], [0, 0, 1.21]]),
+            'N2': Molecule(['N', 'N'], [[0, 0, 0], [0, 0, 1.10]]),
+            'CO': Molecule(['C', 'O'], [[0, 0, 0], [0, 0, 1.13]]),
+            'CO2': Molecule(['C', 'O', 'O'], [[0, 0, 0], [0, 0, 1.16], [0, 0, -1.16]]),
+            'H2O': Molecule(['O', 'H', 'H'], [[0, 0, 0], [0.76, 0.59, 0], [-0.76, 0.59, 0]]),
+            'OH': Molecule(['O', 'H'], [[0, 0, 0], [0, 0, 0.97]]),
+            'NH3': Molecule(['N', 'H', 'H', 'H'], 
+                           [[0, 0, 0], [0, 0.94, 0.38], [0.81, -0.47, 0.38], [-0.81, -0.47, 0.38]]),
+            'CH4': Molecule(['C', 'H', 'H', 'H', 'H'],
+                           [[0, 0, 0], [0.63, 0.63, 0.63], [-0.63, -0.63, 0.63], 
+                            [-0.63, 0.63, -0.63], [0.63, -0.63, -0.63]]),
+        }
+    return _MOLECULES_CACHE
+
+
+def _group_equivalent_sites(slab, sites_dict: dict, tol: float = 1e-2) -> list[tuple]:
+    """
+    Group adsorption sites that are equivalent under the slab's symmetry operations.
+    
+    Args:
+        slab: pymatgen Structure of the slab.
+        sites_dict: Site type -> list of Cartesian coordinates (unreduced).
+        tol: Fractional-coordinate tolerance for equivalence.
+    
+    Returns:
+        list[tuple]: (site_type, representative Cartesian coords, multiplicity) per group.
+    """
+    from pymatgen.symmetry.analyzer import SpacegroupAnalyzer
+    import numpy as np
+    
+    ops = SpacegroupAnalyzer(slab, 0.1).get_symmetry_operations()
+    rotations = np.array([op.rotation_matrix for op in ops])
+    translations = np.array([op.translation_vector for op in ops])
+    
+    groups = []
+    for site_type in ("ontop", "bridge", "hollow"):
+        coords = np.asarray(sites_dict.get(site_type, []), dtype=float).reshape(-1, 3)
+        if len(coords) == 0:
+            continue
+        frac = slab.lattice.get_fractional_coords(coords)
+        # images[k, i] = op_k applied to site i; equivalent[i, j] if any image of i hits j
+        images = np.einsum("kab,ib->kia", rotations, frac) + translations[:, None, :]
+        diff = images[:, :, None, :] - frac[None, None, :, :]
+        diff -= np.round(diff)
+        equivalent = np.any(np.all(np.abs(diff) < tol, axis=3), axis=0)
+        
+        assigned = np.zeros(len(coords), dtype=bool)
+        for i in range(len(coords)):
+            if assigned[i]:
+                continue
+            members = equivalent[i] & ~assigned
+            members[i] = True
+            assigned |= members
+            groups.append((site_type, coords[i], int(members.sum())))
+    return groups
+
+
+def _find_site_groups(slab_structure: ArrayStructure, height: float) -> tuple:
+    """
+    Find and group adsorption sites for a slab, reusing cached results.
+    
+    Args:
+        slab_structure: Slab as an ArrayStructure.
+        height: Adsorbate height above the surface in Angstroms.
+    
+    Returns:
+        tuple: (AdsorbateSiteFinder, grouped sites, cache hit flag).
+    """
+    from pymatgen.analysis.adsorption import AdsorbateSiteFinder
+    
+    key = (structure_hash(slab_structure), round(float(height), 4))
+    if key in _SITE_CACHE:
+        _SITE_CACHE.move_to_end(key)
+        asf, groups = _SITE_CACHE[key]
+        return asf, groups, True
+    
+    slab = slab_structure.to_pymatgen()
+    asf = AdsorbateSiteFinder(slab)
+    sites_dict = asf.find_adsorption_sites(distance=height, symm_reduce=0)
+    groups = _group_equivalent_sites(asf.slab, sites_dict)
+    
+    _SITE_CACHE[key] = (asf, groups)
+    if len(_SITE_CACHE) > _SITE_CACHE_SIZE:
+        _SITE_CACHE.popitem(last=False)
+    return asf, groups, False
+
+
+def _init_adsorbate_worker(asf, mol) -> None:
+    """Store the site finder and molecule once per worker process."""
+    global _WORKER_ASF, _WORKER_MOL
+    _WORKER_ASF = asf
+    _WORKER_MOL = mol
+
+
+def _write_adsorbate_structure(site_coords, repeat: list[int], path: str) -> tuple[ArrayStructure, str]:
+    """Build one adsorbate configuration and write it (runs in a worker)."""
+    ads_struct = ArrayStructure.from_pymatgen(
+        _WORKER_ASF.add_adsorbate(_WORKER_MOL, site_coords, repeat=repeat)
+    )
+    ads_struct.write(path)
+    return ads_struct, path
 
 
 def add_adsorbate(
@@ -181,14 +547,26 @@ def add_adsorbate(
         str,
         "Repeat pattern for adsorbate placement as 'a,b,c' (e.g., '1,1,1' for single adsorbate, "
         "'2,2,1' to place adsorbates on a 2x2 supercell pattern)."
-    ] = "2,2,1"
+    ] = "2,2,1",
+    max_workers: Annotated[
+        Optional[int],
+        "Number of worker processes used to build and write structures. None uses all CPUs, "
+        "or runs inline when called from the tool worker pool."
+    ] = None,
+    skip_duplicates: Annotated[
+        bool,
+        "If True, outputs equivalent to already generated or computed structures are not kept "
+        "(they are always reported)."
+    ] = False
 ) -> str:
     """
     Add an adsorbate molecule to a slab surface.
     
-    This tool places an adsorbate at ALL found adsorption sites of the specified
-    type on the surface. Supports common molecules and single atoms. The repeat 
-    parameter controls how many copies of the adsorbate are placed.
+    This tool places an adsorbate at every symmetrically distinct adsorption site of
+    the specified type on the surface. Sites that are equivalent under the slab's
+    symmetry are grouped first, so only one structure is generated per group.
+    Supports common molecules and single atoms. The repeat parameter controls how
+    many copies of the adsorbate are placed.
     
     Output files will be suffixed with the site index (e.g. output_path_0, output_path_1).
     
@@ -199,6 +577,8 @@ def add_adsorbate(
         site_type: Type of adsorption site.
         height: Height above surface in Angstroms.
         repeat: Repeat pattern for adsorbate placement (e.g., '2,2,1').
+        max_workers: Worker processes for structure generation.
+        skip_duplicates: Remove outputs equivalent to already indexed structures.
     
     Returns:
         str: Success message with details of generated files.
@@ -206,32 +586,10 @@ def add_adsorbate(
     Example:
         add_adsorbate("POSCAR_slab", "POSCAR_slab_H", "H", "ontop", 1.5, "2,2,1")
     """
-    from pymatgen.core import Structure, Molecule
-    from pymatgen.analysis.adsorption import AdsorbateSiteFinder
-    import os
-    
-    slab = Structure.from_file(slab_path)
-    
-    # Create adsorbate molecule
-    # Common molecules with their geometries
-    molecules = {
-        'H': Molecule(['H'], [[0, 0, 0]]),
-        'O': Molecule(['O'], [[0, 0, 0]]),
-        'N': Molecule(['N'], [[0, 0, 0]]),
-        'C': Molecule(['C'], [[0, 0, 0]]),
-        'H2': Molecule(['H', 'H'], [[0, 0, 0], [0, 0, 0.74]]),
-        'O2': Molecule(['O', 'O'], [[0, 0, 0], [0, 0, 1.21]]),
-        'N2': Molecule(['N', 'N'], [[0, 0, 0], [0, 0, 1.10]]),
-        'CO': Molecule(['C', 'O'], [[0, 0, 0], [0, 0, 1.13]]),
-        'CO2': Molecule(['C', 'O', 'O'], [[0, 0, 0], [0, 0, 1.16], [0, 0, -1.16]]),
-        'H2O': Molecule(['O', 'H', 'H'], [[0, 0, 0], [0.76, 0.59, 0], [-0.76, 0.59, 0]]),
-        'OH': Molecule(['O', 'H'], [[0, 0, 0], [0, 0, 0.97]]),
-        'NH3': Molecule(['N', 'H', 'H', 'H'], 
-                       [[0, 0, 0], [0, 0.94, 0.38], [0.81, -0.47, 0.38], [-0.81, -0.47, 0.38]]),
-        'CH4': Molecule(['C', 'H', 'H', 'H', 'H'],
-                       [[0, 0, 0], [0.63, 0.63, 0.63], [-0.63, -0.63, 0.63], 
-                        [-0.63, 0.63, -0.63], [0.63, -0.63, -0.63]]),
-    }
+    from pymatgen.core import Molecule
+    from concurrent.futures import ProcessPoolExecutor
+    
+    molecules = _get_molecules()
     
     if adsorbate.upper() in molecules:
         mol = molecules[adsorbate.upper()]
@@ -244,19 +602,6 @@ def add_adsorbate(
         except Exception as e:
             return f"Error: Unknown adsorbate '{adsorbate}'. Supported: {list(molecules.keys())}"
     
-    # Find adsorption sites
-    asf = AdsorbateSiteFinder(slab)
-    sites_dict = asf.find_adsorption_sites()
-    
-    target_sites = []
-    if site_type == "all":
-        target_sites = sites_dict.get('ontop', []) + sites_dict.get('bridge', []) + sites_dict.get('hollow', [])
-    else:
-        target_sites = sites_dict.get(site_type, [])
-        
-    if not target_sites:
-        return f"Error: No {site_type} sites found. Available types: {list(sites_dict.keys())}"
-    
     # Parse repeat pattern
     try:
         repeat_list = [int(x.strip()) for x in repeat.split(',')]
@@ -265,29 +610,54 @@ def add_adsorbate(
     except ValueError:
         return "Error: repeat values must be integers (e.g., '1,1,1')."
     
-    # Generate structures for all sites
-    generated_files = []
+    # Find (or reuse) symmetry-grouped adsorption sites
+    asf, groups, cached = _find_site_groups(load_structure(slab_path), height)
+    
+    if site_type == "all":
+        target_groups = groups
+    else:
+        target_groups = [g for g in groups if g[0] == site_type]
+        
+    if not target_groups:
+        available = sorted({g[0] for g in groups})
+        return f"Error: No {site_type} sites found. Available types: {available}"
+    
+    # Generate structures for one representative site per group
     base_name, ext = os.path.splitext(output_path)
     if not ext:
         ext = "" # Handle case where no extension
     
-    for i, site in enumerate(target_sites):
-        ads_struct = asf.add_adsorbate(mol, site, repeat=repeat_list)
-        
-        # Construct filename with index
-        # If output_path is "POSCAR", result is "POSCAR_0", "POSCAR_1"
-        # If output_path is "structure.vasp", result is "structure_0.vasp"
-        current_output_path = f"{base_name}_{i}{ext}"
-        
-        ads_struct.to(filename=current_output_path)
-        generated_files.append(current_output_path)
+    # If output_path is "POSCAR", result is "POSCAR_0", "POSCAR_1"
+    # If output_path is "structure.vasp", result is "structure_0.vasp"
+    jobs = [(coords, repeat_list, f"{base_name}_{i}{ext}") for i, (_, coords, _) in enumerate(target_groups)]
+    
+    n_workers = nested_workers(max_workers, len(jobs))
+    if n_workers > 1:
+        with ProcessPoolExecutor(
+            max_workers=n_workers,
+            initializer=_init_adsorbate_worker,
+            initargs=(asf, mol),
+        ) as executor:
+            written = list(executor.map(_write_adsorbate_structure, *zip(*jobs)))
+    else:
+        _init_adsorbate_worker(asf, mol)
+        written = [_write_adsorbate_structure(*job) for job in jobs]
+    
+    kept, duplicates = _register_outputs(written, skip_duplicates)
+    kept = set(kept)
+    file_groups = [(path, g) for (_, path), g in zip(written, target_groups) if path in kept]
     
-    return (f"Adsorbates added. Generated {len(generated_files)} structures:\n"
+    n_raw = sum(g[2] for g in target_groups)
+    return (f"Adsorbates added. Generated {len(file_groups)} structures:\n"
             f"  Adsorbate: {adsorbate}\n"
             f"  Site type: {site_type}\n"
             f"  Height: {height} Å\n"
             f"  Repeat: {repeat}\n"
-            f"  Files:\n" + "\n".join([f"    - {f}" for f in generated_files]))
+            f"  Sites: {n_raw} found, {len(target_groups)} symmetrically distinct"
+            f"{' (cached site search)' if cached else ''}\n"
+            f"  Files:\n" + "\n".join([f"    - {f} ({g[0]}, {g[2]} equivalent)"
+                                       for f, g in file_groups])
+            + duplicates)
 
 
 def substitute_element(
@@ -314,7 +684,12 @@ def substitute_element(
     random_seed: Annotated[
         Optional[int],
         "Random seed for reproducible partial substitution. None for random."
-    ] = None
+    ] = None,
+    skip_duplicates: Annotated[
+        bool,
+        "If True, outputs equivalent to already generated or computed structures are not kept "
+        "(they are always reported)."
+    ] = False
 ) -> str:
     """
     Substitute one element with another in the structure.
@@ -329,6 +704,7 @@ def substitute_element(
         new_element: New element to substitute.
         fraction: Fraction of atoms to replace (0.0-1.0).
         random_seed: Seed for reproducible random selection.
+        skip_duplicates: Remove outputs equivalent to already indexed structures.
     
     Returns:
         str: Success message with substitution details.
@@ -336,22 +712,22 @@ def substitute_element(
     Example:
         substitute_element("POSCAR", "POSCAR_doped", "Fe", "Co", 0.5)
     """
-    from pymatgen.core import Structure, Element
-    import random
+    from pymatgen.core import Element
+    import numpy as np
     
-    structure = Structure.from_file(input_path)
+    structure = load_structure(input_path)
     
     # Validate elements
     try:
-        orig_elem = Element(original_element)
-        new_elem = Element(new_element)
+        Element(original_element)
+        Element(new_element)
     except ValueError as e:
         return f"Error: Invalid element symbol. {e}"
     
     # Find indices of original element
-    indices = [i for i, site in enumerate(structure) if site.specie.symbol == original_element]
+    indices = np.flatnonzero(structure.species == original_element)
     
-    if not indices:
+    if len(indices) == 0:
         return f"Error: Element '{original_element}' not found in structure."
     
     # Determine how many to substitute
@@ -361,24 +737,255 @@ def substitute_element(
     
     # Random selection for partial substitution
     if fraction < 1.0:
-        if random_seed is not None:
-            random.seed(random_seed)
-        indices_to_replace = random.sample(indices, n_substitute)
+        rng = np.random.default_rng(random_seed)
+        indices_to_replace = rng.choice(indices, n_substitute, replace=False)
     else:
         indices_to_replace = indices
     
-    # Perform substitution
-    modified = structure.copy()
-    for idx in indices_to_replace:
-        modified.replace(idx, new_elem)
-    
-    modified.to(filename=output_path)
+    # Perform substitution on the species array and regroup POSCAR blocks
+    modified = structure.replace_species(indices_to_replace, new_element).group_species()
+    modified.write(output_path)
+    _, duplicates = _register_outputs([(modified, output_path)], skip_duplicates)
     
     return (f"Element substitution completed at {output_path}\n"
             f"  {original_element} → {new_element}\n"
             f"  Substituted: {len(indices_to_replace)}/{len(indices)} atoms\n"
             f"  Fraction: {fraction*100:.1f}%\n"
-            f"  Total atoms: {len(modified)}")
+            f"  Total atoms: {len(modified)}"
+            + duplicates)
+
+
+def _parse_fractions(fractions: str) -> list[float]:
+    """
+    Parse a fraction list ('0.1,0.2,0.5') or range ('start:stop:step', stop inclusive).
+    
+    Args:
+        fractions: Fraction specification string.
+    
+    Returns:
+        list[float]: Sorted unique fractions in (0, 1].
+    """
+    import numpy as np
+    
+    if ':' in fractions:
+        start, stop, step = (float(x) for x in fractions.split(':'))
+        values = np.arange(start, stop + step / 2, step)
+    else:
+        values = np.array([float(x) for x in fractions.split(',') if x.strip()])
+    values = np.round(values, 6)
+    if np.any(values <= 0) or np.any(values > 1):
+        raise ValueError("Fractions must be in the range (0, 1].")
+    return sorted(set(values.tolist()))
+
+
+def _site_permutations(structure: ArrayStructure, indices, symprec: float):
+    """
+    Permutations of the selected sites under the space-group operations of the host.
+    
+    Args:
+        structure: Host structure.
+        indices: Indices of the sites that may be substituted.
+        symprec: Symmetry tolerance passed to spglib.
+    
+    Returns:
+        np.ndarray: Array of shape (n_ops, len(indices)); row k maps position i to
+        the position of the image of site i under operation k.
+    """
+    import numpy as np
+    import spglib
+    
+    _, numbers = np.unique(structure.species, return_inverse=True)
+    cell = (structure.lattice, structure.frac_coords, numbers)
+    symmetry = spglib.get_symmetry(cell, symprec=symprec)
+    if symmetry is None:
+        return np.arange(len(indices))[None, :]
+    
+    frac = structure.frac_coords[indices]
+    perms = []
+    for rot, trans in zip(symmetry["rotations"], symmetry["translations"]):
+        image = frac @ rot.T + trans
+        diff = image[:, None, :] - frac[None, :, :]
+        diff -= np.round(diff)
+        dist = np.linalg.norm(diff @ structure.lattice, axis=2)
+        perm = np.argmin(dist, axis=1)
+        # Skip operations that do not map the sublattice onto itself within tolerance
+        if np.all(dist[np.arange(len(perm)), perm] < 10 * symprec) and len(set(perm.tolist())) == len(perm):
+            perms.append(perm)
+    return np.array(perms) if perms else np.arange(len(indices))[None, :]
+
+
+def substitute_element_batch(
+    input_path: Annotated[
+        str,
+        "Path to the input (host) structure file."
+    ],
+    output_dir: Annotated[
+        str,
+        "Directory where all substituted structures will be saved."
+    ],
+    original_element: Annotated[
+        str,
+        "Element symbol to be replaced (e.g., 'Fe', 'O')."
+    ],
+    new_element: Annotated[
+        str,
+        "New element symbol to substitute (e.g., 'Co', 'S')."
+    ],
+    fractions: Annotated[
+        str,
+        "Substitution fractions as a list '0.125,0.25,0.5' or a range 'start:stop:step' "
+        "(e.g., '0.1:0.5:0.1', stop inclusive)."
+    ],
+    n_configs: Annotated[
+        int,
+        "Number of random configurations to sample per fraction (before removing duplicates)."
+    ] = 10,
+    random_seed: Annotated[
+        Optional[int],
+        "Random seed for reproducible sampling. None for random."
+    ] = None,
+    symprec: Annotated[
+        float,
+        "Symmetry tolerance in Angstroms used to detect equivalent configurations."
+    ] = 0.01,
+    skip_duplicates: Annotated[
+        bool,
+        "If True, outputs equivalent to already generated or computed structures are not kept "
+        "(they are always reported)."
+    ] = False
+) -> str:
+    """
+    Generate a whole doping series of substituted structures in one call.
+    
+    For every fraction, this tool samples n_configs random substitution patterns,
+    removes configurations that are equivalent under the space-group symmetry of the
+    host structure, and writes all unique structures into output_dir as
+    POSCAR_<new_element><fraction>_<index>. Use it instead of calling
+    substitute_element repeatedly when screening several fractions or configurations.
+    
+    Args:
+        input_path: Path to input host structure file.
+        output_dir: Directory for output structures.
+        original_element: Element to be replaced.
+        new_element: New element to substitute.
+        fractions: Fractions as list or 'start:stop:step' range.
+        n_configs: Number of sampled configurations per fraction.
+        random_seed: Seed for reproducible sampling.
+        symprec: Symmetry tolerance for duplicate removal.
+        skip_duplicates: Remove outputs equivalent to already indexed structures.
+    
+    Returns:
+        str: Summary table of unique configurations and written files.
+    
+    Example:
+        substitute_element_batch("POSCAR", "doped", "Fe", "Co", "0.125,0.25", 20, 42)
+    """
+    from pymatgen.core import Element
+    import numpy as np
+    
+    structure = load_structure(input_path)
+    
+    # Validate elements
+    try:
+        Element(original_element)
+        Element(new_element)
+    except ValueError as e:
+        return f"Error: Invalid element symbol. {e}"
+    
+    try:
+        fraction_list = _parse_fractions(fractions)
+    except ValueError as e:
+        return f"Error: Invalid fractions '{fractions}'. {e}"
+    
+    indices = np.flatnonzero(structure.species == original_element)
+    if len(indices) == 0:
+        return f"Error: Element '{original_element}' not found in structure."
+    
+    perms = _site_permutations(structure, indices, symprec)
+    rng = np.random.default_rng(random_seed)
+    os.makedirs(output_dir, exist_ok=True)
+    
+    rows = []
+    written = []
+    for fraction in fraction_list:
+        n_substitute = max(1, int(len(indices) * fraction))
+        n_samples = 1 if n_substitute == len(indices) else n_configs
+        
+        # (n_samples, n_sites) boolean masks of substituted sites
+        picks = np.argsort(rng.random((n_samples, len(indices))), axis=1)[:, :n_substitute]
+        masks = np.zeros((n_samples, len(indices)), dtype=bool)
+        masks[np.arange(n_samples)[:, None], picks] = True
+        
+        # Canonical label = lexicographically smallest image over all symmetry operations
+        images = np.packbits(masks[:, perms], axis=2)
+        _, ranks = np.unique(images.reshape(-1, images.shape[2]), axis=0, return_inverse=True)
+        canonical = ranks.reshape(n_samples, len(perms)).min(axis=1)
+        _, unique_idx = np.unique(canonical, return_index=True)
+        unique_masks = masks[np.sort(unique_idx)]
+        
+        # Assign species for all unique configurations at once
+        species = np.tile(structure.species.astype(np.result_type(structure.species, np.array(new_element))),
+                          (len(unique_masks), 1))
+        species[:, indices] = np.where(unique_masks, new_element, original_element)
+        
+        for k, config_species in enumerate(species):
+            config = ArrayStructure(structure.lattice, config_species, structure.frac_coords,
+                                    structure.selective_dynamics, structure.comment).group_species()
+            path = os.path.join(output_dir, f"POSCAR_{new_element}{fraction:g}_{k}")
+            config.write(path)
+            written.append((config, path))
+        
+        rows.append(f"  {fraction:>8g} {n_substitute:>6d}/{len(indices):<6d} "
+                    f"{n_samples:>7d} {len(unique_masks):>6d}")
+    
+    kept, duplicates = _register_outputs(written, skip_duplicates)
+    
+    return (f"Batch substitution completed in {output_dir}\n"
+            f"  {original_element} → {new_element}, symmetry operations: {len(perms)}\n"
+            f"  {'fraction':>8} {'substituted':^13} {'sampled':>7} {'unique':>6}\n"
+            + "\n".join(rows) + "\n"
+            f"  Files written: {len(kept)}\n"
+            f"  Example: {kept[0] if kept else written[0][1]}"
+            + duplicates)
+
+
+def register_computed_structures(
+    directory: Annotated[
+        str,
+        "Root directory to scan for finished VASP calculations."
+    ]
+) -> str:
+    """
+    Register the structures of finished VASP calculations in the fingerprint index.
+    
+    Every sub-directory of `directory` whose OUTCAR reports a completed run is
+    registered as "computed" (both the input POSCAR and the relaxed CONTCAR).
+    Structure tools then flag newly generated structures that were already
+    calculated.
+    
+    Args:
+        directory: Root directory to scan.
+    
+    Returns:
+        str: Number of registered calculations.
+    
+    Example:
+        register_computed_structures("calculations")
+    """
+    items = []
+    for root in find_task_dirs(directory, require=("OUTCAR",)):
+        if not outcar_finished(os.path.join(root, "OUTCAR")):
+            continue
+        for name in ("POSCAR", "CONTCAR"):
+            path = os.path.join(root, name)
+            if os.path.isfile(path) and os.path.getsize(path) > 0:
+                items.append((load_structure(path), path))
+    
+    if not items:
+        return f"No finished calculations found in {directory}."
+    
+    StructureIndex().register_many(items, status="computed")
+    return f"Registered {len(items)} structures from finished calculations in {directory}."
 
 
 def create_structure_workbench() -> StaticWorkbench:
@@ -386,27 +993,38 @@ def create_structure_workbench() -> StaticWorkbench:
     Create a workbench with all structure manipulation tools.
     
     Returns:
-        StaticWorkbench: Workbench containing supercell, slab, adsorbate,
-                        and substitution tools.
+        StaticWorkbench: Workbench containing supercell, slab (single and
+                        enumerated), adsorbate, (batch) substitution and
+                        structure index tools. Tool calls run in the
+                        warm worker pool.
     """
     # Create FunctionTools for each function
-    supercell_tool = FunctionTool(make_supercell, description=make_supercell.__doc__)
-    slab_tool = FunctionTool(make_slab, description=make_slab.__doc__)
-    adsorbate_tool = FunctionTool(add_adsorbate, description=add_adsorbate.__doc__)
-    substitute_tool = FunctionTool(substitute_element, description=substitute_element.__doc__)
+    supercell_tool = pooled_tool(make_supercell)
+    slab_tool = pooled_tool(make_slab)
+    enumerate_slabs_tool = pooled_tool(enumerate_slabs)
+    adsorbate_tool = pooled_tool(add_adsorbate)
+    substitute_tool = pooled_tool(substitute_element)
+    substitute_batch_tool = pooled_tool(substitute_element_batch)
+    register_computed_tool = pooled_tool(register_computed_structures)
     return StaticWorkbench([
         supercell_tool,
         slab_tool,
+        enumerate_slabs_tool,
         adsorbate_tool,
-        substitute_tool
+        substitute_tool,
+        substitute_batch_tool,
+        register_computed_tool
     ])
 
 
 __all__ = [
     "make_supercell",
     "make_slab", 
+    "enumerate_slabs",
     "add_adsorbate",
     "substitute_element",
+    "substitute_element_batch",
+    "register_computed_structures",
     "create_structure_workbench",
 ]
 
@@ -418,8 +1036,11 @@ if __name__ == '__main__':
     print("\nAvailable tools:")
     print("  1. make_supercell - Create supercell structures")
     print("  2. make_slab - Generate surface slabs")
-    print("  3. add_adsorbate - Add molecules to surfaces")
-    print("  4. substitute_element - Replace elements")
+    print("  3. enumerate_slabs - Generate all facets and terminations")
+    print("  4. add_adsorbate - Add molecules to surfaces")
+    print("  5. substitute_element - Replace elements")
+    print("  6. substitute_element_batch - Enumerate unique doping configurations")
+    print("  7. register_computed_structures - Index finished calculations")
     print("\nUsage:")
     print("  from tools.structure_tools import create_structure_workbench")
     print("  workbench = create_structure_workbench()")
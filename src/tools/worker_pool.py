@@ -0,0 +1,181 @@
+"""
+Persistent warm worker pool for compute-heavy agent tools.
+
+Structure, KPOINTS and POTCAR tools import pymatgen lazily and do their work
+synchronously. Run in the agent process, the first call pays the pymatgen
+import and every call blocks the event loop (or a thread of it). Instead,
+`pooled_tool` wraps such a function into an async FunctionTool that submits
+the call to a shared process pool whose workers preload pymatgen, spglib and
+the POTCAR index once at startup, so tool latency is just the compute time.
+
+Configuration:
+- VASPGO_POOL_WORKERS: number of worker processes (default: min(4, CPUs));
+  0 disables the pool and runs tools in a thread like plain FunctionTools.
+
+Tools that fan out over their own process pool size it with
+`nested_workers`, which runs them inline inside a pool worker unless a
+worker count is given explicitly, so the pools never multiply to
+VASPGO_POOL_WORKERS x CPUs processes.
+"""
+
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+from autogen_core.tools import FunctionTool
+
+_POOL: Optional[ProcessPoolExecutor] = None
+_POOL_LOCK = threading.Lock()
+
+# Set in pool worker processes by _warm_worker
+_IN_WORKER = False
+
+
+def _pool_size() -> int:
+    value = os.getenv("VASPGO_POOL_WORKERS")
+    if value is not None and value.strip():
+        return max(int(value), 0)
+    return min(4, os.cpu_count() or 1)
+
+
+def _warm_worker() -> None:
+    """Preload heavy modules and indexes in a pool worker."""
+    global _IN_WORKER
+    _IN_WORKER = True
+    import spglib  # noqa: F401
+    from pymatgen.core import Structure  # noqa: F401
+    from pymatgen.io.vasp.inputs import Kpoints, Potcar  # noqa: F401
+    from pymatgen.analysis.local_env import CrystalNN  # noqa: F401
+    from pymatgen.analysis.dimensionality import get_dimensionality_larsen  # noqa: F401
+    from pymatgen.core.surface import SlabGenerator  # noqa: F401
+    from pymatgen.analysis.adsorption import AdsorbateSiteFinder  # noqa: F401
+
+    from tools.potcar_data import potcar_index
+    try:
+        potcar_index()
+    except Exception:
+        # POTCAR library not configured; POTCAR tools report the error themselves
+        pass
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def in_pool_worker() -> bool:
+    """Whether the current process is a worker of the shared tool pool."""
+    return _IN_WORKER
+
+
+def nested_workers(max_workers: Optional[int], n_tasks: int) -> int:
+    """
+    Number of processes a tool should use for its own fan-out.
+
+    Args:
+        max_workers: Worker count requested by the caller; None for the default
+            (1 inside a pool worker, otherwise all CPUs).
+        n_tasks: Number of independent tasks.
+
+    Returns:
+        int: Number of processes; 1 means run inline.
+    """
+    if max_workers is None:
+        max_workers = 1 if _IN_WORKER else (os.cpu_count() or 1)
+    return max(1, min(max_workers, n_tasks))
+
+
+def get_worker_pool() -> Optional[ProcessPoolExecutor]:
+    """
+    Get the shared warm worker pool, starting it on first use.
+
+    All workers are started (and begin preloading) immediately, so the pool is
+    warm by the time the first tool call arrives.
+
+    Returns:
+        ProcessPoolExecutor | None: The pool, or None if disabled via VASPGO_POOL_WORKERS=0.
+    """
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            size = _pool_size()
+            if size == 0:
+                return None
+            _POOL = ProcessPoolExecutor(max_workers=size, initializer=_warm_worker)
+            for _ in range(size):
+                _POOL.submit(_ping)
+        return _POOL
+
+
+def shutdown_worker_pool() -> None:
+    """Shut down the shared worker pool (it is restarted on next use)."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is not None:
+            _POOL.shutdown(wait=True, cancel_futures=True)
+            _POOL = None
+
+
+async def run_in_pool(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Run a picklable, module-level function in the warm worker pool.
+
+    A pool whose worker crashed is restarted once before giving up.
+
+    Args:
+        func: Function to call.
+        *args: Positional arguments.
+        **kwargs: Keyword arguments.
+
+    Returns:
+        Any: The function result.
+    """
+    global _POOL
+    call = functools.partial(func, *args, **kwargs)
+    loop = asyncio.get_running_loop()
+
+    pool = get_worker_pool()
+    if pool is None:
+        return await loop.run_in_executor(None, call)
+    try:
+        return await loop.run_in_executor(pool, call)
+    except BrokenProcessPool:
+        with _POOL_LOCK:
+            if _POOL is pool:
+                _POOL = None
+        return await loop.run_in_executor(get_worker_pool(), call)
+
+
+def pooled_tool(func: Callable[..., Any], description: Optional[str] = None) -> FunctionTool:
+    """
+    Create a FunctionTool that runs `func` in the warm worker pool.
+
+    The tool keeps the name, annotated signature and docstring of `func`, so
+    the schema seen by the model is the same as for `FunctionTool(func)`.
+
+    Args:
+        func: Module-level synchronous tool function.
+        description: Tool description; defaults to the docstring of `func`.
+
+    Returns:
+        FunctionTool: Async tool submitting each call to the pool.
+    """
+    @functools.wraps(func)
+    async def run(*args: Any, **kwargs: Any) -> Any:
+        return await run_in_pool(func, *args, **kwargs)
+
+    get_worker_pool()
+    return FunctionTool(run, description=description or func.__doc__)
+
+
+__all__ = [
+    "get_worker_pool",
+    "shutdown_worker_pool",
+    "run_in_pool",
+    "pooled_tool",
+    "in_pool_worker",
+    "nested_workers",
+]
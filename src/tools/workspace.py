@@ -0,0 +1,283 @@
+"""
+Single-pass workspace scanner with an incremental on-disk index.
+
+Batch tools need to know which VASP files exist below a calculation root.
+Separate recursive globs per file pattern walk the whole tree once per
+pattern, which takes minutes on Lustre with tens of thousands of task
+directories. `scan_workspace` walks the tree once with `os.scandir`,
+classifies every VASP file by name and stores the result per directory,
+together with the directory mtime, in the vaspgo cache.
+
+A directory's mtime changes whenever entries are created, removed or
+renamed in it, so on later scans unchanged directories are only stat'ed:
+their file lists are reused and only changed directories are listed again.
+File contents are not tracked (an OUTCAR growing does not change its
+directory), so content checks such as `outcar_finished` read the files.
+
+Hidden directories and symlinked directories are not descended into.
+"""
+
+import hashlib
+import os
+import time
+from typing import Annotated, Iterable, Optional
+
+from tools.cache import get_cache_dir, load_json, save_json
+
+# File name -> kind; structure files with extensions are classified below
+VASP_FILES = {
+    name: name for name in (
+        "POSCAR", "CONTCAR", "INCAR", "KPOINTS", "POTCAR", "OUTCAR", "OSZICAR",
+        "vasprun.xml", "IBZKPT", "CHGCAR", "CHG", "WAVECAR", "DOSCAR", "EIGENVAL",
+        "PROCAR", "LOCPOT", "XDATCAR", "ELFCAR",
+    )
+}
+EXTENSIONS = {".cif": "cif", ".vasp": "vasp", ".pbs": "pbs"}
+
+STRUCTURE_KINDS = ("POSCAR", "CONTCAR", "cif", "vasp")
+INPUT_KINDS = ("INCAR", "KPOINTS", "POTCAR", "POSCAR")
+
+# Directory mtimes this close to the scan time may still change within the
+# file system's timestamp granularity (1 s on some); such entries are re-listed.
+MTIME_SAFETY_NS = 2_000_000_000
+
+
+def classify_file(name: str) -> Optional[str]:
+    """
+    Kind of a VASP-related file from its name.
+
+    Args:
+        name: File name (without directory).
+
+    Returns:
+        str | None: The VASP file name for VASP files ("POSCAR", "OUTCAR", ...),
+        "cif", "vasp" or "pbs" by extension, else None.
+    """
+    kind = VASP_FILES.get(name)
+    if kind is None:
+        kind = EXTENSIONS.get(os.path.splitext(name)[1].lower())
+    return kind
+
+
+def _index_file(root: str):
+    digest = hashlib.sha1(os.path.abspath(root).encode("utf-8")).hexdigest()
+    return get_cache_dir("workspace") / f"{digest}.json"
+
+
+def _list_directory(path: str) -> tuple[dict[str, str], list[str]]:
+    files, subdirs = {}, []
+    with os.scandir(path) as entries:
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if not entry.name.startswith("."):
+                        subdirs.append(entry.name)
+                elif entry.is_file():
+                    kind = classify_file(entry.name)
+                    if kind is not None:
+                        files[entry.name] = kind
+            except OSError:
+                continue
+    return files, sorted(subdirs)
+
+
+def scan_workspace(
+    root: str,
+    recursive: bool = True,
+    use_index: bool = True,
+) -> dict[str, dict[str, str]]:
+    """
+    Classify the VASP files below `root`, re-listing only changed directories.
+
+    Args:
+        root: Workspace root directory.
+        recursive: Scan sub-directories (hidden ones are skipped).
+        use_index: Reuse and update the on-disk index; False always lists everything.
+
+    Returns:
+        dict: Directory path relative to root ("" for root) -> {file name: kind},
+        for every visited directory, including those without VASP files.
+
+    Raises:
+        NotADirectoryError: If root is not a directory.
+    """
+    if not os.path.isdir(root):
+        raise NotADirectoryError(f"Not a directory: {root}")
+
+    index_path = _index_file(root)
+    old = load_json(index_path, default={}).get("dirs", {}) if use_index else {}
+    new = {}
+    now = time.time_ns()
+
+    stack = [""]
+    while stack:
+        rel = stack.pop()
+        path = os.path.join(root, rel) if rel else root
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            continue
+        cached = old.get(rel)
+        if cached is not None and cached[0] == mtime:
+            files, subdirs = cached[1], cached[2]
+        else:
+            try:
+                files, subdirs = _list_directory(path)
+            except OSError:
+                continue
+        # Entries with a too recent mtime are stored as stale (mtime None)
+        new[rel] = [mtime if now - mtime > MTIME_SAFETY_NS else None, files, subdirs]
+        if recursive:
+            stack.extend(os.path.join(rel, name) for name in reversed(subdirs))
+
+    if use_index:
+        if not recursive:
+            # Keep the rest of a previous recursive index
+            old.update(new)
+            new = old
+        save_json(index_path, {"root": os.path.abspath(root), "dirs": new})
+    return {rel: entry[1] for rel, entry in new.items()
+            if recursive or rel == ""}
+
+
+def find_files(
+    root: str,
+    kinds: Optional[Iterable[str]] = None,
+    recursive: bool = True,
+) -> list[str]:
+    """
+    Sorted paths of indexed files of the given kinds below `root`.
+
+    Args:
+        root: Workspace root directory.
+        kinds: File kinds to return (see `classify_file`); None returns all.
+        recursive: Include sub-directories.
+
+    Returns:
+        list[str]: Paths joined onto `root` (like glob results).
+
+    Example:
+        find_files("calculations", kinds=STRUCTURE_KINDS)
+    """
+    kinds = None if kinds is None else set(kinds)
+    paths = []
+    for rel, files in scan_workspace(root, recursive=recursive).items():
+        directory = os.path.join(root, rel) if rel else root
+        paths.extend(os.path.join(directory, name) for name, kind in files.items()
+                     if kinds is None or kind in kinds)
+    return sorted(paths)
+
+
+def find_task_dirs(
+    root: str,
+    require: Iterable[str] = ("INCAR",),
+    exclude: Iterable[str] = (),
+) -> list[str]:
+    """
+    Sorted directories below `root` containing all `require` and no `exclude` kinds.
+
+    Args:
+        root: Workspace root directory.
+        require: File kinds a directory must contain.
+        exclude: File kinds a directory must not contain.
+
+    Returns:
+        list[str]: Directory paths joined onto `root`.
+
+    Example:
+        find_task_dirs("calculations", require=INPUT_KINDS, exclude=("OUTCAR",))
+    """
+    require, exclude = set(require), set(exclude)
+    dirs = []
+    for rel, files in scan_workspace(root).items():
+        kinds = set(files.values())
+        if require <= kinds and not (exclude & kinds):
+            dirs.append(os.path.join(root, rel) if rel else root)
+    return sorted(dirs)
+
+
+def outcar_finished(outcar_path: str) -> bool:
+    """
+    Whether an OUTCAR belongs to a completed run (timing block written at the end).
+
+    Args:
+        outcar_path: OUTCAR file path.
+
+    Returns:
+        bool: True if the run finished.
+    """
+    try:
+        with open(outcar_path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(f.tell() - 20000, 0))
+            return b"General timing and accounting" in f.read()
+    except OSError:
+        return False
+
+
+def summarize_workspace(
+    directory: Annotated[
+        str,
+        "Root directory of the calculations to summarize."
+    ]
+) -> str:
+    """
+    Summarize the state of all VASP task directories below a directory.
+
+    Uses the incremental workspace index, so repeated calls on large trees only
+    re-list directories that changed. Directories are classified as finished
+    (completed OUTCAR), running/failed (incomplete OUTCAR), ready (INCAR,
+    KPOINTS, POTCAR and POSCAR present) or incomplete (some inputs missing).
+
+    Args:
+        directory: Root directory to summarize.
+
+    Returns:
+        str: Counts per state and the directories that are not finished.
+
+    Example:
+        summarize_workspace("calculations")
+    """
+    try:
+        workspace = scan_workspace(directory)
+    except NotADirectoryError as e:
+        return str(e)
+
+    states = {"finished": [], "running/failed": [], "ready": [], "incomplete": []}
+    for rel, files in sorted(workspace.items()):
+        kinds = set(files.values())
+        if not kinds & {"INCAR", "OUTCAR"}:
+            continue
+        path = os.path.join(directory, rel) if rel else directory
+        if "OUTCAR" in kinds:
+            state = "finished" if outcar_finished(os.path.join(path, "OUTCAR")) else "running/failed"
+        elif set(INPUT_KINDS) <= kinds:
+            state = "ready"
+        else:
+            missing = ", ".join(k for k in INPUT_KINDS if k not in kinds)
+            path = f"{path} (missing: {missing})"
+            state = "incomplete"
+        states[state].append(path)
+
+    total = sum(len(v) for v in states.values())
+    if total == 0:
+        return f"No VASP task directories found in {directory}."
+    lines = [f"Workspace {directory}: {total} task directories"]
+    lines.append("  " + ", ".join(f"{state}: {len(paths)}" for state, paths in states.items()))
+    for state in ("running/failed", "ready", "incomplete"):
+        if states[state]:
+            lines.append(f"\n{state}:")
+            lines.extend(f"  {path}" for path in states[state])
+    return "\n".join(lines)
+
+
+__all__ = [
+    "STRUCTURE_KINDS",
+    "INPUT_KINDS",
+    "classify_file",
+    "scan_workspace",
+    "find_files",
+    "find_task_dirs",
+    "outcar_finished",
+    "summarize_workspace",
+]
@@ -0,0 +1,201 @@
+"""
+On-disk cache of fetched RAG documents for offline use.
+
+Every URL fetched by the DocumentIndexer is stored as the raw response body,
+the Markdown produced from it and a small JSON record (content type, charset,
+ETag, Last-Modified, fetch time). The cache lives in the vaspgo cache
+directory (VASPGO_CACHE_DIR, default ~/.vaspgo_cache) under rag_documents.
+
+Online, the cached validators make re-fetches conditional and the cached copy
+is used when the network fails. Offline (VASPGO_RAG_OFFLINE=1 or
+`offline=True`) every document is served from the cache without any network
+access. `import_mirror` fills the cache from a pre-downloaded mirror (e.g.
+`wget --mirror --adjust-extension https://www.vasp.at/wiki/...`), so an
+offline machine can be seeded without ever reaching the server.
+"""
+
+import hashlib
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Union
+
+from tools.cache import get_cache_dir, load_json, save_json
+
+OFFLINE_ENV = "VASPGO_RAG_OFFLINE"
+
+# Extensions a mirror adds to page names (wget --adjust-extension)
+MIRROR_SUFFIXES = (".html", ".htm")
+
+_CONTENT_TYPES = {
+    ".html": "text/html",
+    ".htm": "text/html",
+    ".pdf": "application/pdf",
+    ".md": "text/markdown",
+    ".txt": "text/plain",
+}
+
+
+def offline_default() -> bool:
+    """Whether offline mode is enabled by the VASPGO_RAG_OFFLINE environment variable."""
+    return os.getenv(OFFLINE_ENV, "").strip().lower() in ("1", "true", "yes")
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    """Write bytes to a temp file and rename it, so readers never see partial files."""
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class DocumentCache:
+    """
+    URL -> raw content, Markdown and HTTP validators, stored on disk.
+
+    Args:
+        root: Cache directory; None uses <vaspgo cache>/rag_documents
+
+    Example:
+        >>> cache = DocumentCache()
+        >>> cache.import_mirror("mirror/www.vasp.at")
+        >>> cache.get("https://www.vasp.at/wiki/ISTART")["markdown"]
+    """
+
+    def __init__(self, root: Optional[Union[str, Path]] = None) -> None:
+        self.root = Path(root) if root is not None else get_cache_dir("rag_documents")
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _paths(self, url: str) -> Dict[str, Path]:
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        directory = self.root / key[:2]
+        return {
+            "meta": directory / f"{key}.json",
+            "raw": directory / f"{key}.raw",
+            "markdown": directory / f"{key}.md",
+        }
+
+    def get(self, url: str) -> Optional[Dict]:
+        """
+        Cached entry of a URL.
+
+        Returns:
+            Dict with "url", "content_type", "charset", "etag", "last_modified",
+            "fetched_at", "raw" (bytes) and "markdown" (str or None), or None if
+            the URL is not cached
+        """
+        paths = self._paths(url)
+        meta = load_json(paths["meta"])
+        if not meta or meta.get("url") != url:
+            return None
+        try:
+            raw = paths["raw"].read_bytes()
+        except OSError:
+            return None
+        try:
+            markdown = paths["markdown"].read_text(encoding="utf-8")
+        except OSError:
+            markdown = None
+        return dict(meta, raw=raw, markdown=markdown)
+
+    def put(
+        self,
+        url: str,
+        raw: bytes,
+        content_type: str = "",
+        charset: str = "utf-8",
+        validators: Optional[Dict[str, str]] = None,
+        markdown: Optional[str] = None,
+    ) -> None:
+        """
+        Store the raw content of a URL (and its Markdown, if already converted).
+
+        Args:
+            url: Source URL
+            raw: Response body
+            content_type: Content-Type of the response
+            charset: Character set of the response
+            validators: "etag" and "last_modified" of the response
+            markdown: Markdown converted from the content
+        """
+        paths = self._paths(url)
+        paths["meta"].parent.mkdir(parents=True, exist_ok=True)
+        _write_atomic(paths["raw"], raw)
+        if markdown is not None:
+            _write_atomic(paths["markdown"], markdown.encode("utf-8"))
+        elif paths["markdown"].exists():
+            paths["markdown"].unlink()
+        validators = validators or {}
+        save_json(paths["meta"], {
+            "url": url,
+            "content_type": content_type,
+            "charset": charset,
+            "etag": validators.get("etag", ""),
+            "last_modified": validators.get("last_modified", ""),
+            "fetched_at": time.time(),
+        })
+
+    def put_markdown(self, url: str, markdown: str) -> None:
+        """Store the Markdown converted from an already cached URL."""
+        paths = self._paths(url)
+        if paths["meta"].exists():
+            _write_atomic(paths["markdown"], markdown.encode("utf-8"))
+
+    def urls(self) -> Iterable[str]:
+        """All cached URLs."""
+        for meta_path in self.root.glob("*/*.json"):
+            meta = load_json(meta_path)
+            if meta and meta.get("url"):
+                yield meta["url"]
+
+    def import_mirror(
+        self,
+        directory: Union[str, Path],
+        base_url: Optional[str] = None,
+        suffixes: Iterable[str] = MIRROR_SUFFIXES,
+    ) -> int:
+        """
+        Import a pre-downloaded mirror into the cache.
+
+        Each file's URL is base_url + its path relative to `directory`, with
+        one of `suffixes` (added by wget --adjust-extension) removed. Without
+        base_url the mirror is taken to have wget's layout, host/path, and URLs
+        are https://<relative path>.
+
+        Args:
+            directory: Mirror directory
+            base_url: URL corresponding to `directory`, e.g. "https://www.vasp.at/wiki"
+            suffixes: File suffixes that are not part of the URL
+
+        Returns:
+            Number of imported documents
+        """
+        directory = Path(directory)
+        if not directory.is_dir():
+            raise NotADirectoryError(f"Not a directory: {directory}")
+        suffixes = tuple(suffixes)
+        count = 0
+        for path in sorted(directory.rglob("*")):
+            if not path.is_file() or path.name.startswith("."):
+                continue
+            relative = path.relative_to(directory).as_posix()
+            extension = path.suffix.lower()
+            if extension in suffixes:
+                relative = relative[: -len(path.suffix)]
+            url = f"{base_url.rstrip('/')}/{relative}" if base_url else f"https://{relative}"
+            content_type = _CONTENT_TYPES.get(extension, "text/html" if extension in suffixes or not extension else "")
+            stat = path.stat()
+            self.put(url, path.read_bytes(), content_type=content_type,
+                     validators={"etag": "", "last_modified": time.strftime(
+                         "%a, %d %b %Y %H:%M:%S GMT", time.gmtime(stat.st_mtime))})
+            count += 1
+        return count
+
+
+__all__ = ["DocumentCache", "offline_default", "OFFLINE_ENV"]
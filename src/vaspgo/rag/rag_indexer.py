@@ -1,17 +1,24 @@
 import asyncio
+import functools
+import hashlib
 import re
+from concurrent.futures import Executor
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
 
 import aiofiles
 import aiohttp
-from trafilatura import fetch_url, extract
+from trafilatura import extract
 
 from autogen_core.memory import Memory, MemoryContent, MemoryMimeType
 
+from vaspgo.rag.document_cache import DocumentCache, offline_default
+from vaspgo.rag.source_manifest import SourceManifest, get_source_manifest
 from vaspgo.rag.text_processor import (
+    convert_bytes_to_markdown,
     convert_file_to_markdown,
-    convert_url_to_markdown,
     is_supported_format,
 )
 
@@ -25,7 +32,15 @@ class DocumentIndexer:
         chunk_size: int = 1500,
         chunk_tokens: int = 1000,
         overlap_tokens: int = 200,
-        use_smart_chunking: bool = True
+        use_smart_chunking: bool = True,
+        max_concurrency: int = 16,
+        per_host_limit: int = 4,
+        request_timeout: float = 60.0,
+        executor: Optional[Executor] = None,
+        batch_size: int = 1000,
+        cache: Optional[DocumentCache] = None,
+        use_cache: bool = True,
+        offline: Optional[bool] = None
     ) -> None:
         """
         Initialize DocumentIndexer.
@@ -36,46 +51,188 @@ class DocumentIndexer:
             chunk_tokens: Target token count per chunk for smart chunking
             overlap_tokens: Token count for overlap between chunks
             use_smart_chunking: Whether to use smart chunking based on Markdown headings
+            max_concurrency: Maximum number of sources fetched and converted at the same time
+            per_host_limit: Maximum number of simultaneous connections to one host
+            request_timeout: Total timeout in seconds for one HTTP request
+            executor: Executor for the blocking converters (trafilatura, markitdown);
+                None uses the event loop's default thread pool
+            batch_size: Number of chunks embedded and written to ChromaDB per call
+            cache: On-disk cache of fetched documents; None uses the default
+                DocumentCache if use_cache is True
+            use_cache: Whether to cache fetched documents on disk
+            offline: Serve URLs only from the cache, without network access;
+                None reads the VASPGO_RAG_OFFLINE environment variable
         """
         self.memory = memory
         self.chunk_size = chunk_size  # Keep for backward compatibility
         self.chunk_tokens = chunk_tokens
         self.overlap_tokens = overlap_tokens
         self.use_smart_chunking = use_smart_chunking
+        self.max_concurrency = max(1, max_concurrency)
+        self.per_host_limit = max(1, per_host_limit)
+        self.request_timeout = request_timeout
+        self.executor = executor
+        self.batch_size = max(1, batch_size)
+        self.offline = offline_default() if offline is None else offline
+        if cache is None and (use_cache or self.offline):
+            cache = DocumentCache()
+        self.cache = cache
+        self._session: Optional[aiohttp.ClientSession] = None
 
-    async def _fetch_url_content(self, url: str) -> str:
+    def _new_session(self) -> aiohttp.ClientSession:
+        """Create an HTTP session with the connection limits of this indexer."""
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency, limit_per_host=self.per_host_limit)
+        timeout = aiohttp.ClientTimeout(total=self.request_timeout)
+        return aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+    @asynccontextmanager
+    async def _http_session(self):
         """
-        Fetch and extract URL content using trafilatura.
-        Falls back to markitdown, then HTML stripping if needed.
+        Share one HTTP session (connection pool) between all requests inside the block.
+        Nested blocks reuse the outer session.
         """
-        # Try trafilatura first (best for web content extraction)
+        if self._session is not None:
+            yield self._session
+            return
+        self._session = self._new_session()
         try:
-            downloaded = fetch_url(url)
-            result = extract(downloaded, output_format="markdown")
-            if result:
-                return result
-        except Exception:
-            pass
+            yield self._session
+        finally:
+            session, self._session = self._session, None
+            await session.close()
+
+    async def _run_blocking(self, func, *args, **kwargs):
+        """Run a blocking function (e.g. a converter) in the executor without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
+    async def _download(
+        self, url: str, validators: Optional[Dict[str, str]] = None
+    ) -> Optional[Tuple[bytes, str, str, Dict[str, str]]]:
+        """
+        Download a URL with the shared session.
         
-        # Fallback 1: Try markitdown conversion
-        try:
-            return convert_url_to_markdown(url)
-        except Exception:
-            pass
+        Args:
+            url: URL to download
+            validators: "etag" / "last_modified" of the indexed version; sent as
+                If-None-Match / If-Modified-Since
         
-        # Fallback 2: Use aiohttp with HTML stripping
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
+        Returns:
+            Tuple of (raw content, lower-case Content-Type, charset, validators of
+            the response), or None if the server answered 304 Not Modified
+        """
+        headers = {}
+        if validators and validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators and validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+        async with self._http_session() as session:
+            async with session.get(url, headers=headers) as response:
+                if response.status == 304:
+                    return None
                 response.raise_for_status()
                 content_type = response.headers.get('Content-Type', '').lower()
-                
-                if 'text/html' in content_type or 'application/xhtml' in content_type:
-                    html_content = await response.text()
-                    return self._strip_html(html_content)
-                else:
-                    return await response.text()
+                data = await response.read()
+                response_validators = {
+                    "etag": response.headers.get("ETag", ""),
+                    "last_modified": response.headers.get("Last-Modified", ""),
+                }
+                return data, content_type, response.charset or "utf-8", response_validators
+
+    def _convert_downloaded(self, url: str, data: bytes, content_type: str, charset: str) -> str:
+        """
+        Convert downloaded content to Markdown (blocking, runs in the executor).
+        HTML is extracted with trafilatura, falling back to markitdown, then HTML stripping.
+        Other formats (PDF, ...) are converted with markitdown or decoded as text.
+        """
+        extension = Path(urlparse(url).path).suffix.lower()
+        mimetype = content_type.split(";")[0].strip()
+        is_html = 'text/html' in content_type or 'application/xhtml' in content_type
+        
+        if is_html:
+            html_content = data.decode(charset, errors="replace")
+            # Try trafilatura first (best for web content extraction)
+            try:
+                result = extract(html_content, output_format="markdown", url=url)
+                if result:
+                    return result
+            except Exception:
+                pass
+            
+            # Fallback 1: markitdown conversion of the same page
+            try:
+                return convert_bytes_to_markdown(data, extension=".html", mimetype=mimetype,
+                                                 charset=charset, url=url)
+            except Exception:
+                pass
+            
+            # Fallback 2: HTML stripping
+            return self._strip_html(html_content)
+        
+        try:
+            return convert_bytes_to_markdown(data, extension=extension, mimetype=mimetype,
+                                             charset=charset, url=url)
+        except Exception:
+            return data.decode(charset, errors="replace")
+
+    async def _cached_content(
+        self, url: str, cached: Dict, validators: Optional[Dict[str, str]] = None
+    ) -> Optional[Tuple[str, Dict[str, str]]]:
+        """
+        Content of a cached URL, converting (and caching) the Markdown if needed.
+        
+        Returns:
+            Tuple of (Markdown content, cached validators), or None if the indexed
+            version has the same validators as the cached copy
+        """
+        cached_validators = {"etag": cached["etag"], "last_modified": cached["last_modified"]}
+        if (validators and any(cached_validators.values())
+                and all(validators.get(key) == value for key, value in cached_validators.items())):
+            return None
+        content = cached["markdown"]
+        if content is None:
+            content = await self._run_blocking(
+                self._convert_downloaded, url, cached["raw"], cached["content_type"], cached["charset"]
+            )
+            await self._run_blocking(self.cache.put_markdown, url, content)
+        return content, cached_validators
+
+    async def _fetch_url_content(
+        self, url: str, validators: Optional[Dict[str, str]] = None
+    ) -> Optional[Tuple[str, Dict[str, str]]]:
+        """
+        Fetch URL content with the shared aiohttp session and convert it to Markdown
+        in the executor (trafilatura, falling back to markitdown, then HTML stripping).
+        
+        The raw content and the Markdown are stored in the document cache. In
+        offline mode the content comes from the cache only.
+        
+        Returns:
+            Tuple of (Markdown content, HTTP validators), or None if not modified
+        """
+        cached = self.cache.get(url) if self.cache is not None else None
+        if self.offline:
+            if cached is None:
+                raise FileNotFoundError(f"Not in the offline document cache: {url}")
+            return await self._cached_content(url, cached, validators)
+        
+        # Conditional request against the indexed version, otherwise against the cached copy
+        downloaded = await self._download(url, validators or cached)
+        if downloaded is None:
+            if validators or cached is None:
+                return None
+            return await self._cached_content(url, cached)
+        data, content_type, charset, response_validators = downloaded
+        content = await self._run_blocking(self._convert_downloaded, url, data, content_type, charset)
+        if self.cache is not None:
+            await self._run_blocking(
+                self.cache.put, url, data, content_type, charset, response_validators, content
+            )
+        return content, response_validators
     
-    async def _fetch_url_with_retry(self, url: str) -> str:
+    async def _fetch_url_with_retry(
+        self, url: str, validators: Optional[Dict[str, str]] = None
+    ) -> Optional[Tuple[str, Dict[str, str]]]:
         """
         Fetch URL content with retry logic (up to 3 attempts).
         """
@@ -83,8 +240,8 @@ class DocumentIndexer:
         
         for attempt in range(max_retries):
             try:
-                return await self._fetch_url_content(url)
-            except (aiohttp.ClientError, aiohttp.ServerError, asyncio.TimeoutError) as e:
+                return await self._fetch_url_content(url, validators)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
                 if attempt < max_retries - 1:
                     wait_time = 2 ** attempt
                     print(f"Request failed for {url}, retrying in {wait_time}s (attempt {attempt + 1}/{max_retries})...")
@@ -96,14 +253,31 @@ class DocumentIndexer:
                 # Non-network errors: don't retry
                 raise
 
-    async def _fetch_content(self, source: str) -> str:
+    async def _fetch_content(
+        self, source: str, validators: Optional[Dict[str, str]] = None
+    ) -> Optional[Tuple[str, Dict[str, str]]]:
         """
         Fetch content from URL or file.
         Automatically converts HTML, PDF, XLSX, etc. to Markdown using markitdown.
-        For URLs, retries up to 3 times on failure.
+        For URLs, retries up to 3 times on failure, then falls back to the cached copy.
+        
+        Args:
+            source: URL or file path
+            validators: Validators of the indexed version. URLs are requested
+                conditionally; files are compared by modification time and size.
+        
+        Returns:
+            Tuple of (Markdown content, validators), or None if the source is not modified
         """
         if source.startswith(("http://", "https://")):
-            return await self._fetch_url_with_retry(source)
+            try:
+                return await self._fetch_url_with_retry(source, validators)
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                cached = self.cache.get(source) if self.cache is not None else None
+                if cached is None:
+                    raise
+                print(f"Using the cached copy of {source}")
+                return await self._cached_content(source, cached, validators)
         else:
             # Handle file paths
             source_path = Path(source)
@@ -116,26 +290,34 @@ class DocumentIndexer:
             if not source_path.exists():
                 raise FileNotFoundError(f"File not found: {source_path}")
             
-            # Check if it's a supported format that should be converted
-            if is_supported_format(source_path):
-                # Use markitdown to convert to markdown
-                # Note: convert_file_to_markdown is synchronous, but we're in async context
-                # This is fine as markitdown operations are typically fast
-                return convert_file_to_markdown(source_path)
-            else:
-                # For unsupported formats or plain text files, read directly
-                async with aiofiles.open(source_path, "r", encoding="utf-8") as f:
-                    content = await f.read()
-                    # If content looks like HTML, try to convert it anyway
-                    if "<" in content and ">" in content:
-                        html_pattern = re.compile(r'<[^>]+>', re.IGNORECASE)
-                        if html_pattern.search(content):
-                            try:
-                                return convert_file_to_markdown(source_path)
-                            except Exception:
-                                # If conversion fails, use fallback HTML stripping
-                                return self._strip_html(content)
-                    return content
+            stat = source_path.stat()
+            file_validators = {"etag": "", "last_modified": f"{stat.st_mtime_ns}:{stat.st_size}"}
+            if validators and validators.get("last_modified") == file_validators["last_modified"]:
+                return None
+            return await self._read_file(source_path), file_validators
+
+    async def _read_file(self, source_path: Path) -> str:
+        """
+        Read a local file, converting HTML, PDF, XLSX, etc. to Markdown.
+        """
+        # Check if it's a supported format that should be converted
+        if is_supported_format(source_path):
+            # Use markitdown to convert to markdown (blocking, so run it in the executor)
+            return await self._run_blocking(convert_file_to_markdown, source_path)
+        else:
+            # For unsupported formats or plain text files, read directly
+            async with aiofiles.open(source_path, "r", encoding="utf-8") as f:
+                content = await f.read()
+                # If content looks like HTML, try to convert it anyway
+                if "<" in content and ">" in content:
+                    html_pattern = re.compile(r'<[^>]+>', re.IGNORECASE)
+                    if html_pattern.search(content):
+                        try:
+                            return await self._run_blocking(convert_file_to_markdown, source_path)
+                        except Exception:
+                            # If conversion fails, use fallback HTML stripping
+                            return self._strip_html(content)
+                return content
 
     def _strip_html(self, html_content: str) -> str:
         """
@@ -369,41 +551,261 @@ class DocumentIndexer:
             
             return chunks
 
+    @staticmethod
+    def _digest(text: str) -> str:
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+    def _chunk_records(
+        self, source: str, chunks: List[Dict], source_info: Optional[Dict[str, str]] = None
+    ) -> List[Tuple[str, str, Dict]]:
+        """
+        Build (id, document, metadata) records for the chunks of one source.
+        
+        IDs are deterministic: a hash of the source and a hash of the chunk text
+        (with a counter for repeated chunks), so re-indexing a source overwrites
+        its chunks instead of duplicating them, and an unchanged chunk keeps its ID
+        when other parts of the document change.
+        
+        Args:
+            source: Source URL or path
+            chunks: Chunks from _split_text
+            source_info: "source_hash", "etag" and "last_modified" stored with every chunk
+        """
+        source_digest = self._digest(source)
+        seen: Dict[str, int] = {}
+        records = []
+        for i, chunk_dict in enumerate(chunks):
+            content_digest = self._digest(chunk_dict["content"])
+            count = seen.get(content_digest, 0)
+            seen[content_digest] = count + 1
+            chunk_id = f"{source_digest}-{content_digest}" + (f"-{count}" if count else "")
+            metadata = {
+                "source": source,
+                "chunk_index": i,
+                "mime_type": str(MemoryMimeType.TEXT),
+                "content_hash": content_digest,
+            }
+            metadata.update(source_info or {})
+            # Add heading_path if available (from smart chunking)
+            if chunk_dict.get("heading_path"):
+                metadata["heading_path"] = chunk_dict["heading_path"]
+            records.append((chunk_id, chunk_dict["content"], metadata))
+        return records
+
+    def _get_collection(self):
+        """
+        ChromaDB collection behind the memory, or None if the memory is not
+        ChromaDB-backed (chunks are then added one by one with memory.add).
+        """
+        ensure_initialized = getattr(self.memory, "_ensure_initialized", None)
+        if ensure_initialized is None:
+            return None
+        ensure_initialized()
+        return getattr(self.memory, "_collection", None)
+
+    @staticmethod
+    def _indexed_state(manifest: SourceManifest, source: str) -> Dict:
+        """
+        Chunk IDs, content hash and HTTP validators of the indexed version of a
+        source, from the source manifest (one lookup by ID, blocking).
+        """
+        entry = manifest.get(source, with_chunk_ids=True)
+        if entry is None:
+            return {"ids": [], "source_hash": "", "etag": "", "last_modified": ""}
+        return {
+            "ids": entry["chunk_ids"],
+            "source_hash": entry.get("source_hash", ""),
+            "etag": entry.get("etag", ""),
+            "last_modified": entry.get("last_modified", ""),
+        }
+
+    @staticmethod
+    def _scan_indexed_state(collection, source: str) -> Dict:
+        """
+        Same as _indexed_state for collections without a manifest, read from the
+        chunk metadata (blocking).
+        """
+        results = collection.get(where={"source": source}, include=["metadatas"])
+        ids = results.get("ids") or []
+        metadatas = results.get("metadatas") or []
+        first = (metadatas[0] if metadatas else None) or {}
+        return {
+            "ids": ids,
+            "source_hash": first.get("source_hash", ""),
+            "etag": first.get("etag", ""),
+            "last_modified": first.get("last_modified", ""),
+        }
+
+    @staticmethod
+    def _upsert(collection, records: List[Tuple[str, str, Dict]]) -> None:
+        """Embed and write a batch of records with one ChromaDB call (blocking)."""
+        ids, documents, metadatas = (list(column) for column in zip(*records))
+        collection.upsert(ids=ids, documents=documents, metadatas=metadatas)
+
+    def _finalize_source(
+        self,
+        collection,
+        manifest: Optional[SourceManifest],
+        source: str,
+        stale_ids: List[str],
+        kept: List[Tuple[str, str, Dict]],
+        chunk_ids: List[str],
+        source_info: Dict[str, str],
+    ) -> None:
+        """
+        Delete chunks that no longer exist, refresh the metadata (chunk index,
+        hash, validators) of unchanged chunks without re-embedding them and
+        record the new version in the source manifest (blocking).
+        """
+        for start in range(0, len(stale_ids), self.batch_size):
+            collection.delete(ids=stale_ids[start:start + self.batch_size])
+        for start in range(0, len(kept), self.batch_size):
+            batch = kept[start:start + self.batch_size]
+            collection.update(ids=[r[0] for r in batch], metadatas=[r[2] for r in batch])
+        if manifest is not None:
+            manifest.update(source, chunk_ids, **source_info)
+
+    async def _add_records(self, collection, records: List[Tuple[str, str, Dict]]) -> None:
+        """Store records in batches of batch_size (ChromaDB) or one by one (other memories)."""
+        if collection is None:
+            for _, document, metadata in records:
+                await self.memory.add(
+                    MemoryContent(
+                        content=document,
+                        mime_type=MemoryMimeType.TEXT,
+                        metadata=metadata
+                    )
+                )
+            return
+        for start in range(0, len(records), self.batch_size):
+            await self._run_blocking(self._upsert, collection, records[start:start + self.batch_size])
+
+    async def _fetch_bounded(
+        self, source: str, semaphore: asyncio.Semaphore, collection, manifest: Optional[SourceManifest]
+    ) -> Tuple[str, Optional[Dict], Optional[Tuple[str, Dict[str, str]]], Optional[Exception]]:
+        """
+        Look up the indexed version of a source and fetch it (conditionally) while
+        holding a slot of the concurrency limit.
+        
+        Returns:
+            Tuple of (source, indexed state or None, fetched (content, validators)
+            or None if not modified, error or None)
+        """
+        async with semaphore:
+            try:
+                state = None
+                if manifest is not None:
+                    state = await self._run_blocking(self._indexed_state, manifest, source)
+                elif collection is not None:
+                    state = await self._run_blocking(self._scan_indexed_state, collection, source)
+                validators = state if state and state["ids"] and state["source_hash"] else None
+                return source, state, await self._fetch_content(source, validators), None
+            except Exception as e:
+                return source, None, None, e
+
     async def index_documents(self, sources: List[str]) -> int:
         """
         Index documents into memory.
         Automatically converts HTML, PDF, XLSX, etc. to Markdown before indexing.
+        
+        Sources are fetched and converted concurrently (at most max_concurrency at
+        a time and per_host_limit connections per host, over one shared HTTP
+        session). Chunks are collected across documents and written to ChromaDB
+        in batches of batch_size, each embedded with one call, while the
+        remaining sources are still being fetched.
+        
+        Indexing is incremental: already indexed URLs are requested with their
+        ETag / Last-Modified (files are compared by mtime and size), unchanged
+        sources are skipped, and for changed sources only new chunks are
+        embedded while chunks that no longer exist are deleted. The indexed
+        version of each source is looked up in the source manifest.
+        
+        Returns:
+            Number of chunks embedded
         """
+        collection = self._get_collection()
+        manifest = get_source_manifest(self.memory) if collection is not None else None
         total_chunks = 0
-        for source in sources:
+        unchanged = 0
+        pending: List[Tuple[str, str, Dict]] = []
+        pending_sources: Dict[str, Tuple] = {}
+
+        async def flush() -> None:
+            nonlocal total_chunks, pending, pending_sources
+            records, sources_in_batch = pending, pending_sources
+            pending, pending_sources = [], {}
             try:
-                # _fetch_content now handles conversion automatically
-                content = await self._fetch_content(source)
-                
-                # Split content into chunks
-                chunks = self._split_text(content)
-                
-                # Add chunks to memory
-                for i, chunk_dict in enumerate(chunks):
-                    metadata = {
-                        "source": source,
-                        "chunk_index": i
-                    }
-                    # Add heading_path if available (from smart chunking)
-                    if chunk_dict.get("heading_path"):
-                        metadata["heading_path"] = chunk_dict["heading_path"]
-                    
-                    await self.memory.add(
-                        MemoryContent(
-                            content=chunk_dict["content"],
-                            mime_type=MemoryMimeType.TEXT,
-                            metadata=metadata
-                        )
-                    )
-                total_chunks += len(chunks)
-                print(f"Indexed {len(chunks)} chunks from {source}")
+                await self._add_records(collection, records)
+            except Exception as e:
+                print(f"Error indexing {', '.join(sources_in_batch)}: {str(e)}")
+                return
+            total_chunks += len(records)
+            for source, args in sources_in_batch.items():
+                await finalize(source, *args)
+
+        async def finalize(
+            source: str,
+            stale_ids: List[str],
+            kept: List[Tuple[str, str, Dict]],
+            chunk_ids: List[str],
+            source_info: Dict[str, str],
+            summary: str,
+        ) -> None:
+            try:
+                if collection is not None:
+                    await self._run_blocking(self._finalize_source, collection, manifest, source,
+                                             stale_ids, kept, chunk_ids, source_info)
+                print(summary)
             except Exception as e:
                 print(f"Error indexing {source}: {str(e)}")
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._http_session():
+            tasks = [asyncio.create_task(self._fetch_bounded(source, semaphore, collection, manifest)) for source in sources]
+            for task in asyncio.as_completed(tasks):
+                source, state, fetched, error = await task
+                if error is not None:
+                    print(f"Error indexing {source}: {str(error)}")
+                    continue
+                if fetched is None:
+                    unchanged += 1
+                    continue
+                content, validators = fetched
+                try:
+                    source_info = {"source_hash": self._digest(content), **validators}
+                    # Split content into chunks
+                    records = self._chunk_records(source, self._split_text(content), source_info)
+                except Exception as e:
+                    print(f"Error indexing {source}: {str(e)}")
+                    continue
+                
+                existing = set(state["ids"]) if state else set()
+                chunk_ids = [record[0] for record in records]
+                new_ids = set(chunk_ids)
+                added = [record for record in records if record[0] not in existing]
+                kept = [record for record in records if record[0] in existing]
+                stale_ids = [chunk_id for chunk_id in existing if chunk_id not in new_ids]
+                if (not added and not stale_ids and state
+                        and all(state.get(key) == value for key, value in source_info.items())):
+                    unchanged += 1
+                    continue
+                
+                summary = (f"Indexed {len(added)} chunks from {source}" if not existing else
+                           f"Updated {source}: {len(added)} new, {len(kept)} unchanged, "
+                           f"{len(stale_ids)} removed chunks")
+                if not added:
+                    # Nothing to embed: delete stale chunks / refresh metadata right away
+                    await finalize(source, stale_ids, kept, chunk_ids, source_info, summary)
+                    continue
+                # Stale chunks are deleted only after the new ones are stored
+                pending.extend(added)
+                pending_sources[source] = (stale_ids, kept, chunk_ids, source_info, summary)
+                if len(pending) >= self.batch_size:
+                    await flush()
+        if pending:
+            await flush()
+        if unchanged:
+            print(f"{unchanged} source(s) unchanged since the last indexing")
         
         return total_chunks
 
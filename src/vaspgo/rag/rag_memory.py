@@ -1,8 +1,6 @@
 import os
 from pathlib import Path
-from typing import List, Set
-
-import chromadb
+from typing import List, Optional, Set
 
 from autogen_core.memory import MemoryContent, MemoryMimeType
 from autogen_ext.memory.chromadb import (
@@ -10,7 +8,9 @@ from autogen_ext.memory.chromadb import (
     PersistentChromaDBVectorMemoryConfig,
 )
 
+from vaspgo.rag.document_cache import DocumentCache
 from vaspgo.rag.rag_indexer import DocumentIndexer
+from vaspgo.rag.source_manifest import get_source_manifest
 
 
 def create_rag_memory(
@@ -48,46 +48,12 @@ def create_rag_memory(
     return rag_memory
 
 
-def _get_chromadb_collection(rag_memory: ChromaDBVectorMemory):
-    """
-    Get the underlying ChromaDB collection from ChromaDBVectorMemory.
-    
-    Args:
-        rag_memory: ChromaDBVectorMemory instance
-        
-    Returns:
-        ChromaDB collection object or None
-    """
-    try:
-        # Try to access collection directly
-        if hasattr(rag_memory, '_collection') and rag_memory._collection:
-            return rag_memory._collection
-        
-        # Try to access via _client
-        if hasattr(rag_memory, '_client') and rag_memory._client:
-            client = rag_memory._client
-            collection_name = getattr(rag_memory._config, 'collection_name', None) or "VASP_WIKI"
-            return client.get_or_create_collection(name=collection_name)
-        
-        # Fallback: create a new client connection using the same persistence path
-        if hasattr(rag_memory, '_config'):
-            persistence_path = getattr(rag_memory._config, 'persistence_path', None)
-            collection_name = getattr(rag_memory._config, 'collection_name', None) or "VASP_WIKI"
-            
-            if persistence_path:
-                client = chromadb.PersistentClient(path=persistence_path)
-                return client.get_or_create_collection(name=collection_name)
-    except Exception as e:
-        print(f"Warning: Could not access ChromaDB collection: {str(e)}")
-    
-    return None
-
-
 async def get_indexed_sources(rag_memory: ChromaDBVectorMemory) -> Set[str]:
     """
-    Get set of sources that have already been indexed by querying the database metadata.
+    Get set of sources that have already been indexed.
     
-    Accesses ChromaDB collection directly to retrieve all documents and extract source metadata.
+    Reads the source manifest (one metadata record per source, in pages), so
+    the cost does not grow with the number of chunks and no chunk text is loaded.
     
     Args:
         rag_memory: ChromaDBVectorMemory instance
@@ -95,27 +61,15 @@ async def get_indexed_sources(rag_memory: ChromaDBVectorMemory) -> Set[str]:
     Returns:
         Set of source URLs/paths that are already indexed
     """
-    indexed_sources = set()
-    
     try:
-        collection = _get_chromadb_collection(rag_memory)
-        if collection:
-            # Get all documents from the collection
-            results = collection.get(limit=10000)  # Get up to 10000 documents
-            
-            # Extract unique sources from metadata
-            if results and 'metadatas' in results and results['metadatas']:
-                for metadata in results['metadatas']:
-                    if metadata and isinstance(metadata, dict):
-                        source = metadata.get('source')
-                        if source:
-                            indexed_sources.add(source)
+        manifest = get_source_manifest(rag_memory)
+        if manifest:
+            return set(manifest.sources())
     except Exception as e:
         # If query fails, return empty set (assume nothing is indexed)
         print(f"Warning: Could not query indexed sources: {str(e)}")
-        return set()
     
-    return indexed_sources
+    return set()
 
 
 async def is_source_indexed(rag_memory: ChromaDBVectorMemory, source: str) -> bool:
@@ -130,14 +84,9 @@ async def is_source_indexed(rag_memory: ChromaDBVectorMemory, source: str) -> bo
         True if source is already indexed, False otherwise
     """
     try:
-        collection = _get_chromadb_collection(rag_memory)
-        if collection:
-            # Query for documents with matching source metadata
-            results = collection.get(
-                where={"source": source},
-                limit=1
-            )
-            return results is not None and len(results.get('ids', [])) > 0
+        manifest = get_source_manifest(rag_memory)
+        if manifest:
+            return manifest.get(source) is not None
     except Exception:
         pass
     
@@ -148,6 +97,10 @@ async def initialize_vasp_rag_memory(
     rag_memory: ChromaDBVectorMemory,
     clear_existing: bool = False,
     skip_indexed: bool = True,
+    refresh: bool = False,
+    offline: Optional[bool] = None,
+    mirror_dir: Optional[str] = None,
+    mirror_base_url: Optional[str] = None,
 ) -> int:
     """
     Initialize VASP-related RAG memory, indexing INCAR example documents.
@@ -157,15 +110,30 @@ async def initialize_vasp_rag_memory(
         rag_memory: ChromaDBVectorMemory instance
         clear_existing: Whether to clear existing memory
         skip_indexed: Whether to skip sources that are already indexed
+        refresh: Re-check already indexed sources and update the changed ones.
+            Uses conditional requests (ETag / Last-Modified) and content hashes,
+            so only changed chunks are embedded and removed chunks are deleted.
+        offline: Index from the on-disk document cache only, without network
+            access; None reads the VASPGO_RAG_OFFLINE environment variable
+        mirror_dir: Pre-downloaded mirror to import into the document cache first
+        mirror_base_url: URL corresponding to mirror_dir (e.g. "https://www.vasp.at/wiki");
+            None expects wget's host/path layout
     
     Returns:
-        Total number of indexed document chunks
+        Total number of embedded document chunks
     """
     if clear_existing:
         await rag_memory.clear()
+        manifest = get_source_manifest(rag_memory)
+        if manifest:
+            manifest.clear()
         print("Cleared existing RAG memory.")
     
-    indexer = DocumentIndexer(memory=rag_memory, chunk_size=1500)
+    if mirror_dir:
+        imported = DocumentCache().import_mirror(mirror_dir, base_url=mirror_base_url)
+        print(f"Imported {imported} document(s) from the mirror {mirror_dir}")
+    
+    indexer = DocumentIndexer(memory=rag_memory, chunk_size=1500, offline=offline)
     
     sources = [
         "https://www.vasp.at/wiki/INCAR",
@@ -209,7 +177,7 @@ async def initialize_vasp_rag_memory(
     ]
     
     # Filter out already indexed sources
-    if skip_indexed and not clear_existing:
+    if skip_indexed and not clear_existing and not refresh:
         print("Checking for already indexed sources...")
         indexed_sources = await get_indexed_sources(rag_memory)
         new_sources = [s for s in sources if s not in indexed_sources]
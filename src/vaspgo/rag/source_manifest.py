@@ -0,0 +1,178 @@
+"""
+Metadata-only manifest of the sources indexed in a RAG collection.
+
+Listing the indexed sources from the chunk collection means loading every
+chunk. The manifest is a small side collection, "<collection>_sources", in
+the same ChromaDB client with one record per source: source, content hash,
+HTTP validators, chunk count, indexed_at and the chunk IDs. Its records have
+no meaningful embedding, and reading the manifest never loads chunk text.
+The cost is O(number of sources), read in pages.
+
+A manifest that is still empty while the chunk collection is not (an index
+built before the manifest existed) is rebuilt once from the chunk metadata.
+"""
+
+import hashlib
+import json
+import time
+from typing import Dict, List, Optional
+
+MANIFEST_SUFFIX = "_sources"
+PAGE_SIZE = 1000
+
+# Manifest records are looked up by ID only; they carry a constant dummy embedding
+_EMBEDDING = [0.0]
+
+
+def _source_id(source: str) -> str:
+    return hashlib.sha1(source.encode("utf-8")).hexdigest()
+
+
+class SourceManifest:
+    """
+    Per-source index state stored next to a ChromaDB chunk collection.
+
+    Args:
+        client: ChromaDB client holding the chunk collection
+        chunks: The chunk collection
+
+    Example:
+        >>> manifest = get_source_manifest(rag_memory)
+        >>> manifest.get("https://www.vasp.at/wiki/ISTART")["chunk_count"]
+    """
+
+    def __init__(self, client, chunks) -> None:
+        self.chunks = chunks
+        self._manifest = client.get_or_create_collection(
+            name=f"{chunks.name}{MANIFEST_SUFFIX}", embedding_function=None
+        )
+
+    @staticmethod
+    def _entry(metadata: Dict, document: Optional[str] = None) -> Dict:
+        entry = dict(metadata)
+        if document is not None:
+            entry["chunk_ids"] = json.loads(document)
+        return entry
+
+    def get(self, source: str, with_chunk_ids: bool = False) -> Optional[Dict]:
+        """
+        Manifest entry of a source.
+
+        Args:
+            source: Source URL or path
+            with_chunk_ids: Also return the IDs of the source's chunks
+
+        Returns:
+            Dict with "source", "source_hash", "etag", "last_modified",
+            "chunk_count", "indexed_at" (and "chunk_ids"), or None if the
+            source is not indexed
+        """
+        self.ensure_built()
+        include = ["metadatas", "documents"] if with_chunk_ids else ["metadatas"]
+        results = self._manifest.get(ids=[_source_id(source)], include=include)
+        if not results["ids"]:
+            return None
+        document = results["documents"][0] if with_chunk_ids else None
+        return self._entry(results["metadatas"][0], document)
+
+    def sources(self) -> Dict[str, Dict]:
+        """
+        All indexed sources, read page by page (metadata only).
+
+        Returns:
+            Dict of source -> manifest entry (without chunk IDs)
+        """
+        self.ensure_built()
+        entries: Dict[str, Dict] = {}
+        offset = 0
+        while True:
+            results = self._manifest.get(include=["metadatas"], limit=PAGE_SIZE, offset=offset)
+            for metadata in results["metadatas"]:
+                entries[metadata["source"]] = dict(metadata)
+            if len(results["ids"]) < PAGE_SIZE:
+                return entries
+            offset += PAGE_SIZE
+
+    def update(
+        self,
+        source: str,
+        chunk_ids: List[str],
+        source_hash: str = "",
+        etag: str = "",
+        last_modified: str = "",
+    ) -> None:
+        """Record the indexed version of a source."""
+        metadata = {
+            "source": source,
+            "source_hash": source_hash,
+            "etag": etag,
+            "last_modified": last_modified,
+            "chunk_count": len(chunk_ids),
+            "indexed_at": time.time(),
+        }
+        self._manifest.upsert(
+            ids=[_source_id(source)],
+            embeddings=[_EMBEDDING],
+            documents=[json.dumps(list(chunk_ids))],
+            metadatas=[metadata],
+        )
+
+    def remove(self, source: str) -> None:
+        """Forget a source."""
+        self._manifest.delete(ids=[_source_id(source)])
+
+    def clear(self) -> None:
+        """Forget all sources."""
+        ids = self._manifest.get(include=[], limit=PAGE_SIZE)["ids"]
+        while ids:
+            self._manifest.delete(ids=ids)
+            ids = self._manifest.get(include=[], limit=PAGE_SIZE)["ids"]
+
+    def ensure_built(self) -> None:
+        """Rebuild the manifest from the chunk metadata once if it is empty but chunks exist."""
+        if self._manifest.count() > 0:
+            return
+        chunks = self.chunks
+        if chunks.count() == 0:
+            return
+        grouped: Dict[str, Dict] = {}
+        offset = 0
+        while True:
+            results = chunks.get(include=["metadatas"], limit=PAGE_SIZE, offset=offset)
+            for chunk_id, metadata in zip(results["ids"], results["metadatas"]):
+                source = (metadata or {}).get("source")
+                if not source:
+                    continue
+                entry = grouped.setdefault(source, {"ids": [], "metadata": metadata})
+                entry["ids"].append(chunk_id)
+            if len(results["ids"]) < PAGE_SIZE:
+                break
+            offset += PAGE_SIZE
+        for source, entry in grouped.items():
+            metadata = entry["metadata"]
+            self.update(source, entry["ids"], source_hash=metadata.get("source_hash", ""),
+                        etag=metadata.get("etag", ""), last_modified=metadata.get("last_modified", ""))
+
+
+def get_source_manifest(memory) -> Optional[SourceManifest]:
+    """
+    Source manifest of a ChromaDBVectorMemory.
+
+    Args:
+        memory: ChromaDBVectorMemory instance
+
+    Returns:
+        SourceManifest, or None if the memory is not ChromaDB-backed
+    """
+    ensure_initialized = getattr(memory, "_ensure_initialized", None)
+    if ensure_initialized is None:
+        return None
+    ensure_initialized()
+    client = getattr(memory, "_client", None)
+    collection = getattr(memory, "_collection", None)
+    if client is None or collection is None:
+        return None
+    return SourceManifest(client, collection)
+
+
+__all__ = ["SourceManifest", "get_source_manifest"]
@@ -1,10 +1,21 @@
 """
 Text processing utilities using markitdown for converting various file formats to Markdown.
 """
+import io
 from pathlib import Path
-from typing import Union
+from typing import Optional, Union
 
-from markitdown import MarkItDown
+from markitdown import MarkItDown, StreamInfo
+
+_MARKITDOWN: Optional[MarkItDown] = None
+
+
+def _get_markitdown() -> MarkItDown:
+    """Shared MarkItDown instance (creating one loads all converters)."""
+    global _MARKITDOWN
+    if _MARKITDOWN is None:
+        _MARKITDOWN = MarkItDown()
+    return _MARKITDOWN
 
 
 def convert_file_to_markdown(file_path: Union[str, Path]) -> str:
@@ -42,8 +53,7 @@ def convert_file_to_markdown(file_path: Union[str, Path]) -> str:
         raise FileNotFoundError(f"File not found: {file_path}")
     
     try:
-        markitdown = MarkItDown()
-        result = markitdown.convert(str(file_path))
+        result = _get_markitdown().convert(str(file_path))
         return result.text_content
     except Exception as e:
         raise ValueError(f"Failed to convert {file_path} to markdown: {str(e)}")
@@ -70,13 +80,50 @@ def convert_url_to_markdown(url: str) -> str:
         raise ValueError(f"Invalid URL: {url}. Must start with http:// or https://")
     
     try:
-        markitdown = MarkItDown()
-        result = markitdown.convert(url)
+        result = _get_markitdown().convert(url)
         return result.text_content
     except Exception as e:
         raise ValueError(f"Failed to convert URL {url} to markdown: {str(e)}")
 
 
+def convert_bytes_to_markdown(
+    data: bytes,
+    extension: Optional[str] = None,
+    mimetype: Optional[str] = None,
+    charset: Optional[str] = None,
+    url: Optional[str] = None,
+) -> str:
+    """
+    Convert already downloaded content (HTML, PDF, ...) to Markdown using markitdown.
+    
+    Unlike convert_url_to_markdown, this does no network I/O, so the download
+    can be done asynchronously and only the conversion runs in a worker thread.
+    
+    Args:
+        data: Raw content
+        extension: File extension hint, e.g. ".html" or ".pdf"
+        mimetype: MIME type hint, e.g. "text/html"
+        charset: Character set of text content
+        url: Source URL (used for format detection and relative links)
+        
+    Returns:
+        Markdown string content
+        
+    Raises:
+        ValueError: If conversion fails
+        
+    Example:
+        >>> md_content = convert_bytes_to_markdown(html_bytes, extension=".html")
+    """
+    try:
+        stream_info = StreamInfo(extension=extension or None, mimetype=mimetype or None,
+                                 charset=charset, url=url)
+        result = _get_markitdown().convert_stream(io.BytesIO(data), stream_info=stream_info)
+        return result.text_content
+    except Exception as e:
+        raise ValueError(f"Failed to convert {url or 'content'} to markdown: {str(e)}")
+
+
 def is_supported_format(file_path: Union[str, Path]) -> bool:
     """
     Check if file format is supported by markitdown.
@@ -109,5 +156,6 @@ def is_supported_format(file_path: Union[str, Path]) -> bool:
 __all__ = [
     "convert_file_to_markdown",
     "convert_url_to_markdown",
+    "convert_bytes_to_markdown",
     "is_supported_format",
 ]
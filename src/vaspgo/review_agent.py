@@ -1,6 +1,8 @@
 from autogen_agentchat.agents import AssistantAgent
+from autogen_core.tools import FunctionTool, StaticWorkbench
 
 from vaspgo.model_client import create_model_client
+from tools.workspace import summarize_workspace
 
 model_client = create_model_client(configs={"temperature": 1.0})
 
@@ -9,11 +11,14 @@ SYSTEM_PROMPT = """
 """
 
 def create_review_agent():
+    workspace_tool = FunctionTool(summarize_workspace, description=summarize_workspace.__doc__)
     review_agent = AssistantAgent(
         name="REVIEW_AGENT",
         description="An agent for reviewing the calculation results, this agent should be the last to engage when given a new task.",
         model_client=model_client,
         system_message=SYSTEM_PROMPT,
+        workbench=StaticWorkbench([workspace_tool]),
+        reflect_on_tool_use=True,
     )
     return review_agent
 
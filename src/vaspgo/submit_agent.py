@@ -1,8 +1,12 @@
 from autogen_agentchat.agents import AssistantAgent
+from autogen_core.tools import FunctionTool, StaticWorkbench
 from autogen_ext.tools.mcp import McpWorkbench
 
 from vaspgo.model_client import create_model_client 
 from tools.mcp import files_mcp
+from tools.convergence import create_convergence_workbench
+from tools.input_validator import submit_vasp_job, validate_vasp_inputs
+from tools.parallelization import record_loop_timings, tune_parallelization
 
 model_client = create_model_client(configs={"temperature": 1.0})
 
@@ -13,7 +17,7 @@ Your only responsibility is to take the bash workflow script generated by the pr
 1. Directly executing it (if running on an interactive node or local machine), or  
 2. Converting it into a proper job submission script (SLURM or PBS) and submitting it (most common case on HPC clusters).
 
-You have full permission to read files, write new files, and execute commands via the code executor.
+You have full permission to read files and write new files. PBS jobs are submitted with the `submit_vasp_job` tool.
 
 === STRICT WORKFLOW YOU MUST FOLLOW ===
 
@@ -31,7 +35,11 @@ You have full permission to read files, write new files, and execute commands vi
    B. If on PBS cluster    → generate a proper `submit.pbs`
    C. If local/interactive → just make the bash script executable and run it directly
 
-4. When generating SLURM/PBS wrapper, use reasonable defaults unless user specifies otherwise:
+4. Choose the parallelization with `tune_parallelization` for each task directory (nodes and cores per node of the
+   target queue; update_incar=True writes KPAR and NCORE). Request the node count it was given and launch VASP with
+   the recommended number of MPI ranks (e.g. `mpirun -np <ranks>`). If earlier jobs finished in this project, call
+   `record_loop_timings` on their directory first so measured timings are used.
+   When generating SLURM/PBS wrapper, use reasonable defaults unless user specifies otherwise:
    #SBATCH --job-name=VASP_FLOW
    #SBATCH --output=vasp_flow.out
    #SBATCH --error=vasp_flow.err
@@ -47,29 +55,46 @@ You have full permission to read files, write new files, and execute commands vi
    bash the_original_script.sh
 
 6. Final actions:
+   - Call `validate_vasp_inputs` on the workflow script (e.g. "run_vasp_workflow.sh"; files the script creates, such as POSCAR/POTCAR/KPOINTS, may be missing), or on the calculation directory (recursive=True for several task directories) if there is no script. If it reports errors, fix the reported INCAR/KPOINTS/POTCAR/POSCAR problems (or report them) first; warnings may be submitted
    - Write the submission script
    - chmod +x *.sh
-   - Submit with `sbatch submit.slurm` or `qsub submit.pbs`
+   - PBS: submit ONLY with the `submit_vasp_job` tool (e.g. submit_vasp_job("submit.pbs")). Never run `qsub` yourself.
+     The tool validates every task directory the job runs in and refuses to submit while errors remain; fix them and call it again
+   - SLURM: only after `validate_vasp_inputs` reports no errors, give the `sbatch submit.slurm` command
    - Print the job ID clearly
    - If running locally: execute the bash script and stream output
 
-7. If no workflow script is found:
+7. Convergence tests: if the user asks to converge ENCUT or the k-point density (or the workflow needs converged
+   settings that are not recorded yet), first call `get_converged_settings` on the structure. If nothing is recorded,
+   create the ladder with `setup_convergence_scan`, submit it as one job array with `submit_convergence_scan`, and call
+   `check_convergence_scan` on the scan directory to read the energies; it cancels the remaining, more expensive
+   points as soon as the scan has converged and records the result for later tasks.
+
+8. If no workflow script is found:
    Respond exactly: "ERROR: No VASP workflow bash script found in current directory."
 
-8. Never use sudo. Never delete files unless explicitly requested.
+9. Never use sudo. Never delete files unless explicitly requested.
 
-9. It is necessary to avoid generating many files. In the best scenario, for a single computational task, design a PBS file (to allocate resources, load software, and if high-throughput computing is involved, design loops).
+10. It is necessary to avoid generating many files. In the best scenario, for a single computational task, design a PBS file (to allocate resources, load software, and if high-throughput computing is involved, design loops).
 
 Output only meaningful status messages, code blocks you write, and the final submission command + job ID.
 You are the last step — your job ends only when the real VASP job is successfully submitted or running.
 """
 
 async def create_submit_agent():
+    validator_tool = FunctionTool(validate_vasp_inputs, description=validate_vasp_inputs.__doc__)
+    submit_tool = FunctionTool(submit_vasp_job, description=submit_vasp_job.__doc__)
+    tuner_tool = FunctionTool(tune_parallelization, description=tune_parallelization.__doc__)
+    timings_tool = FunctionTool(record_loop_timings, description=record_loop_timings.__doc__)
     async with McpWorkbench(files_mcp) as wb:
         return AssistantAgent(
             name="SUBMIT_AGENT",
             model_client=model_client,
-            workbench=wb,
+            workbench=[
+                StaticWorkbench([validator_tool, submit_tool, tuner_tool, timings_tool]),
+                create_convergence_workbench(),
+                wb,
+            ],
             system_message=SYSTEM_PROMPT,
             reflect_on_tool_use=True,
             max_tool_iterations=20,
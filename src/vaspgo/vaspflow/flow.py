@@ -13,11 +13,12 @@ from tools.mcp import files_mcp
 @asynccontextmanager
 async def create_flow():
     builder = DiGraphBuilder()
-    task_agent = create_task_agent()
-    incar_agent = create_incar_agent()
-    kpoints_agent = create_kpoints_agent()
 
     async with McpWorkbench(files_mcp) as workbench:
+        task_agent = create_task_agent(workbench)
+        # Rule-based INCAR generation writes standard INCARs directly; no score/reject loop
+        incar_agent = create_incar_agent(workbench)
+        kpoints_agent = create_kpoints_agent(workbench)
         sum_agent = create_sum_agent(workbench=workbench)
 
         filtered_sum_agent = MessageFilterAgent(
@@ -33,13 +34,11 @@ async def create_flow():
             ),
         )
 
-        builder.add_node(task_agent).add_node(incar_agent).add_node(incar_score_agent).add_node(kpoints_agent).add_node(filtered_sum_agent)
+        builder.add_node(task_agent).add_node(incar_agent).add_node(kpoints_agent).add_node(filtered_sum_agent)
         builder.set_entry_point(task_agent) 
         builder.add_edge(task_agent, incar_agent)
         builder.add_edge(task_agent, kpoints_agent)
-        builder.add_edge(incar_agent, incar_score_agent, activation_group="initial")
-        builder.add_edge(incar_score_agent, incar_agent, condition="REJECT", activation_group="feedback")
-        builder.add_edge(incar_score_agent, filtered_sum_agent, condition="APPROVE")
+        builder.add_edge(incar_agent, filtered_sum_agent)
         builder.add_edge(kpoints_agent, filtered_sum_agent)
         graph = builder.build()
 
@@ -1,30 +1,68 @@
-import json
-from typing import Annotated, Optional
-from autogen_agentchat.agents import AssistantAgent
+import os
+import re
+from typing import Annotated, AsyncGenerator, Optional, Sequence
+from autogen_agentchat.agents import AssistantAgent, BaseChatAgent
+from autogen_agentchat.base import Response
+from autogen_agentchat.messages import BaseAgentEvent, BaseChatMessage, TextMessage
+from autogen_core import CancellationToken
 from autogen_core.tools import FunctionTool, Workbench, StaticWorkbench
 from autogen_ext.tools.mcp import McpWorkbench
 
+from tools.convergence import get_converged_settings
+from tools.potcar_metadata import estimate_electronic_parameters
+from tools.catalog import ExampleCatalog
+from tools.incar_rules import generate_incars, parse_checklist
 from vaspgo.model_client import create_model_client
 
 model_client = create_model_client(configs={"temperature": 0.0})
 
-INCAR_EXAMPLES_PATH = "src/vaspgo/data/incar_examples.json"
-
-_INCAR_CACHE: dict | None = None
+INCAR_EXAMPLES_RESOURCE = "data/incar_examples.json"
+
+# Search keywords implied by INCAR tags: (tag, value or None for any value) -> keywords
+_TAG_KEYWORDS = {
+    ("LHFCALC", None): "hybrid functional HSE HSE06 PBE0 screened exact exchange",
+    ("METAGGA", None): "meta-GGA SCAN r2SCAN",
+    ("LDAU", None): "DFT+U GGA+U Hubbard U correlated d f electrons",
+    ("LOPTICS", None): "optical properties dielectric function absorption",
+    ("LOPTICAL", None): "optical properties dielectric function absorption",
+    ("LSORBIT", None): "spin-orbit coupling SOC noncollinear",
+    ("LVHAR", None): "work function electrostatic potential LOCPOT vacuum level",
+    ("LDIPOL", None): "dipole correction slab surface",
+    ("IBRION", "7"): "DFPT phonon force constants linear response",
+    ("IBRION", "8"): "DFPT phonon force constants linear response",
+    ("IBRION", "1"): "structure relaxation geometry optimization ionic",
+    ("IBRION", "2"): "structure relaxation geometry optimization ionic",
+    ("ICHARG", "11"): "non-self-consistent NSCF band structure DOS from CHGCAR",
+    ("NEDOS", None): "density of states DOS",
+    ("LORBIT", None): "projected DOS PDOS orbital",
+    ("IVDW", None): "van der Waals vdW dispersion correction DFT-D3",
+    ("ISPIN", "2"): "spin polarized magnetic",
+}
+
+
+def _describe_incar_example(category_name: str, params: dict) -> str:
+    """Search text of an INCAR example: its tags plus the keywords they imply."""
+    keywords = [words for (tag, value), words in _TAG_KEYWORDS.items()
+                if tag in params and (value is None or str(params[tag]).strip() == value)]
+    return " ".join([category_name, " ".join(params)] + keywords)
+
+
+# Pre-rendered, typo-tolerant lookup and free-text search; reloaded when the JSON file changes
+_INCAR_CATALOG = ExampleCatalog(
+    INCAR_EXAMPLES_RESOURCE,
+    lambda key, entry: _format_incar_details(key, entry),
+    describe=_describe_incar_example,
+)
 
 
 def _load_incar_examples() -> dict:
     """
-    Load INCAR examples from the JSON file with caching.
+    Load INCAR examples from the packaged JSON catalog.
     
     Returns:
         dict: Dictionary containing all INCAR examples organized by category.
     """
-    global _INCAR_CACHE
-    if _INCAR_CACHE is None:
-        with open(INCAR_EXAMPLES_PATH, "r", encoding="utf-8") as f:
-            _INCAR_CACHE = json.load(f)
-    return _INCAR_CACHE
+    return _INCAR_CATALOG.data
 
 
 def _get_available_keys() -> list[str]:
@@ -40,7 +78,7 @@ def _get_available_keys() -> list[str]:
 def get_incar_examples(
     category_key: Annotated[
         str,
-        "The category key to retrieve INCAR examples for. Must be one of the available keys."
+        "The category key to retrieve INCAR examples for. Case and small typos are tolerated."
     ]
 ) -> str:
     """
@@ -50,21 +88,46 @@ def get_incar_examples(
     You can call this tool multiple times with different keys to understand
     parameter settings for different calculation scenarios.
     
+    Keys are matched case-insensitively and tolerate typos; an unknown key
+    returns the closest category (with a note) instead of an error.
+    
     Args:
-        category_key: The exact category key to retrieve INCAR examples for.
+        category_key: The category key to retrieve INCAR examples for.
     
     Returns:
         str: Formatted string containing the INCAR parameters.
     """
-    examples_data = _load_incar_examples()
+    return _INCAR_CATALOG.lookup(category_key)
+
+
+def search_incar_examples(
+    query: Annotated[
+        str,
+        "Free-text description of the calculation, e.g. 'HSE band with SOC' or 'slab work function'."
+    ],
+    k: Annotated[
+        int,
+        "Maximum number of examples to return."
+    ] = 3
+) -> str:
+    """
+    Find the INCAR examples best matching a free-text calculation description.
     
-    if category_key not in examples_data:
-        available = _get_available_keys()
-        return f"Error: Key '{category_key}' not found.\n\nAvailable keys:\n" + \
-               "\n".join(f"  - {key}" for key in available)
+    Ranks all INCAR example categories locally (BM25 over category names, INCAR
+    tags and the physics they imply) and returns the best `k` examples in one
+    call, so no category key is needed.
     
-    params = examples_data[category_key]
-    return _format_incar_details(category_key, params)
+    Args:
+        query: Free-text description of the calculation.
+        k: Maximum number of examples.
+    
+    Returns:
+        str: The matching INCAR examples, best first.
+    
+    Example:
+        search_incar_examples("non-self-consistent DOS of a magnetic oxide with U")
+    """
+    return _INCAR_CATALOG.search(query, k=k)
 
 
 def _format_incar_details(category_name: str, params: dict) -> str:
@@ -88,11 +151,77 @@ def _format_incar_details(category_name: str, params: dict) -> str:
     return result
 
 
+def _read_checklist(checklist: str) -> str:
+    """Checklist text from a task_note.md path or the text itself."""
+    if "\n" not in checklist and os.path.isfile(checklist):
+        with open(checklist, "r", encoding="utf-8") as f:
+            return f.read()
+    return checklist
+
+
+def _format_generation_summary(result: dict) -> str:
+    lines = [f"Rule-based INCAR generation: {len(result['generated'])} generated, "
+             f"{len(result['unmatched'])} left for manual generation."]
+    for task, path, category, notes in result["generated"]:
+        extra = f" ({'; '.join(notes)})" if notes else ""
+        lines.append(f"  [✅] Task {task.index} {task.name} → {path} [{category}]{extra}")
+    for task, path, reason in result["unmatched"]:
+        lines.append(f"  [❌] Task {task.index} {task.name} → {path}: {reason}")
+    for task, reason in result["skipped"]:
+        lines.append(f"  [-] Task {task.index} {task.name}: {reason}")
+    lines.append(f"Note: {result['note_path']}")
+    return "\n".join(lines)
+
+
+def gen_incar_from_checklist(
+    checklist: Annotated[
+        str,
+        "Path to task_note.md, or the VASP Task Checklist text itself."
+    ],
+    output_dir: Annotated[
+        Optional[str],
+        "Directory for incar_note.md and for INCARs of tasks without a 'dir'. None uses the checklist's directory."
+    ] = None,
+    structure_path: Annotated[
+        Optional[str],
+        "Structure file used when a task directory has no POSCAR yet (needed for DFT+U and NBANDS)."
+    ] = None
+) -> str:
+    """
+    Generate INCARs for all standard tasks of a checklist with deterministic rules.
+    
+    Relaxation, SCF, DOS, PBE/HSE06 bands, meta-GGA, DFPT, optics, work function
+    and DFT+U tasks are built from the matching INCAR example, the precision
+    level, dependencies (ISTART/ICHARG, LWAVE/LCHARG for later tasks) and
+    explicit TAG=VALUE requirements, and written together with incar_note.md.
+    Tasks that match no rule are listed as incomplete for manual generation.
+    
+    Args:
+        checklist: task_note.md path or checklist text.
+        output_dir: Directory for the note and for INCARs of tasks without a directory.
+        structure_path: Fallback structure file.
+    
+    Returns:
+        str: Generated INCAR files and the tasks left for manual generation.
+    
+    Example:
+        gen_incar_from_checklist("calc/task_note.md", structure_path="calc/POSCAR")
+    """
+    if output_dir is None:
+        is_path = "\n" not in checklist and os.path.isfile(checklist)
+        output_dir = os.path.dirname(os.path.abspath(checklist)) if is_path else "."
+    text = _read_checklist(checklist)
+    if not parse_checklist(text):
+        return "Error: no tasks found in the checklist."
+    result = generate_incars(text, _load_incar_examples(), output_dir=output_dir, structure_path=structure_path)
+    return _format_generation_summary(result)
+
+
 SYSTEM_PROMPT = """
 You are an expert VASP workflow automation assistant. Your job is to generate a correct INCAR file for **every task** in the provided "VASP Task Checklist" table based on its Task Name, Precision Level, and Special Requirements.
 
 ### Available INCAR Example Categories
-Use `get_incar_examples` tool with these keys to retrieve parameter references:
+Use `search_incar_examples` with a free-text description of the task (e.g. "HSE band with SOC") to get the best matching examples in one call, or `get_incar_examples` with one of these keys:
 {available_keys}
 
 # Input format (example)
@@ -103,6 +232,7 @@ Use `get_incar_examples` tool with these keys to retrieve parameter references:
 ```
 
 # You must proceed as follows:
+0. If the checklist (or task_note.md) is available, first call `gen_incar_from_checklist` once: it writes the INCARs of all standard tasks and incar_note.md deterministically. Then only handle the tasks it reports as [❌] with the steps below.
 1. List all INCAR file names in the target directory, while avoiding duplicate names, record the list of INCAR file names that need to be generated and their function descriptions and precision, take notes, mark as incomplete, and leave note empty.
 2. Select an uncompleted INCAR in order, and call the tool to query the corresponding example before generating. If there is no completely corresponding example, query similar examples or combine multiple examples.
 ### Reference values for parameters influenced by accuracy
@@ -111,6 +241,8 @@ Use `get_incar_examples` tool with these keys to retrieve parameter references:
 - **medium**:  PREC = Normal; ENCUT = 400;  SIGMA = 0.05; EDIFF = 1E-4; EDIFFG = -0.05
 - **high**:    PREC = Accurate; ENCUT = 500;  SIGMA = 0.05; EDIFF = 1E-5; EDIFFG = -0.02
 - **ultrahigh**:    PREC = Accurate; ENCUT = 600;  SIGMA = 0.02; EDIFF = 1E-6; EDIFFG = -0.01
+- If the structure file is known, call `get_converged_settings` once: a recorded converged ENCUT replaces the reference ENCUT of high/ultrahigh tasks when it is larger (unless the task's reqs fix ENCUT)
+- If the structure file is known, call `estimate_electronic_parameters` once instead of reading POTCARs: ENCUT must not be lower than its recommended ENCUT (1.3 x max ENMAX), and use its NELECT/NBANDS wherever a task needs them (e.g. NBANDS for optics)
 3. Generate INCAR and write it to the target directory, naming it exactly as in the notes.
 4. Write a good note, focusing only on parameters that depend on other files, such as NBANDS in optical computing and OUTCAR in SCF calculation. After writing the note, mark the corresponding task as completed.
 5. If there are still tasks to generate INCAR that have not been completed, return to step 2; otherwise, end the task.
@@ -127,26 +259,45 @@ Use `get_incar_examples` tool with these keys to retrieve parameter references:
 Only inform the location of the output note file incar_note.md
 """
 
-def create_incar_agent(workbench: Workbench) -> AssistantAgent:
+def create_incar_agent(
+    workbench: Workbench,
+    rule_based: bool = True,
+    output_dir: Optional[str] = None,
+    structure_path: Optional[str] = None,
+) -> BaseChatAgent:
     """
     Create INCAR agent instance.
     
+    With `rule_based` (default), standard tasks are generated by the rule
+    engine without any model call and the LLM agent only handles the rest
+    (see RuleBasedIncarAgent).
+    
     The agent is equipped with the `get_incar_examples` tool to dynamically
     retrieve INCAR parameter examples by category key. This is useful for:
     - Getting reference parameters for different calculation types
     - Combining parameters from multiple examples for complex tasks
     - Understanding the typical INCAR settings before generation
     
+    Args:
+        workbench: MCP workbench for file system operations.
+        rule_based: Wrap the LLM agent in the rule-based fast path.
+        output_dir: Directory for INCARs of tasks without a directory (rule-based path).
+        structure_path: Fallback structure file (rule-based path).
+    
     Returns:
-        AssistantAgent: Configured INCAR agent for VASP INCAR generation.
+        BaseChatAgent: Configured INCAR agent for VASP INCAR generation.
     """
     available_keys = _get_available_keys()
     keys_formatted = "\n".join(f"  - {key}" for key in available_keys)
 
     incar_tool = FunctionTool(get_incar_examples, description=get_incar_examples.__doc__)
-    tools_workbench = StaticWorkbench([incar_tool])
+    incar_search_tool = FunctionTool(search_incar_examples, description=search_incar_examples.__doc__)
+    converged_tool = FunctionTool(get_converged_settings, description=get_converged_settings.__doc__)
+    electronic_tool = FunctionTool(estimate_electronic_parameters, description=estimate_electronic_parameters.__doc__)
+    rules_tool = FunctionTool(gen_incar_from_checklist, description=gen_incar_from_checklist.__doc__)
+    tools_workbench = StaticWorkbench([incar_tool, incar_search_tool, converged_tool, electronic_tool, rules_tool])
 
-    return AssistantAgent(
+    llm_agent = AssistantAgent(
         name="INCAR_AGENT",
         model_client=model_client,
         system_message=SYSTEM_PROMPT.format(available_keys=keys_formatted),
@@ -155,9 +306,119 @@ def create_incar_agent(workbench: Workbench) -> AssistantAgent:
         max_tool_iterations=50,
         description="A VASP INCAR agent that generates INCAR files for each task in the VASP Task Checklist."
     )
+    if not rule_based:
+        return llm_agent
+    return RuleBasedIncarAgent(llm_agent, output_dir=output_dir, structure_path=structure_path)
 
 
-__all__ = ["create_incar_agent", "get_incar_examples"]
+class RuleBasedIncarAgent(BaseChatAgent):
+    """
+    INCAR agent that generates standard INCARs with rules and calls the LLM only for the rest.
+    
+    The checklist is taken from the latest message (or a task_note.md path in
+    it). If every computational task has a directory (or `output_dir` is
+    set) and matches a rule, the INCARs are written directly and no model call
+    is made. Otherwise the wrapped LLM agent gets the conversation plus a
+    summary of what the rules already generated.
+
+    When the agent is called again for a checklist it has already generated
+    (e.g. with reviewer feedback on its INCARs), the rules would only write
+    the same files again, so the call goes to the LLM agent together with the
+    checklist and the rule-based summary, and the LLM revises the INCARs
+    according to the feedback.
+    
+    Args:
+        llm_agent: The LLM-based INCAR agent.
+        output_dir: Directory for the note and INCARs of tasks without a directory.
+        structure_path: Fallback structure file.
+    """
+
+    def __init__(self, llm_agent: AssistantAgent, output_dir: Optional[str] = None,
+                 structure_path: Optional[str] = None):
+        super().__init__(name=llm_agent.name, description=llm_agent.description)
+        self._llm_agent = llm_agent
+        self._output_dir = output_dir
+        self._structure_path = structure_path
+        # Checklist text -> summary of the INCARs the rules generated for it
+        self._generated: dict[str, str] = {}
+
+    @property
+    def produced_message_types(self) -> Sequence[type[BaseChatMessage]]:
+        return (TextMessage,)
+
+    def _find_checklist(self, messages: Sequence[BaseChatMessage]) -> Optional[str]:
+        for message in reversed(messages):
+            text = message.to_text()
+            if parse_checklist(text):
+                return text
+            for path in re.findall(r"[^\s'\"`]*task_note\.md", text):
+                if os.path.isfile(path):
+                    return _read_checklist(path)
+        return None
+
+    def _try_rules(self, messages: Sequence[BaseChatMessage]) -> tuple[Optional[str], bool]:
+        """(summary, complete) of the rule-based pass; summary None if it did not run."""
+        text = self._find_checklist(messages)
+        if text is None:
+            return None, False
+        tasks = [t for t in parse_checklist(text) if t.precision != "null"]
+        if not tasks or (self._output_dir is None and any(not t.dir for t in tasks)):
+            return None, False
+        result = generate_incars(text, _load_incar_examples(), output_dir=self._output_dir or os.path.commonpath([os.path.abspath(t.dir) for t in tasks]),
+                                 structure_path=self._structure_path)
+        summary = _format_generation_summary(result)
+        self._generated[text] = summary
+        return summary, not result["unmatched"]
+
+    async def on_messages(self, messages: Sequence[BaseChatMessage], cancellation_token: CancellationToken) -> Response:
+        response = None
+        async for item in self.on_messages_stream(messages, cancellation_token):
+            if isinstance(item, Response):
+                response = item
+        return response
+
+    async def on_messages_stream(
+        self, messages: Sequence[BaseChatMessage], cancellation_token: CancellationToken
+    ) -> AsyncGenerator[BaseAgentEvent | BaseChatMessage | Response, None]:
+        checklist = self._find_checklist(messages)
+        if checklist is None and self._generated:
+            # Only new messages are passed in: no checklist means a follow-up on the last one
+            checklist = next(reversed(self._generated))
+        if checklist in self._generated:
+            # Called again for the same checklist: feedback on the generated INCARs
+            messages = [
+                TextMessage(content=checklist, source="user"),
+                TextMessage(content=self._generated[checklist]
+                            + "\nThese INCARs were generated by rules. Revise them according to the feedback below.",
+                            source=self.name),
+            ] + list(messages)
+            async for item in self._llm_agent.on_messages_stream(messages, cancellation_token):
+                yield item
+            return
+        summary, complete = self._try_rules(messages)
+        if complete:
+            yield Response(chat_message=TextMessage(content=summary, source=self.name))
+            return
+        if summary is not None:
+            messages = list(messages) + [TextMessage(
+                content=summary + "\nOnly generate the INCARs marked [❌] and update their note entries.",
+                source=self.name,
+            )]
+        async for item in self._llm_agent.on_messages_stream(messages, cancellation_token):
+            yield item
+
+    async def on_reset(self, cancellation_token: CancellationToken) -> None:
+        self._generated.clear()
+        await self._llm_agent.on_reset(cancellation_token)
+
+
+__all__ = [
+    "create_incar_agent",
+    "get_incar_examples",
+    "search_incar_examples",
+    "gen_incar_from_checklist",
+    "RuleBasedIncarAgent",
+]
 
 if __name__ == '__main__':
     import asyncio
@@ -1,8 +1,11 @@
-from typing import Annotated, Literal
+import os
+from typing import Annotated, Literal, Optional
+from pydantic import BaseModel, Field
 from autogen_agentchat.agents import AssistantAgent
-from autogen_core.tools import FunctionTool, Workbench, StaticWorkbench
+from autogen_core.tools import Workbench, StaticWorkbench
 from autogen_ext.tools.mcp import McpWorkbench
 
+from tools.worker_pool import pooled_tool
 from vaspgo.model_client import create_model_client
 
 model_client = create_model_client(configs={"temperature": 0.0})
@@ -17,6 +20,134 @@ KPOINT_DENSITY = {
 }
 
 
+Precision = Literal['only-gamma', 'low', 'medium', 'high', 'ultrahigh']
+DimensionalityBackend = Literal['auto', 'fast', 'larsen']
+
+# 'auto' backend: structures larger than this use the fast cell-list detector
+FAST_DIMENSIONALITY_MIN_ATOMS = 100
+
+
+def _detect_dimensionality(structure) -> Optional[int]:
+    """
+    Detect the dimensionality (0-3) of a pymatgen Structure with the Larsen algorithm.
+    
+    Returns None if the bonding analysis fails.
+    """
+    from pymatgen.analysis.dimensionality import get_dimensionality_larsen
+    from pymatgen.analysis.local_env import CrystalNN
+    import warnings
+    
+    try:
+        # Larsen works on the bonded structure (structure graph), not the bare structure
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")  # CrystalNN warns about missing oxidation states
+            return int(get_dimensionality_larsen(CrystalNN().get_bonded_structure(structure)))
+    except Exception:
+        return None
+
+
+def _analyze_dimensionality(structure, backend: str = 'auto') -> tuple[int, Optional[int], bool]:
+    """
+    Dimensionality and special axis of a structure, using the on-disk cache.
+    
+    Args:
+        structure: ArrayStructure to analyze.
+        backend: 'larsen' (CrystalNN + Larsen), 'fast' (covalent-radius cell-list
+            detector) or 'auto' (fast for structures above FAST_DIMENSIONALITY_MIN_ATOMS).
+    
+    Returns:
+        tuple: (dimensionality, vacuum axis for 2D / periodic axis for 1D or None,
+        whether the result came from the cache).
+    """
+    import numpy as np
+    from tools.dimensionality import detect_dimensionality, lookup_dimensionality, store_dimensionality
+    
+    use_fast = backend == 'fast' or (backend == 'auto' and len(structure) > FAST_DIMENSIONALITY_MIN_ATOMS)
+    cached = lookup_dimensionality(structure, method="fast" if use_fast else "larsen")
+    if cached is not None:
+        return cached["dimensionality"], cached["axis"], True
+    
+    if use_fast:
+        dimensionality, axis = detect_dimensionality(structure)
+        store_dimensionality(structure, dimensionality, axis, method="fast")
+        return dimensionality, axis, False
+    
+    dimensionality = _detect_dimensionality(structure.to_pymatgen())
+    if dimensionality is None:
+        # Fallback to 3D if dimensionality detection fails (not cached)
+        return 3, None, False
+    
+    # Vacuum direction of 2D materials: longest lattice vector (c-axis typically);
+    # periodic direction of 1D materials: shortest lattice vector
+    axis = None
+    if dimensionality == 2:
+        axis = int(np.argmax(structure.abc))
+    elif dimensionality == 1:
+        axis = int(np.argmin(structure.abc))
+    store_dimensionality(structure, dimensionality, axis, method="larsen")
+    return dimensionality, axis, False
+
+
+def _converged_density(structure) -> Optional[float]:
+    """Converged k-point length density recorded for the material by a convergence scan."""
+    from tools.convergence import converged_value
+    
+    try:
+        return converged_value(structure, "kpoints")
+    except Exception:
+        return None
+
+
+def _k_lengths(
+    precision: str,
+    dimensionality: int,
+    axis: Optional[int],
+    converged_density: Optional[float] = None
+) -> tuple[list[int], str]:
+    """
+    K-point length densities along a, b, c for a precision level and dimensionality.
+    
+    Args:
+        precision: Precision level (key of KPOINT_DENSITY).
+        dimensionality: Detected dimensionality (0-3).
+        axis: Vacuum axis (2D) or periodic axis (1D) as lattice index.
+        converged_density: Converged length density of the material; high and
+            ultrahigh precision never go below it.
+    
+    Returns:
+        tuple: (length densities for a, b, c, human-readable dimensionality note).
+    """
+    import math
+    
+    base_density = KPOINT_DENSITY[precision]
+    if precision in ('high', 'ultrahigh') and converged_density and converged_density > base_density:
+        base_density = math.ceil(converged_density)
+    
+    # Determine k-point density for each direction based on dimensionality
+    if precision == 'only-gamma':
+        k_lengths = [1, 1, 1]
+        dim_note = "Gamma-only calculation"
+    elif dimensionality == 3:
+        # 3D: uniform k-mesh
+        k_lengths = [base_density, base_density, base_density]
+        dim_note = "3D bulk material"
+    elif dimensionality == 2:
+        # 2D: use 1 k-point along vacuum direction
+        k_lengths = [base_density, base_density, base_density]
+        k_lengths[axis] = 1
+        dim_note = f"2D material (vacuum along {'abc'[axis]}-axis)"
+    elif dimensionality == 1:
+        # 1D: use 1 k-point along the two non-periodic directions
+        k_lengths = [1, 1, 1]
+        k_lengths[axis] = base_density
+        dim_note = f"1D material (periodic along {'abc'[axis]}-axis)"
+    else:
+        # 0D: molecule or cluster
+        k_lengths = [1, 1, 1]
+        dim_note = "0D molecule/cluster"
+    return k_lengths, dim_note
+
+
 def gen_kpoints(
     poscar_path: Annotated[
         str,
@@ -27,13 +158,18 @@ def gen_kpoints(
         "Path where the generated KPOINTS file will be saved."
     ],
     precision: Annotated[
-        Literal['only-gamma', 'low', 'medium', 'high', 'ultrahigh'],
+        Precision,
         "Precision level for k-point density. Higher precision means denser k-mesh."
     ],
     force_gamma: Annotated[
         bool,
         "If True, force Gamma-centered k-mesh. Recommended for hexagonal systems and HSE06 calculations."
-    ] = True
+    ] = True,
+    dimensionality_backend: Annotated[
+        DimensionalityBackend,
+        "Dimensionality detector: 'larsen' (CrystalNN bonding), 'fast' (covalent-radius cell lists, "
+        "for thousands of atoms) or 'auto' (fast for large cells)."
+    ] = 'auto'
 ) -> str:
     """
     Generate a KPOINTS file with automatic dimensionality detection.
@@ -48,58 +184,26 @@ def gen_kpoints(
         kpoints_path: Path where the output KPOINTS file will be written.
         precision: K-point density level (only-gamma/low/medium/high/ultrahigh).
         force_gamma: Whether to use Gamma-centered k-mesh.
+        dimensionality_backend: Dimensionality detection backend.
     
     Returns:
         str: Success message with dimensionality info and k-mesh details.
     """
-    from pymatgen.core import Structure
     from pymatgen.io.vasp.inputs import Kpoints
-    from pymatgen.analysis.dimensionality import get_dimensionality_larsen
-    import numpy as np
+    from tools.poscar_io import load_structure
 
-    structure = Structure.from_file(poscar_path)
-    base_density = KPOINT_DENSITY[precision]
+    array_structure = load_structure(poscar_path)
     
-    # Detect dimensionality using Larsen algorithm
-    try:
-        dim_info = get_dimensionality_larsen(structure)
-        # dim_info returns a list of (dim, components) tuples
-        # Take the highest dimensionality found
-        dimensionality = max(d[0] for d in dim_info) if dim_info else 3
-    except Exception:
-        # Fallback to 3D if dimensionality detection fails
-        dimensionality = 3
-    
-    # Get lattice vectors to identify non-periodic directions
-    lattice = structure.lattice
-    lengths = [lattice.a, lattice.b, lattice.c]
-    
-    # Determine k-point density for each direction based on dimensionality
+    # Detect dimensionality using Larsen algorithm (or reuse a cached result)
     if precision == 'only-gamma':
-        k_lengths = [1, 1, 1]
-        dim_note = "Gamma-only calculation"
-    elif dimensionality == 3:
-        # 3D: uniform k-mesh
-        k_lengths = [base_density, base_density, base_density]
-        dim_note = "3D bulk material"
-    elif dimensionality == 2:
-        # 2D: find the vacuum direction (longest lattice vector or c-axis typically)
-        # Use 1 k-point along vacuum direction
-        vacuum_idx = np.argmax(lengths)
-        k_lengths = [base_density, base_density, base_density]
-        k_lengths[vacuum_idx] = 1
-        dim_note = f"2D material (vacuum along {'abc'[vacuum_idx]}-axis)"
-    elif dimensionality == 1:
-        # 1D: find the periodic direction (shortest), use 1 k-point for other two
-        periodic_idx = np.argmin(lengths)
-        k_lengths = [1, 1, 1]
-        k_lengths[periodic_idx] = base_density
-        dim_note = f"1D material (periodic along {'abc'[periodic_idx]}-axis)"
+        dimensionality, axis, cached = 3, None, False
     else:
-        # 0D: molecule or cluster
-        k_lengths = [1, 1, 1]
-        dim_note = "0D molecule/cluster"
+        dimensionality, axis, cached = _analyze_dimensionality(array_structure, dimensionality_backend)
+    
+    converged_density = _converged_density(array_structure)
+    k_lengths, dim_note = _k_lengths(precision, dimensionality, axis, converged_density)
     
+    structure = array_structure.to_pymatgen()
     kpoints = Kpoints.automatic_density_by_lengths(structure, k_lengths, force_gamma)
     kpoints.write_file(kpoints_path)
     
@@ -107,12 +211,331 @@ def gen_kpoints(
     kpts_str = f"{kpoints.kpts[0][0]}x{kpoints.kpts[0][1]}x{kpoints.kpts[0][2]}"
     
     return (f"KPOINTS generated at {kpoints_path}\n"
-            f"  Dimensionality: {dimensionality}D ({dim_note})\n"
-            f"  Precision: {precision}\n"
+            f"  Dimensionality: {dimensionality}D ({dim_note}){' [cached]' if cached else ''}\n"
+            f"  Precision: {precision}"
+            f"{f' (converged length density {converged_density:g} recorded)' if converged_density else ''}\n"
             f"  K-mesh: {kpts_str}\n"
             f"  Gamma-centered: {force_gamma}")
 
 
+class KpointsTask(BaseModel):
+    """One KPOINTS file to generate in a batch."""
+    task_dir: str = Field(description="Task directory. KPOINTS is written here.")
+    precision: Precision = Field(description="Precision level of the task (from the checklist).")
+    force_gamma: bool = Field(default=True, description="Force a Gamma-centered k-mesh.")
+    poscar_path: Optional[str] = Field(
+        default=None, description="Structure file. Defaults to <task_dir>/POSCAR.")
+    kpoints_name: str = Field(
+        default="KPOINTS", description="Output file name inside task_dir (e.g. KPOINTS or KPOINTS_scf).")
+
+
+def gen_kpoints_batch(
+    tasks: Annotated[
+        list[KpointsTask],
+        "All KPOINTS files to generate: one entry per task with task_dir, precision and force_gamma."
+    ],
+    note_path: Annotated[
+        Optional[str],
+        "If given, write the kpoints_note.md summary to this path."
+    ] = None,
+    dimensionality_backend: Annotated[
+        DimensionalityBackend,
+        "Dimensionality detector: 'larsen', 'fast' or 'auto' (fast for large cells)."
+    ] = 'auto'
+) -> str:
+    """
+    Generate the KPOINTS files of a whole task checklist in one call.
+    
+    Each distinct structure is read and analyzed (dimensionality detection) only
+    once, even if several tasks share it; then every KPOINTS file is written.
+    Tasks whose structure file is missing or unreadable are reported as failed
+    without stopping the batch.
+    
+    Args:
+        tasks: KPOINTS files to generate (task_dir, precision, force_gamma, ...).
+        note_path: Optional path of the kpoints_note.md file to write.
+        dimensionality_backend: Dimensionality detection backend.
+    
+    Returns:
+        str: Compact summary table with one row per task.
+    
+    Example:
+        gen_kpoints_batch([{"task_dir": "1_relax", "precision": "low"},
+                           {"task_dir": "2_scf", "precision": "high", "force_gamma": True}],
+                          "kpoints_note.md")
+    """
+    from pymatgen.io.vasp.inputs import Kpoints
+    from tools.fingerprint import structure_hash
+    from tools.poscar_io import load_structure
+    
+    analyses = {}  # structure hash -> {"structure": pymatgen structure, "dimensionality": (dim, axis), "density": ...}
+    rows = []
+    notes = []
+    n_ok = 0
+    for task in tasks:
+        poscar_path = task.poscar_path or os.path.join(task.task_dir, "POSCAR")
+        kpoints_path = os.path.join(task.task_dir, task.kpoints_name)
+        try:
+            array_structure = load_structure(poscar_path)
+            key = structure_hash(array_structure)
+            analysis = analyses.setdefault(key, {"structure": array_structure.to_pymatgen()})
+            # Analyses are only run for the precisions that use them (as in gen_kpoints)
+            dimensionality, axis, converged_density = 3, None, None
+            if task.precision != 'only-gamma':
+                if "dimensionality" not in analysis:
+                    analysis["dimensionality"] = _analyze_dimensionality(array_structure, dimensionality_backend)[:2]
+                dimensionality, axis = analysis["dimensionality"]
+            if task.precision in ('high', 'ultrahigh'):
+                if "density" not in analysis:
+                    analysis["density"] = _converged_density(array_structure)
+                converged_density = analysis["density"]
+            
+            k_lengths, _ = _k_lengths(task.precision, dimensionality, axis, converged_density)
+            kpoints = Kpoints.automatic_density_by_lengths(analysis["structure"], k_lengths, task.force_gamma)
+            kpoints.write_file(kpoints_path)
+        except Exception as e:
+            rows.append(f"  {kpoints_path:<40} {task.precision:<10} {'-':>3} {'-':>9} {'-':>5}  ❌ {e}")
+            notes.append(f"- [❌] {kpoints_path}, precision: {task.precision}, k-mesh: failed, dim: -")
+            continue
+        
+        n_ok += 1
+        mesh = "x".join(str(k) for k in kpoints.kpts[0])
+        rows.append(f"  {kpoints_path:<40} {task.precision:<10} {dimensionality:>2}D {mesh:>9} "
+                    f"{str(task.force_gamma):>5}  ✅")
+        notes.append(f"- [✅] {kpoints_path}, precision: {task.precision}, k-mesh: {mesh}, dim: {dimensionality}D")
+    
+    if note_path:
+        with open(note_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(notes) + "\n")
+    
+    return (f"KPOINTS batch: {n_ok}/{len(tasks)} generated, {len(analyses)} distinct structures analyzed\n"
+            f"  {'file':<40} {'precision':<10} {'dim':>3} {'k-mesh':>9} {'gamma':>5}\n"
+            + "\n".join(rows)
+            + (f"\n  Note: {note_path}" if note_path else ""))
+
+
+def kpoint_meshes(
+    lattices,
+    precisions,
+    dimensionalities=None,
+    axes=None,
+    converged_densities=None,
+):
+    """
+    Vectorized k-mesh for many structures (same scheme as `gen_kpoints`).
+    
+    Args:
+        lattices: Lattice matrices, shape (M, 3, 3).
+        precisions: Precision level per structure (length M) or a single level.
+        dimensionalities: Dimensionality per structure (default: all 3D).
+        axes: Vacuum (2D) / periodic (1D) axis per structure; -1 where not applicable.
+        converged_densities: Converged length density per structure (NaN where
+            none is recorded); high and ultrahigh precision never go below it.
+    
+    Returns:
+        tuple: (meshes as int array (M, 3), length densities as int array (M, 3)).
+    """
+    import numpy as np
+    
+    lattices = np.asarray(lattices, dtype=float)
+    n = len(lattices)
+    precisions = np.broadcast_to(np.asarray(precisions), (n,))
+    dims = np.full(n, 3) if dimensionalities is None else np.asarray(dimensionalities)
+    axes = np.full(n, -1) if axes is None else np.asarray(axes)
+    
+    base = np.array([KPOINT_DENSITY[p] for p in precisions])
+    base[precisions == 'only-gamma'] = 1
+    if converged_densities is not None:
+        converged = np.ceil(np.nan_to_num(np.asarray(converged_densities, dtype=float), nan=0.0))
+        raise_to = np.isin(precisions, ('high', 'ultrahigh')) & (converged > base)
+        base = np.where(raise_to, converged, base)
+    base = base.astype(int)
+    
+    # Length densities per direction: same rules as _k_lengths
+    densities = np.repeat(base[:, None], 3, axis=1)
+    densities[dims <= 1] = 1
+    rows = np.flatnonzero((dims == 2) & (axes >= 0))
+    densities[rows, axes[rows]] = 1
+    rows = np.flatnonzero((dims == 1) & (axes >= 0))
+    densities[rows, axes[rows]] = base[rows]
+    
+    abc = np.linalg.norm(lattices, axis=2)
+    meshes = np.ceil(densities / abc).astype(int)
+    return meshes, densities
+
+
+def _is_hexagonal(lattices, angle_tol: float = 5.0, length_tol: float = 0.01):
+    """Vectorized pymatgen `Lattice.is_hexagonal` for lattices of shape (M, 3, 3)."""
+    import numpy as np
+    
+    abc = np.linalg.norm(lattices, axis=2)
+    pairs = [(1, 2), (0, 2), (0, 1)]
+    angles = np.degrees(np.arccos(np.clip(np.stack(
+        [np.einsum('ij,ij->i', lattices[:, i], lattices[:, j]) / (abc[:, i] * abc[:, j]) for i, j in pairs],
+        axis=1), -1.0, 1.0)))
+    right = np.abs(angles - 90) <= angle_tol
+    hexa = (np.abs(angles - 60) <= angle_tol) | (np.abs(angles - 120) <= angle_tol)
+    # Lengths at the two right-angle indices must match
+    lengths_right = np.where(right, abc, np.nan)
+    equal = np.abs(np.nanmax(lengths_right, axis=1, initial=-np.inf)
+                   - np.nanmin(lengths_right, axis=1, initial=np.inf)) <= length_tol
+    return (right.sum(axis=1) == 2) & (hexa.sum(axis=1) == 1) & equal
+
+
+def _is_face_centered(structure) -> bool:
+    import numpy as np
+    import spglib
+    
+    _, numbers = np.unique(structure.species, return_inverse=True)
+    dataset = spglib.get_symmetry_dataset((structure.lattice, structure.frac_coords, numbers), symprec=0.01)
+    return dataset is not None and dataset.international.startswith("F")
+
+
+def _bulk_kpoints_path(structure_path: str, output_dir: Optional[str]) -> str:
+    """KPOINTS path for a structure: POSCAR -> KPOINTS, POSCAR_x / x.vasp -> KPOINTS_x."""
+    directory, name = os.path.split(structure_path)
+    if name in ("POSCAR", "CONTCAR"):
+        kpoints_name = "KPOINTS"
+    elif name.startswith("POSCAR_"):
+        kpoints_name = "KPOINTS_" + name[len("POSCAR_"):]
+    else:
+        kpoints_name = "KPOINTS_" + os.path.splitext(name)[0]
+    return os.path.join(output_dir or directory, kpoints_name)
+
+
+def gen_kpoints_bulk(
+    structure_paths: Annotated[
+        list[str],
+        "Structure files, glob patterns (e.g. 'screening/*/POSCAR', 'candidates/POSCAR_*') or directories (every POSCAR below them)."
+    ],
+    precision: Annotated[
+        Precision,
+        "Precision level for all structures."
+    ],
+    force_gamma: Annotated[
+        bool,
+        "If True, force Gamma-centered k-meshes."
+    ] = True,
+    detect_dimensionality: Annotated[
+        bool,
+        "Detect 0D/1D/2D structures with the fast detector (cached). False treats all structures as 3D."
+    ] = True,
+    output_dir: Annotated[
+        Optional[str],
+        "Directory for all KPOINTS files. None writes each next to its structure file."
+    ] = None,
+    summary_path: Annotated[
+        Optional[str],
+        "If given, write a CSV table (structure, kpoints, dim, mesh, style) to this path."
+    ] = None
+) -> str:
+    """
+    Generate KPOINTS files for thousands of structures in one vectorized pass.
+    
+    All lattices are stacked into one array and every k-mesh is computed at once
+    from the lattice lengths and the KPOINT_DENSITY table (same scheme as
+    gen_kpoints, including the converged k-point density recorded by a
+    convergence scan for high/ultrahigh precision); then all files are written
+    in a single I/O pass. POSCAR gives
+    KPOINTS, POSCAR_<name> or <name>.vasp gives KPOINTS_<name>.
+    
+    Args:
+        structure_paths: Structure files, glob patterns or directories. Directories
+            are expanded to all POSCAR files below them via the workspace index.
+        precision: K-point density level for all structures.
+        force_gamma: Whether to use Gamma-centered k-meshes.
+        detect_dimensionality: Reduce k-points along vacuum directions of low-dimensional structures.
+        output_dir: Optional common output directory.
+        summary_path: Optional CSV summary file.
+    
+    Returns:
+        str: Counts and distribution of the generated k-meshes.
+    
+    Example:
+        gen_kpoints_bulk(["screening/*/POSCAR"], "medium", summary_path="screening/kpoints.csv")
+    """
+    import glob
+    import numpy as np
+    from collections import Counter
+    from tools.dimensionality import detect_dimensionality as detect, lookup_dimensionality, store_dimensionality
+    from tools.poscar_io import load_structure
+    from tools.workspace import find_files
+    
+    paths = []
+    for pattern in structure_paths:
+        if glob.has_magic(pattern):
+            paths.extend(sorted(glob.glob(pattern, recursive=True)))
+        elif os.path.isdir(pattern):
+            paths.extend(find_files(pattern, kinds=("POSCAR",)))
+        else:
+            paths.append(pattern)
+    paths = list(dict.fromkeys(paths))
+    if not paths:
+        return "No structure files found."
+    
+    structures, failed = [], []
+    for path in paths:
+        try:
+            structures.append((path, load_structure(path)))
+        except Exception as e:
+            failed.append(f"  [❌] {path}: {e}")
+    if not structures:
+        return "No readable structure files:\n" + "\n".join(failed)
+    
+    n = len(structures)
+    dims = np.full(n, 3)
+    axes = np.full(n, -1)
+    if detect_dimensionality and precision != 'only-gamma':
+        for k, (_, structure) in enumerate(structures):
+            result = lookup_dimensionality(structure, method="fast")
+            if result is None:
+                dim, axis = detect(structure)
+                store_dimensionality(structure, dim, axis, method="fast")
+            else:
+                dim, axis = result["dimensionality"], result["axis"]
+            dims[k], axes[k] = dim, -1 if axis is None else axis
+    
+    converged = None
+    if precision in ('high', 'ultrahigh'):
+        converged = np.array([_converged_density(structure) or np.nan for _, structure in structures])
+    
+    lattices = np.stack([structure.lattice for _, structure in structures])
+    meshes, densities = kpoint_meshes(lattices, precision, dims, axes, converged)
+    
+    # Gamma-centered if forced, any odd division, hexagonal or face-centered (as pymatgen)
+    gamma = np.full(n, force_gamma) | np.any(meshes % 2 == 1, axis=1) | _is_hexagonal(lattices)
+    for k in np.flatnonzero(~gamma):
+        gamma[k] = _is_face_centered(structures[k][1])
+    
+    # One I/O pass over all files
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    rows = []
+    for (path, _), mesh, density, is_gamma, dim in zip(structures, meshes, densities, gamma, dims):
+        kpoints_path = _bulk_kpoints_path(path, output_dir)
+        style = "Gamma" if is_gamma else "Monkhorst"
+        with open(kpoints_path, "w", encoding="utf-8") as f:
+            f.write(f"k-point density of {density.tolist()}/[a, b, c]\n0\n{style}\n"
+                    f"{mesh[0]} {mesh[1]} {mesh[2]}\n")
+        rows.append((path, kpoints_path, int(dim), "x".join(map(str, mesh)), style))
+    
+    if summary_path:
+        import csv
+        with open(summary_path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["structure", "kpoints", "dim", "mesh", "style"])
+            writer.writerows(rows)
+    
+    mesh_counts = Counter(row[3] for row in rows).most_common(10)
+    dim_counts = Counter(row[2] for row in rows)
+    return (f"KPOINTS bulk generation: {len(rows)} written, {len(failed)} failed\n"
+            f"  Precision: {precision}, force_gamma: {force_gamma}\n"
+            f"  Dimensionality: " + ", ".join(f"{d}D: {c}" for d, c in sorted(dim_counts.items())) + "\n"
+            f"  Most common k-meshes: " + ", ".join(f"{m} ({c})" for m, c in mesh_counts)
+            + (f"\n  Summary: {summary_path}" if summary_path else "")
+            + ("\n" + "\n".join(failed) if failed else ""))
+
+
 SYSTEM_PROMPT = """
 You are an expert VASP workflow automation assistant. Your job is to generate the correct KPOINTS file for **every task** in the provided "VASP Task Checklist" table.
 
@@ -137,14 +560,15 @@ You are an expert VASP workflow automation assistant. Your job is to generate th
 ```
 
 # You must proceed as follows:
-1. List all KPOINTS file names needed in the target directory, record them in kpoints_note.md with precision level and dimensionality info. Mark as incomplete.
-2. Select an uncompleted KPOINTS in order, call `gen_kpoints` tool to generate it. The tool will auto-detect dimensionality (0D/1D/2D/3D) and adjust k-mesh accordingly.
-3. After successful generation, update the note with k-mesh info and mark as completed.
-4. If there are still tasks incomplete, return to step 2; otherwise, end the task.
+1. Collect every task that needs a KPOINTS file: its task directory (or KPOINTS file name in the target directory), precision level and force_gamma.
+2. Call `gen_kpoints_batch` ONCE with all of them and note_path set to kpoints_note.md in the target directory. The tool auto-detects dimensionality (0D/1D/2D/3D), adjusts each k-mesh and writes the note.
+3. Only if some entries failed, fix them (e.g. with `gen_kpoints` for a single file) and update the note; otherwise, end the task.
 
 # Rules
 - precision level: only-gamma / low / medium / high / ultrahigh (from task's [precision])
 - force_gamma=True recommended for hexagonal systems and HSE06 calculations
+- If a k-point convergence scan was recorded for the material, high/ultrahigh meshes automatically use at least the converged density
+- For high-throughput screening of many structures with one precision level, use `gen_kpoints_bulk`
 - Any task with Precision Level = null → Skip
 
 # Note format (kpoints_note.md)
@@ -160,8 +584,9 @@ def create_kpoints_agent(workbench: Workbench) -> AssistantAgent:
     """
     Create KPOINTS agent instance.
     
-    The agent is equipped with the `gen_kpoints` tool to generate KPOINTS files
-    with automatic dimensionality detection and uses MCP workbench for file operations.
+    The agent is equipped with the `gen_kpoints_batch` and `gen_kpoints` tools to
+    generate KPOINTS files with automatic dimensionality detection and uses MCP
+    workbench for file operations.
     
     Args:
         workbench: MCP workbench for file system operations.
@@ -169,8 +594,10 @@ def create_kpoints_agent(workbench: Workbench) -> AssistantAgent:
     Returns:
         AssistantAgent: Configured KPOINTS agent for VASP KPOINTS generation.
     """
-    kpoints_tool = FunctionTool(gen_kpoints, description=gen_kpoints.__doc__)
-    tools_workbench = StaticWorkbench([kpoints_tool])
+    kpoints_tool = pooled_tool(gen_kpoints)
+    kpoints_batch_tool = pooled_tool(gen_kpoints_batch)
+    kpoints_bulk_tool = pooled_tool(gen_kpoints_bulk)
+    tools_workbench = StaticWorkbench([kpoints_batch_tool, kpoints_tool, kpoints_bulk_tool])
 
     return AssistantAgent(
         name="KPOINTS_AGENT",
@@ -183,7 +610,14 @@ def create_kpoints_agent(workbench: Workbench) -> AssistantAgent:
     )
 
 
-__all__ = ["create_kpoints_agent", "gen_kpoints"]
+__all__ = [
+    "create_kpoints_agent",
+    "gen_kpoints",
+    "gen_kpoints_batch",
+    "gen_kpoints_bulk",
+    "kpoint_meshes",
+    "KpointsTask",
+]
 
 if __name__ == '__main__':
     import asyncio
@@ -1,9 +1,10 @@
-from typing import Annotated
+from typing import Annotated, Literal, Optional
 from dotenv import load_dotenv
 from autogen_agentchat.agents import AssistantAgent
-from autogen_core.tools import FunctionTool, Workbench, StaticWorkbench
+from autogen_core.tools import Workbench, StaticWorkbench
 from autogen_ext.tools.mcp import McpWorkbench
 
+from tools.worker_pool import pooled_tool
 from vaspgo.model_client import create_model_client
 
 load_dotenv()
@@ -18,11 +19,18 @@ def gen_potcar(
     potcar_path: Annotated[
         str,
         "Path where the generated POTCAR file will be saved. Parent directory must exist."
-    ]
+    ],
+    link_mode: Annotated[
+        Literal["hardlink", "symlink", "copy"],
+        "How the POTCAR is placed: hardlink into the shared POTCAR store (copied if on another "
+        "file system), a symlink into the store, or a plain copy."
+    ] = "hardlink"
 ) -> str:
     """
     This tool reads the atomic species from a POSCAR file and automatically generates
-    the corresponding POTCAR file using pymatgen's default pseudopotential settings.
+    the corresponding POTCAR file using pymatgen's default pseudopotential settings
+    (one POTCAR entry per species block, in POSCAR order). Identical POTCARs are
+    stored once and linked into task directories.
 
     Note: Requires properly configured PMG_VASP_PSP_DIR environment variable pointing
     to the VASP pseudopotential directory.
@@ -30,6 +38,7 @@ def gen_potcar(
     Args:
         poscar_path: Path to the input POSCAR file containing the crystal structure.
         potcar_path: Path where the output POTCAR file will be written.
+        link_mode: Placement of the POTCAR (hardlink, symlink or copy).
     
     Returns:
         str: Success message with the output file path.
@@ -38,15 +47,14 @@ def gen_potcar(
         gen_potcar("./POSCAR", "./POTCAR")
         # Generates POTCAR based on elements found in POSCAR
     """
-    from pymatgen.core import Structure
-    from pymatgen.io.vasp.inputs import Potcar
+    from tools.poscar_io import load_structure
+    from tools.potcar_data import link_potcar, potcar_symbols
 
-    structure = Structure.from_file(poscar_path)
-    symbols = [s.specie.symbol for s in structure]
-    potcar = Potcar(symbols=symbols)
-    potcar.write_file(potcar_path)
+    symbols = potcar_symbols(load_structure(poscar_path))
+    placement = link_potcar(symbols, potcar_path, link_mode=link_mode)
     
-    return f"POTCAR generated successfully at {potcar_path} for elements: {', '.join(dict.fromkeys(symbols))}"
+    return (f"POTCAR generated successfully at {potcar_path} ({placement}) "
+            f"for elements: {', '.join(symbols)}")
 
 
 def gen_potcar_batch(
@@ -57,13 +65,25 @@ def gen_potcar_batch(
     recursive: Annotated[
         bool,
         "Whether to search subdirectories recursively."
-    ] = True
+    ] = True,
+    max_workers: Annotated[
+        Optional[int],
+        "Number of threads used to read structures and write POTCARs. None uses a default."
+    ] = None,
+    link_mode: Annotated[
+        Literal["hardlink", "symlink", "copy"],
+        "How POTCARs are placed: hardlinks into the shared POTCAR store (copied if on another "
+        "file system), symlinks into the store, or plain copies."
+    ] = "hardlink"
 ) -> str:
     """
     Generate POTCAR files for all crystal structure files in a directory.
     
     This tool scans a directory for structure files (POSCAR, *.cif, *.vasp, CONTCAR)
-    and generates a corresponding POTCAR file in the same directory as each structure file.
+    in one pass over the tree (unchanged directories are served from the workspace
+    index) and generates a corresponding POTCAR file in the same directory as each structure file.
+    Single-element POTCAR data is read once and reused for every file; each
+    distinct POTCAR is stored once and linked into the directories in parallel.
     
     Note: Requires properly configured PMG_VASP_PSP_DIR environment variable pointing
     to the VASP pseudopotential directory.
@@ -71,6 +91,8 @@ def gen_potcar_batch(
     Args:
         directory: Path to the directory to scan for structure files.
         recursive: If True, search subdirectories recursively. Default is True.
+        max_workers: Threads for reading structures and writing files.
+        link_mode: Placement of the POTCARs (hardlink, symlink or copy).
     
     Returns:
         str: Summary of generated POTCAR files.
@@ -79,52 +101,62 @@ def gen_potcar_batch(
         gen_potcar_batch("./calculations", recursive=True)
         # Generates POTCAR for all POSCAR/CIF files in ./calculations and subdirectories
     """
-    import os
-    import glob
+    from concurrent.futures import ThreadPoolExecutor
     from pathlib import Path
-    from pymatgen.core import Structure
-    from pymatgen.io.vasp.inputs import Potcar
-    
-    # Patterns to match structure files
-    patterns = ["POSCAR", "CONTCAR", "*.cif", "*.vasp"]
-    
-    found_files = []
-    for pattern in patterns:
-        if recursive:
-            search_pattern = os.path.join(directory, "**", pattern)
-            found_files.extend(glob.glob(search_pattern, recursive=True))
-        else:
-            search_pattern = os.path.join(directory, pattern)
-            found_files.extend(glob.glob(search_pattern))
+    from tools.poscar_io import load_structure
+    from collections import Counter
+    from tools.potcar_data import link_potcar, potcar_symbols
+    from tools.workspace import STRUCTURE_KINDS, find_files
     
-    # Remove duplicates and sort
-    found_files = sorted(set(found_files))
+    # Structure files (POSCAR, CONTCAR, *.cif, *.vasp) from a single-pass, incrementally indexed scan
+    try:
+        found_files = find_files(directory, kinds=STRUCTURE_KINDS, recursive=recursive)
+    except NotADirectoryError as e:
+        return str(e)
     
     if not found_files:
         return f"No structure files found in {directory}"
     
+    def read_symbols(structure_file: str):
+        try:
+            return potcar_symbols(load_structure(structure_file))
+        except Exception as e:
+            return e
+    
+    def place_potcar(potcar_path: Path, symbols: tuple):
+        try:
+            return link_potcar(list(symbols), str(potcar_path), link_mode=link_mode)
+        except Exception as e:
+            return e
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        symbols_list = list(executor.map(read_symbols, found_files))
+        
+        # One POTCAR per directory; as before, the last structure file (sorted) decides
+        targets = {}
+        for structure_file, symbols in zip(found_files, symbols_list):
+            if not isinstance(symbols, Exception):
+                targets[Path(structure_file).parent / "POTCAR"] = tuple(symbols)
+        placements = dict(zip(targets, executor.map(place_potcar, targets, targets.values())))
+    
     results = []
     success_count = 0
     error_count = 0
     
-    for structure_file in found_files:
-        structure_path = Path(structure_file)
-        potcar_path = structure_path.parent / "POTCAR"
-        
-        try:
-            structure = Structure.from_file(str(structure_path))
-            symbols = [s.specie.symbol for s in structure]
-            unique_symbols = list(dict.fromkeys(symbols))
-            potcar = Potcar(symbols=symbols)
-            potcar.write_file(str(potcar_path))
-            results.append(f"  [✅] {structure_file} → {potcar_path} (elements: {', '.join(unique_symbols)})")
+    for structure_file, symbols in zip(found_files, symbols_list):
+        potcar_path = Path(structure_file).parent / "POTCAR"
+        error = symbols if isinstance(symbols, Exception) else placements.get(potcar_path)
+        if not isinstance(error, Exception):
+            results.append(f"  [✅] {structure_file} → {potcar_path} (elements: {', '.join(symbols)})")
             success_count += 1
-        except Exception as e:
-            results.append(f"  [❌] {structure_file} → Error: {str(e)}")
+        else:
+            results.append(f"  [❌] {structure_file} → Error: {str(error)}")
             error_count += 1
     
     summary = f"POTCAR batch generation completed:\n"
-    summary += f"  Total: {len(found_files)}, Success: {success_count}, Failed: {error_count}\n\n"
+    summary += f"  Total: {len(found_files)}, Success: {success_count}, Failed: {error_count}\n"
+    placement_counts = Counter(p for p in placements.values() if isinstance(p, str))
+    summary += "  Placement: " + (", ".join(f"{m}: {c}" for m, c in placement_counts.items()) or "-") + "\n\n"
     summary += "Details:\n" + "\n".join(results)
     
     return summary
@@ -166,8 +198,8 @@ def create_potcar_agent(workbench: Workbench) -> AssistantAgent:
     Returns:
         AssistantAgent: Configured POTCAR agent for VASP POTCAR generation.
     """
-    potcar_tool = FunctionTool(gen_potcar, description=gen_potcar.__doc__)
-    potcar_batch_tool = FunctionTool(gen_potcar_batch, description=gen_potcar_batch.__doc__)
+    potcar_tool = pooled_tool(gen_potcar)
+    potcar_batch_tool = pooled_tool(gen_potcar_batch)
     tools_workbench = StaticWorkbench([potcar_tool, potcar_batch_tool])
 
     return AssistantAgent(
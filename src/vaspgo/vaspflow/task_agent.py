@@ -1,31 +1,27 @@
-import json
 from typing import Annotated
 from autogen_agentchat.agents import AssistantAgent
 from autogen_core.tools import FunctionTool, Workbench, StaticWorkbench
 
+from tools.catalog import ExampleCatalog
 from vaspgo.model_client import create_model_client
 
 model_client = create_model_client(configs={"temperature": 0.0})
 
-# Path to task examples JSON file
-TASK_EXAMPLES_PATH = "src/vaspgo/data/task_examples.json"
+# Task examples JSON file inside the vaspgo package
+TASK_EXAMPLES_RESOURCE = "data/task_examples.json"
 
-# Load task examples at module level for reuse
-_EXAMPLES_CACHE: dict | None = None
+# Pre-rendered, typo-tolerant lookup; reloaded when the JSON file changes
+_TASK_CATALOG = ExampleCatalog(TASK_EXAMPLES_RESOURCE, lambda key, entry: _format_category_details(key, entry))
 
 
 def _load_task_examples() -> dict:
     """
-    Load task examples from the JSON file with caching.
+    Load task examples from the packaged JSON catalog.
     
     Returns:
         dict: Dictionary containing all task examples organized by category.
     """
-    global _EXAMPLES_CACHE
-    if _EXAMPLES_CACHE is None:
-        with open(TASK_EXAMPLES_PATH, "r", encoding="utf-8") as f:
-            _EXAMPLES_CACHE = json.load(f)
-    return _EXAMPLES_CACHE
+    return _TASK_CATALOG.data
 
 
 def _get_available_keys() -> list[str]:
@@ -41,7 +37,7 @@ def _get_available_keys() -> list[str]:
 def get_task_examples(
     category_key: Annotated[
         str,
-        "The category key to retrieve examples for. Must be one of the available keys."
+        "The category key to retrieve examples for. Case and small typos are tolerated."
     ]
 ) -> str:
     """
@@ -51,21 +47,46 @@ def get_task_examples(
     You can call this tool multiple times with different keys to combine examples
     for novel or complex tasks.
     
+    Keys are matched case-insensitively and tolerate typos; an unknown key
+    returns the closest category (with a note) instead of an error.
+    
     Args:
-        category_key: The exact category key to retrieve examples for.
+        category_key: The category key to retrieve examples for.
     
     Returns:
         str: Formatted string containing the task workflow details.
     """
-    examples_data = _load_task_examples()
+    return _TASK_CATALOG.lookup(category_key)
+
+
+def search_task_examples(
+    query: Annotated[
+        str,
+        "Free-text description of the user's goal, e.g. 'HSE band structure with SOC'."
+    ],
+    k: Annotated[
+        int,
+        "Maximum number of workflow examples to return."
+    ] = 3
+) -> str:
+    """
+    Find the workflow examples best matching a free-text request.
     
-    if category_key not in examples_data:
-        available = _get_available_keys()
-        return f"Error: Key '{category_key}' not found.\n\nAvailable keys:\n" + \
-               "\n".join(f"  - {key}" for key in available)
+    Ranks all task example categories locally (BM25 over category names, task
+    names and requirements) and returns the best `k` workflows in one call, so
+    no category key is needed.
     
-    tasks = examples_data[category_key]
-    return _format_category_details(category_key, tasks)
+    Args:
+        query: Free-text description of the user's goal.
+        k: Maximum number of examples.
+    
+    Returns:
+        str: The matching workflow examples, best first.
+    
+    Example:
+        search_task_examples("optical absorption spectrum after relaxation")
+    """
+    return _TASK_CATALOG.search(query, k=k)
 
 
 def _format_category_details(category_name: str, tasks: list) -> str:
@@ -107,7 +128,7 @@ SYSTEM_PROMPT = """
 You are a world-class VASP expert and computational materials science workflow engineer. Your job is to take any user request involving VASP calculations (structure relaxation, DOS, band structure, HSE06, phonon, optical properties, surface energy, defect formation energy, etc.) and automatically break it down into a complete, logically ordered task list that can be directly executed in sequence.
 
 # Available Example Categories
-Use `get_task_examples` tool with these keys to retrieve workflow examples:
+Use `search_task_examples` with a free-text description of the request to get the best matching workflows in one call, or `get_task_examples` with one of these keys:
 {available_keys}
 
 # Strictly follow the procedure below to execute the task:
@@ -118,7 +139,7 @@ Use `get_task_examples` tool with these keys to retrieve workflow examples:
 3. Create a subdirectory for the next computational task and output the path to this directory.
 
 # Task Analysis Guidelines
-1. Analyze the user's intention and use `get_task_examples` tool to retrieve the most relevant examples based on the task. If no single example matches, query multiple examples and combine them.
+1. Analyze the user's intention and use `search_task_examples` (or `get_task_examples`) to retrieve the most relevant examples based on the task. If no single example matches, combine the returned examples.
 2. Simple task splitting
 3. Consider the rationality of each subtask and make modifications accordingly
    - What is the minimal complete set of calculations needed?
@@ -183,7 +204,8 @@ def create_task_agent(workbench: Workbench) -> AssistantAgent:
     
     # Create tool workbench
     task_examples_tool = FunctionTool(get_task_examples, description=get_task_examples.__doc__)
-    tools_workbench = StaticWorkbench([task_examples_tool])
+    task_search_tool = FunctionTool(search_task_examples, description=search_task_examples.__doc__)
+    tools_workbench = StaticWorkbench([task_examples_tool, task_search_tool])
     
     return AssistantAgent(
         name="TASK_AGENT",
@@ -196,7 +218,7 @@ def create_task_agent(workbench: Workbench) -> AssistantAgent:
     )
 
 
-__all__ = ["create_task_agent", "get_task_examples"]
+__all__ = ["create_task_agent", "get_task_examples", "search_task_examples"]
 
 if __name__ == '__main__':
     import asyncio
@@ -0,0 +1,80 @@
+"""
+Shared fixtures: a persistent ChromaDB memory with a local hashing embedding,
+so RAG tests run without downloading an embedding model.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import hashlib
+import itertools
+
+import numpy as np
+import pytest
+
+
+class HashEmbedding:
+    """Bag-of-words hashing embedding that counts the texts it embeds."""
+
+    calls = 0
+    texts = 0
+
+    def __init__(self) -> None:
+        pass
+
+    def __call__(self, input):
+        HashEmbedding.calls += 1
+        HashEmbedding.texts += len(input)
+        vectors = []
+        for text in input:
+            vector = np.zeros(64, dtype=np.float32)
+            for word in text.lower().split():
+                vector[int(hashlib.md5(word.encode("utf-8")).hexdigest(), 16) % 64] += 1.0
+            vectors.append(vector / (np.linalg.norm(vector) or 1.0))
+        return vectors
+
+    @staticmethod
+    def name() -> str:
+        return "test-hash"
+
+    def get_config(self) -> dict:
+        return {}
+
+    @staticmethod
+    def build_from_config(config) -> "HashEmbedding":
+        return HashEmbedding()
+
+    def is_legacy(self) -> bool:
+        return False
+
+    def default_space(self) -> str:
+        return "cosine"
+
+    def supported_spaces(self) -> list:
+        return ["cosine", "l2", "ip"]
+
+
+_COLLECTIONS = itertools.count()
+
+
+@pytest.fixture
+def chroma_memory(tmp_path):
+    """Factory of ChromaDBVectorMemory instances sharing one persistence directory."""
+    chromadb_memory = pytest.importorskip("autogen_ext.memory.chromadb")
+    HashEmbedding.calls = HashEmbedding.texts = 0
+    name = f"test_{next(_COLLECTIONS)}"
+
+    def make():
+        return chromadb_memory.ChromaDBVectorMemory(
+            config=chromadb_memory.PersistentChromaDBVectorMemoryConfig(
+                collection_name=name,
+                persistence_path=str(tmp_path / "chroma"),
+                embedding_function_config=chromadb_memory.CustomEmbeddingFunctionConfig(
+                    function=HashEmbedding, params={}
+                ),
+                k=3,
+                score_threshold=0.0,
+            )
+        )
+
+    return make
@@ -0,0 +1,50 @@
+"""
+Tests for recorded converged settings.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import numpy as np
+import pytest
+
+pytest.importorskip("autogen_core")
+pytest.importorskip("spglib")
+
+from tools import convergence
+from tools.cache import save_json
+from tools.convergence import converged_value, get_converged_settings
+from tools.poscar_io import ArrayStructure
+
+FCC_CU = ArrayStructure(np.diag([3.6] * 3), ["Cu"] * 4,
+                        [[0, 0, 0], [0.5, 0.5, 0], [0.5, 0, 0.5], [0, 0.5, 0.5]])
+
+
+@pytest.fixture
+def settings_path(tmp_path, monkeypatch):
+    monkeypatch.setenv("VASPGO_CACHE_DIR", str(tmp_path / "cache"))
+    return convergence._settings_path()
+
+
+def no_spacegroup(*args, **kwargs):
+    raise AssertionError("space group computed without a recorded formula")
+
+
+def test_space_group_only_for_recorded_formulas(settings_path, tmp_path, monkeypatch):
+    monkeypatch.setattr(convergence, "structure_key", no_spacegroup)
+    assert converged_value(FCC_CU, "encut") is None
+
+    save_json(settings_path, {"Al|SG=225": {"encut": {"value": 400, "tolerance": 1e-3}}})
+    assert converged_value(FCC_CU, "encut") is None
+    FCC_CU.write(str(tmp_path / "POSCAR"))
+    assert get_converged_settings(str(tmp_path / "POSCAR")) == "No converged settings recorded for Cu."
+
+
+def test_recorded_value_is_shared_by_supercells(settings_path, tmp_path):
+    save_json(settings_path, {"Cu|SG=225": {"encut": {"value": 520, "tolerance": 1e-3}}})
+    assert converged_value(FCC_CU, "encut") == 520
+    assert converged_value(FCC_CU.make_supercell([2, 2, 2]), "encut") == 520
+    assert converged_value(FCC_CU, "kpoints") is None
+
+    FCC_CU.write(str(tmp_path / "POSCAR"))
+    assert "ENCUT = 520 eV" in get_converged_settings(str(tmp_path / "POSCAR"))
@@ -0,0 +1,83 @@
+"""
+Tests for the cell-list dimensionality detector and its on-disk cache.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pymatgen")
+pytest.importorskip("scipy")
+
+from tools.dimensionality import detect_dimensionality, lookup_dimensionality, store_dimensionality
+from tools.poscar_io import ArrayStructure
+
+
+def rocksalt_mgo():
+    frac = [[0, 0, 0], [0.5, 0.5, 0], [0.5, 0, 0.5], [0, 0.5, 0.5],
+            [0.5, 0, 0], [0, 0.5, 0], [0, 0, 0.5], [0.5, 0.5, 0.5]]
+    return ArrayStructure(np.eye(3) * 4.21, ["Mg"] * 4 + ["O"] * 4, frac)
+
+
+def graphene(vacuum_axis=2):
+    a = 2.46
+    lattice = np.array([[a, 0, 0], [-a / 2, a * np.sqrt(3) / 2, 0], [0, 0, 20.0]])
+    frac = np.array([[0, 0, 0.5], [1 / 3, 2 / 3, 0.5]])
+    # Cyclically permute the axes so the vacuum lies along `vacuum_axis`
+    order = np.roll([0, 1, 2], vacuum_axis - 2)
+    return ArrayStructure(lattice[order][:, order], ["C", "C"], frac[:, order])
+
+
+def test_bulk_is_3d():
+    assert detect_dimensionality(rocksalt_mgo()) == (3, None)
+
+
+@pytest.mark.parametrize("vacuum_axis", [0, 1, 2])
+def test_slab_is_2d_with_vacuum_axis(vacuum_axis):
+    assert detect_dimensionality(graphene(vacuum_axis)) == (2, vacuum_axis)
+
+
+def test_chain_is_1d_along_its_axis():
+    chain = ArrayStructure(np.diag([15.0, 1.5, 15.0]), ["C"], [[0.5, 0.0, 0.5]])
+    assert detect_dimensionality(chain) == (1, 1)
+
+
+def test_molecule_is_0d():
+    molecule = ArrayStructure(np.eye(3) * 10.0, ["H", "H"], [[0.5, 0.5, 0.5], [0.574, 0.5, 0.5]])
+    assert detect_dimensionality(molecule) == (0, None)
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("VASPGO_CACHE_DIR", str(tmp_path))
+    return tmp_path
+
+
+def test_cache_reuses_relaxed_structure(cache_dir):
+    structure = graphene()
+    store_dimensionality(structure, 2, 2, "fast")
+
+    relaxed = structure.copy()
+    relaxed.lattice = relaxed.lattice * 1.01
+    relaxed.frac_coords = relaxed.frac_coords + 0.002
+    assert lookup_dimensionality(relaxed) == {"dimensionality": 2, "axis": 2, "method": "fast"}
+
+    distorted = structure.copy()
+    distorted.lattice = distorted.lattice * 1.2
+    assert lookup_dimensionality(distorted) is None
+
+
+def test_cache_respects_method_rank(cache_dir):
+    structure = rocksalt_mgo()
+    store_dimensionality(structure, 3, None, "fast")
+    assert lookup_dimensionality(structure, method="larsen") is None
+
+    store_dimensionality(structure, 3, None, "larsen")
+    # The stricter result answers both requests, and the fast record is kept
+    assert lookup_dimensionality(structure, method="larsen")["method"] == "larsen"
+    assert lookup_dimensionality(structure, method="fast")["method"] == "larsen"
+
+    store_dimensionality(structure, 2, 0, "fast")
+    assert lookup_dimensionality(structure, method="larsen")["dimensionality"] == 3
@@ -0,0 +1,90 @@
+"""
+Tests for the on-disk RAG document cache, mirror import and offline indexing.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import asyncio
+
+import pytest
+
+from vaspgo.rag.document_cache import DocumentCache, offline_default
+
+URL = "https://www.vasp.at/wiki/ISTART"
+
+
+def test_put_and_get(tmp_path):
+    cache = DocumentCache(tmp_path)
+    assert cache.get(URL) is None
+
+    cache.put(URL, b"<html>ISTART</html>", content_type="text/html",
+              validators={"etag": '"abc"', "last_modified": "Mon, 01 Jan 2024 00:00:00 GMT"})
+    entry = cache.get(URL)
+    assert entry["raw"] == b"<html>ISTART</html>"
+    assert entry["markdown"] is None
+    assert entry["etag"] == '"abc"'
+    assert entry["content_type"] == "text/html"
+
+    cache.put_markdown(URL, "# ISTART")
+    assert cache.get(URL)["markdown"] == "# ISTART"
+    # New raw content invalidates the converted Markdown
+    cache.put(URL, b"<html>changed</html>")
+    assert cache.get(URL)["markdown"] is None
+
+    cache.put_markdown("https://example.org/not-cached", "text")
+    assert list(cache.urls()) == [URL]
+
+
+def test_default_root_is_in_the_vaspgo_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("VASPGO_CACHE_DIR", str(tmp_path))
+    assert DocumentCache().root == tmp_path / "rag_documents"
+
+
+def test_offline_default(monkeypatch):
+    monkeypatch.setenv("VASPGO_RAG_OFFLINE", "1")
+    assert offline_default()
+    monkeypatch.setenv("VASPGO_RAG_OFFLINE", "no")
+    assert not offline_default()
+
+
+def test_import_mirror_wget_layout(tmp_path):
+    mirror = tmp_path / "mirror"
+    (mirror / "www.vasp.at" / "wiki").mkdir(parents=True)
+    (mirror / "www.vasp.at" / "wiki" / "ISTART.html").write_text("<html>ISTART</html>")
+    (mirror / "www.vasp.at" / "wiki" / "manual.pdf").write_bytes(b"%PDF-1.4")
+    (mirror / "www.vasp.at" / ".listing").write_text("ignored")
+
+    cache = DocumentCache(tmp_path / "cache")
+    assert cache.import_mirror(mirror) == 2
+    assert sorted(cache.urls()) == [URL, "https://www.vasp.at/wiki/manual.pdf"]
+    entry = cache.get(URL)
+    assert entry["content_type"] == "text/html"
+    assert entry["last_modified"].endswith("GMT")
+    assert cache.get("https://www.vasp.at/wiki/manual.pdf")["content_type"] == "application/pdf"
+
+
+def test_import_mirror_with_base_url(tmp_path):
+    (tmp_path / "wiki").mkdir()
+    (tmp_path / "wiki" / "ISTART.htm").write_text("<html>ISTART</html>")
+    cache = DocumentCache(tmp_path / "cache")
+    assert cache.import_mirror(tmp_path / "wiki", base_url="https://www.vasp.at/wiki/") == 1
+    assert cache.get(URL)["raw"] == b"<html>ISTART</html>"
+
+    with pytest.raises(NotADirectoryError):
+        cache.import_mirror(tmp_path / "missing")
+
+
+def test_offline_indexing_reads_the_cache(tmp_path, chroma_memory):
+    pytest.importorskip("chromadb")
+    from vaspgo.rag.rag_indexer import DocumentIndexer
+
+    cache = DocumentCache(tmp_path / "cache")
+    cache.put(URL, b"<html>ISTART</html>", content_type="text/html",
+              validators={"etag": '"v1"', "last_modified": ""},
+              markdown="# ISTART\n\nISTART determines whether or not to read the WAVECAR file.\n")
+    indexer = DocumentIndexer(chroma_memory(), cache=cache, offline=True)
+
+    assert asyncio.run(indexer.index_documents([URL, "https://www.vasp.at/wiki/ICHARG"])) == 1
+    # Same cached version: nothing to re-index
+    assert asyncio.run(indexer.index_documents([URL])) == 0
@@ -0,0 +1,145 @@
+"""
+Tests for structure fingerprints and the persistent StructureIndex.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pymatgen")
+pytest.importorskip("spglib")
+
+from tools import fingerprint
+from tools.fingerprint import StructureIndex, slab_fingerprint, structure_hash, structure_key
+from tools.poscar_io import ArrayStructure
+
+
+def chain(substituted, n=5, a=2.6):
+    """Simple cubic Cu n x 1 x 1 supercell with Au on the given sites along a."""
+    species = ["Au" if i in substituted else "Cu" for i in range(n)]
+    frac = [[i / n, 0.0, 0.0] for i in range(n)]
+    return ArrayStructure(np.diag([n * a, a, a]), species, frac)
+
+
+def written(structure, path):
+    """Write `structure` to `path`; indexed records must point at real files."""
+    structure.write(str(path))
+    return structure, str(path)
+
+
+def test_structure_hash_is_exact():
+    s = chain({0, 1})
+    assert structure_hash(s) == structure_hash(s.copy())
+    assert structure_hash(s) != structure_hash(chain({0, 2}))
+
+
+def test_structure_key_groups_composition_and_spacegroup():
+    assert structure_key(chain({0, 1})) == structure_key(chain({0, 2}))
+    assert structure_key(chain({0, 1})).startswith("Au2Cu3|N=5|")
+
+
+def test_slab_fingerprint_ignores_flipping():
+    lattice = np.diag([3.0, 3.0, 20.0])
+    slab = ArrayStructure(lattice, ["Mg", "O", "Mg"], [[0, 0, 0.1], [0, 0, 0.2], [0, 0, 0.3]])
+    flipped = ArrayStructure(lattice, ["Mg", "O", "Mg"], [[0, 0, 0.6], [0, 0, 0.5], [0, 0, 0.4]])
+    other = ArrayStructure(lattice, ["Mg", "Mg", "O"], [[0, 0, 0.1], [0, 0, 0.2], [0, 0, 0.3]])
+    assert slab_fingerprint(slab) == slab_fingerprint(flipped)
+    assert slab_fingerprint(slab) != slab_fingerprint(other)
+
+
+def test_translated_copy_is_a_duplicate(tmp_path):
+    index = StructureIndex(str(tmp_path / "index"))
+    assert index.register(*written(chain({0, 1}), tmp_path / "a")) is None
+
+    match = index.register(*written(chain({2, 3}), tmp_path / "b"))
+    assert match is not None
+    assert match["path"] == str((tmp_path / "a").resolve())
+    assert sorted(match) == ["added_at", "path", "status"]
+    assert index.lookup(chain({3, 4}))["path"] == match["path"]
+
+
+def test_different_substitution_pattern_is_not_a_duplicate(tmp_path):
+    index = StructureIndex(str(tmp_path / "index"))
+    index.register(*written(chain({0, 1}), tmp_path / "a"))
+    assert index.register(*written(chain({0, 2}), tmp_path / "b")) is None
+
+
+def test_descriptor_only_selects_candidates(tmp_path):
+    # With a tolerance that lets every descriptor through, StructureMatcher
+    # must still reject the inequivalent substitution pattern.
+    index = StructureIndex(str(tmp_path / "index"), tolerance=1e6)
+    index.register(*written(chain({0, 1}), tmp_path / "a"))
+    assert index.lookup(chain({0, 2})) is None
+    assert index.lookup(chain({1, 2})) is not None
+
+
+def test_register_many_dedups_within_batch_and_upgrades_status(tmp_path):
+    index = StructureIndex(str(tmp_path / "index"))
+    results = index.register_many([
+        written(chain({0, 1}), tmp_path / "a"),
+        written(chain({0, 2}), tmp_path / "b"),
+        written(chain({1, 2}), tmp_path / "c"),
+    ])
+    assert results[0] is None and results[1] is None
+    assert results[2]["path"] == str((tmp_path / "a").resolve())
+
+    # Re-registering the same file is not a duplicate
+    assert index.register(*written(chain({0, 1}), tmp_path / "a")) is None
+
+    # A computed equivalent upgrades the generated record
+    assert index.register(*written(chain({2, 3}), tmp_path / "run"), status="computed") is None
+    record = index.lookup(chain({0, 1}))
+    assert record["status"] == "computed"
+    assert record["path"] == str((tmp_path / "run").resolve())
+
+
+def test_deleted_or_rewritten_files_are_not_matches(tmp_path):
+    index = StructureIndex(str(tmp_path / "index"))
+    index.register(*written(chain({0, 1}), tmp_path / "a"))
+    index.register(*written(chain({0, 2}), tmp_path / "b"))
+
+    os.remove(tmp_path / "a")
+    assert index.lookup(chain({0, 1})) is None
+    # b now holds another structure: its record no longer describes it
+    chain({0, 1, 2}).write(str(tmp_path / "b"))
+    assert index.lookup(chain({0, 2})) is None
+
+    # Stale records are pruned when the shard is written
+    assert index.register(*written(chain({1, 2}), tmp_path / "c")) is None
+    shard, = (tmp_path / "index").glob("*.json")
+    assert [r["path"] for r in fingerprint.load_json(shard)] == [str((tmp_path / "c").resolve())]
+
+
+def test_large_structures_match_by_hash_only(tmp_path, monkeypatch):
+    monkeypatch.setattr(fingerprint, "MATCHER_MAX_ATOMS", 4)
+    index = StructureIndex(str(tmp_path / "index"))
+    index.register(*written(chain({0, 1}), tmp_path / "a"))
+    assert index.lookup(chain({0, 1}))["path"] == str((tmp_path / "a").resolve())
+    # Equivalent but not identical: StructureMatcher is not run above the limit
+    assert index.lookup(chain({1, 2})) is None
+
+
+def test_structures_above_max_atoms_are_not_indexed(tmp_path):
+    index = StructureIndex(str(tmp_path / "index"), max_atoms=4)
+    assert index.register(*written(chain({0, 1}), tmp_path / "a")) is None
+    assert index.register(*written(chain({0, 1}), tmp_path / "b")) is None
+    assert not list((tmp_path / "index").glob("*.json"))
+
+
+def test_supercell_is_kept_when_its_indexed_duplicate_was_deleted(tmp_path, monkeypatch):
+    pytest.importorskip("autogen_core")
+    from tools.structure_tools import make_supercell
+
+    monkeypatch.setenv("VASPGO_CACHE_DIR", str(tmp_path / "cache"))
+    chain({0}, n=2).write(str(tmp_path / "POSCAR"))
+    make_supercell(str(tmp_path / "POSCAR"), str(tmp_path / "A"), "2,1,1")
+    result = make_supercell(str(tmp_path / "POSCAR"), str(tmp_path / "B"), "2,1,1", skip_duplicates=True)
+    assert "Duplicates of indexed structures: 1" in result
+    assert not (tmp_path / "B").exists()
+
+    os.remove(tmp_path / "A")
+    result = make_supercell(str(tmp_path / "POSCAR"), str(tmp_path / "B"), "2,1,1", skip_duplicates=True)
+    assert "Duplicates" not in result
+    assert (tmp_path / "B").exists()
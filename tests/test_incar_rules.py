@@ -0,0 +1,152 @@
+"""
+Tests for the rule-based INCAR engine.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pytest
+
+from tools.incar_rules import (
+    build_incar,
+    format_incar,
+    generate_incars,
+    match_category,
+    parse_checklist,
+    set_incar_tag,
+)
+
+EXAMPLES = {
+    "Structure Relaxation": {"IBRION": 2, "ISIF": 3, "NSW": 200, "ISMEAR": 0},
+    "self-consistant field (SCF)": {"IBRION": -1, "NSW": 0, "ISMEAR": 0},
+    "PBE band": {"ICHARG": 11, "NSW": 0, "ISMEAR": 0, "LORBIT": 11},
+    "Density of states (DOS)": {"ICHARG": 11, "NSW": 0, "ISMEAR": -5},
+    "HSE06 calculation": {"LHFCALC": ".TRUE.", "HFSCREEN": 0.2, "NSW": 0},
+    "DFT+U": {"LDAU": ".TRUE.", "LDAUL": "2 -1", "NSW": 0},
+    "Density functional perturbation theory (DFPT)": {"IBRION": 8, "NSW": 1, "EDIFF": "1.0E-6"},
+}
+
+CHECKLIST = """# VASP Task Checklist
+1. Structure Relaxation [medium]
+   deps: []
+   reqs: Default recommended settings
+2. SCF Calculation [high]
+   deps: [Task 1: CONTCAR]
+   reqs: ISPIN=2, spin polarized
+3. Band Structure Calculation [high]
+   deps: [Task 2: CHGCAR], [Task 2: WAVECAR]
+   reqs: LORBIT=10
+4. Post-processing [null]
+   deps: [Task 3: OUTCAR]
+   reqs: Plot the bands with a colour map
+"""
+
+
+def test_parse_checklist():
+    tasks = parse_checklist(CHECKLIST)
+    assert [t.index for t in tasks] == [1, 2, 3, 4]
+    assert tasks[1].precision == "high"
+    assert tasks[1].deps[0].task == 1 and tasks[1].deps[0].files == ["CONTCAR"]
+    assert sorted(f for dep in tasks[2].deps for f in dep.files) == ["CHGCAR", "WAVECAR"]
+    assert tasks[2].reqs == "LORBIT=10"
+
+
+@pytest.mark.parametrize("name, category", [
+    ("Structure Relaxation", "Structure Relaxation"),
+    ("SCF for band structure", "self-consistant field (SCF)"),
+    ("HSE06 calculation", "HSE06 calculation"),
+    ("HSE06 band structure", "PBE band"),
+    ("Structure relaxation with HSE06", "Structure Relaxation"),
+    ("Density of States", "Density of states (DOS)"),
+    ("Bader charge analysis", None),
+])
+def test_match_category(name, category):
+    task = parse_checklist(f"1. {name} [medium]\n   deps: []\n   reqs: \n")[0]
+    assert match_category(task) == category
+
+
+def test_build_incar_dependencies_and_overrides():
+    tasks = parse_checklist(CHECKLIST)
+
+    relax = build_incar(tasks[0], tasks, EXAMPLES)["incar"]
+    assert relax["ENCUT"] == 400 and relax["EDIFFG"] == -0.05
+    assert relax["ISTART"] == 0 and relax["ICHARG"] == 2
+
+    scf = build_incar(tasks[1], tasks, EXAMPLES)["incar"]
+    assert scf["PREC"] == "Accurate" and scf["ISPIN"] == 2
+    assert scf["LWAVE"] == ".TRUE." and scf["LCHARG"] == ".TRUE."
+    assert "EDIFFG" not in scf
+
+    band = build_incar(tasks[2], tasks, EXAMPLES)["incar"]
+    assert band["ICHARG"] == 11 and band["ISTART"] == 1
+    assert band["LORBIT"] == 10
+
+
+def test_functional_is_layered_over_the_property_category():
+    relax = parse_checklist("1. Structure relaxation with HSE06 [medium]\n   deps: []\n   reqs: \n")
+    result = build_incar(relax[0], relax, EXAMPLES)
+    assert result["category"] == "Structure Relaxation + HSE06 calculation"
+    incar = result["incar"]
+    assert incar["LHFCALC"] == ".TRUE." and incar["HFSCREEN"] == 0.2
+    assert incar["IBRION"] == 2 and incar["NSW"] == 200 and incar["EDIFFG"] == -0.05
+
+    # Hybrid non-self-consistent bands are not a tag layer: left to the LLM
+    band = parse_checklist("1. HSE06 band structure [medium]\n   deps: []\n   reqs: \n")
+    result = build_incar(band[0], band, EXAMPLES)
+    assert result["incar"] is None
+    assert result["reason"] == "HSE06 calculation combined with PBE band has no rule"
+
+
+def test_dfpt_keeps_the_tighter_ediff():
+    medium = parse_checklist("1. Phonons with DFPT [medium]\n   deps: []\n   reqs: \n")
+    assert build_incar(medium[0], medium, EXAMPLES)["incar"]["EDIFF"] == "1.0E-6"
+    # Only the linear-response methods: other templates follow the precision table
+    scf = parse_checklist("1. SCF Calculation [low]\n   deps: []\n   reqs: \n")
+    examples = dict(EXAMPLES)
+    examples["self-consistant field (SCF)"] = {"NSW": 0, "EDIFF": "1E-6"}
+    assert build_incar(scf[0], scf, examples)["incar"]["EDIFF"] == "1E-3"
+
+
+def test_build_incar_leaves_unknown_tasks_to_the_llm():
+    tasks = parse_checklist(CHECKLIST)
+    assert build_incar(tasks[3], tasks, EXAMPLES)["reason"].startswith("non-computational")
+
+    odd = parse_checklist("1. SCF Calculation [medium]\n   deps: []\n   reqs: use a custom tetrahedron scheme\n")
+    result = build_incar(odd[0], odd, EXAMPLES)
+    assert result["incar"] is None
+    assert "tetrahedron" in result["reason"]
+
+    conflict = parse_checklist("1. SCF Calculation [medium]\n   deps: []\n   reqs: NSW!=0\n")
+    assert "conflicts" in build_incar(conflict[0], conflict, EXAMPLES)["reason"]
+
+
+def test_dft_u_uses_species_order(tmp_path, monkeypatch):
+    monkeypatch.setenv("VASPGO_CACHE_DIR", str(tmp_path / "cache"))
+    poscar = tmp_path / "POSCAR"
+    poscar.write_text(
+        "FeO\n1.0\n4.3 0 0\n0 4.3 0\n0 0 4.3\nO Fe\n1 1\nDirect\n0 0 0\n0.5 0.5 0.5\n"
+    )
+    task = parse_checklist("1. SCF Calculation [medium]\n   deps: []\n   reqs: DFT+U, U(Fe)=4.0\n")[0]
+
+    assert build_incar(task, [task], EXAMPLES)["incar"] is None
+    incar = build_incar(task, [task], EXAMPLES, str(poscar))["incar"]
+    assert incar["LDAUL"] == [-1, 2]
+    assert incar["LDAUU"] == [0.0, 4.0]
+    assert incar["LMAXMIX"] == 4
+
+
+def test_generate_incars_writes_files_and_note(tmp_path):
+    result = generate_incars(CHECKLIST, EXAMPLES, output_dir=str(tmp_path))
+    assert len(result["generated"]) == 3
+    assert len(result["skipped"]) == 1
+    text = (tmp_path / "INCAR_3").read_text()
+    assert text.startswith("SYSTEM = Band Structure Calculation\n")
+    assert "ICHARG = 11" in text
+    assert "[✅]" in (tmp_path / "incar_note.md").read_text()
+
+
+def test_format_and_set_incar_tag():
+    text = format_incar({"ENCUT": 520, "SIGMA": 0.05, "MAGMOM": [5.0, 0.6]}, "test")
+    assert text == "SYSTEM = test\nENCUT = 520\nSIGMA = 0.05\nMAGMOM = 5 0.6\n"
+    assert set_incar_tag("ENCUT = 400\nkpar=2\n", "KPAR", 4) == "ENCUT = 400\nKPAR = 4\n"
+    assert set_incar_tag("ENCUT = 400", "NCORE", 8) == "ENCUT = 400\nNCORE = 8\n"
@@ -0,0 +1,241 @@
+"""
+Tests for the rule-based VASP input validator and the validating submit tool.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pytest
+
+import tools.pbs_tools as pbs_tools
+from tools.input_validator import (
+    check_inputs,
+    read_incar,
+    submit_vasp_job,
+    validate_job_script,
+    validate_vasp_inputs,
+)
+
+POSCAR = "FeO\n1.0\n4.3 0 0\n0 4.3 0\n0 0 4.3\nFe O\n1 1\nDirect\n0 0 0\n0.5 0.5 0.5\n"
+POTCAR_ENTRIES = {
+    "Fe": "  PAW_PBE Fe 06Sep2000\n   TITEL  = PAW_PBE Fe 06Sep2000\n"
+          "   POMASS =   55.847; ZVAL   =    8.000    mass and valenz\n"
+          "   ENMAX  =  267.882; ENMIN  =  200.911 eV\n End of Dataset\n",
+    "O": "  PAW_PBE O 08Apr2002\n   TITEL  = PAW_PBE O 08Apr2002\n"
+         "   POMASS =   16.000; ZVAL   =    6.000    mass and valenz\n"
+         "   ENMAX  =  400.000; ENMIN  =  300.000 eV\n End of Dataset\n",
+}
+KPOINTS = "Automatic\n0\nGamma\n4 4 4\n"
+
+
+def write_task(directory, incar, potcar_order=("Fe", "O"), kpoints=KPOINTS):
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / "INCAR").write_text(incar)
+    (directory / "POSCAR").write_text(POSCAR)
+    (directory / "POTCAR").write_text("".join(POTCAR_ENTRIES[el] for el in potcar_order))
+    if kpoints is not None:
+        (directory / "KPOINTS").write_text(kpoints)
+    return directory
+
+
+def messages(issues, level="error"):
+    return [issue["message"] for issue in issues if issue["level"] == level]
+
+
+def test_read_incar_handles_comments_and_semicolons(tmp_path):
+    path = tmp_path / "INCAR"
+    path.write_text("encut = 520 # cutoff\nISPIN = 2; MAGMOM = 2*5.0 ! spin\n")
+    assert read_incar(str(path)) == {"ENCUT": "520", "ISPIN": "2", "MAGMOM": "2*5.0"}
+
+
+def test_consistent_inputs_have_no_errors(tmp_path):
+    task = write_task(tmp_path / "scf", "ENCUT = 520\nISPIN = 2\nMAGMOM = 5 0.6\nISMEAR = 0\n")
+    assert messages(check_inputs(str(task))) == []
+
+
+def test_inconsistent_inputs_are_reported(tmp_path):
+    task = write_task(
+        tmp_path / "scf",
+        "ENCUT = 300\nISPIN = 2\nMAGMOM = 3*5.0\nLHFCALC = .TRUE.\nICHARG = 11\nNBANDS = 4\n",
+        potcar_order=("O", "Fe"),
+        kpoints=None,
+    )
+    errors = " | ".join(messages(check_inputs(str(task))))
+    assert "POTCAR order O Fe does not match POSCAR species Fe O" in errors
+    assert "MAGMOM has 3 values, expected 2" in errors
+    assert "ICHARG >= 10" in errors
+    assert "below the largest ENMAX" in errors
+    assert "NBANDS = 4 is too small" in errors
+    assert "KPOINTS is missing" in errors
+
+
+def test_dft_u_checks(tmp_path):
+    task = write_task(tmp_path / "u", "ENCUT = 520\nLDAU = .TRUE.\nLDAUL = 2 -1 -1\nLDAUU = 5.3 0\n")
+    issues = check_inputs(str(task))
+    assert "LDAUL has 3 values for 2 species." in messages(issues)
+    assert "LDAU = .TRUE. but LDAUJ is missing." in messages(issues)
+    assert any("LMAXMIX = 4" in m for m in messages(issues, "warning"))
+
+
+def test_tetrahedron_needs_enough_kpoints(tmp_path):
+    task = write_task(tmp_path / "dos", "ENCUT = 520\nISMEAR = -5\n", kpoints="Automatic\n0\nGamma\n1 1 1\n")
+    assert any("tetrahedron" in m for m in messages(check_inputs(str(task))))
+
+
+def test_validate_job_script_follows_shell_scripts(tmp_path):
+    write_task(tmp_path / "1_relax", "ENCUT = 520\n")
+    write_task(tmp_path / "2_scf", "ENCUT = 520\n")
+    (tmp_path / "run_vasp_workflow.sh").write_text(
+        "for d in 1_relax 2_scf; do\n  (cd $d && mpirun vasp_std)\ndone\n")
+    script = tmp_path / "submit.pbs"
+    script.write_text("#PBS -N test\ncd $PBS_O_WORKDIR\nbash run_vasp_workflow.sh\n")
+
+    results = validate_job_script(str(script))
+    assert sorted(os.path.basename(d) for d in results) == ["1_relax", "2_scf"]
+
+
+WORKFLOW = """#!/bin/bash
+# Software
+VASPKIT_EXEC=vaspkit
+MPIRUN_EXEC=mpirun
+VASP_STD_EXEC=vasp_std
+NPROC=32
+
+echo "=== Starting Step 1: Structure Relaxation ==="
+cd 1_relax || exit 1
+cp ../POSCAR POSCAR
+cat > KPOINTS << EOF
+Automatic
+0
+Gamma
+4 4 4
+EOF
+echo -e "103" | $VASPKIT_EXEC
+$MPIRUN_EXEC -np $NPROC $VASP_STD_EXEC
+wait
+cd ..
+
+echo "=== Starting Step 2: SCF ==="
+cd 2_scf
+cp ../1_relax/CONTCAR POSCAR
+cp ../1_relax/KPOINTS .
+$VASPKIT_EXEC -task 103
+$MPIRUN_EXEC -np $NPROC $VASP_STD_EXEC
+wait
+
+echo "=== Starting Step 3: Band Structure ==="
+cd ../3_band
+cp ../2_scf/CONTCAR POSCAR
+ln -sf ../2_scf/CHGCAR .
+(echo 303; echo 0) | $VASPKIT_EXEC
+cp KPATH.in KPOINTS
+echo 103 | $VASPKIT_EXEC > vaspkit.log
+$MPIRUN_EXEC -np $NPROC $VASP_STD_EXEC
+"""
+
+
+def write_workflow(root, scf_incar="ENCUT = 520\nISPIN = 2\nMAGMOM = 2*5.0\n"):
+    """Layout written by SUM_AGENT: only INCARs, the workflow script creates the rest."""
+    (root / "POSCAR").write_text(POSCAR)
+    for name, incar in (("1_relax", "ENCUT = 520\nIBRION = 2\nNSW = 100\n"),
+                        ("2_scf", scf_incar),
+                        ("3_band", "ENCUT = 520\nICHARG = 11\n")):
+        (root / name).mkdir()
+        (root / name / "INCAR").write_text(incar)
+    (root / "run_vasp_workflow.sh").write_text(WORKFLOW)
+    script = root / "submit.pbs"
+    script.write_text("#!/bin/bash\n#PBS -N wf\ncd $PBS_O_WORKDIR\nbash run_vasp_workflow.sh\n")
+    return script
+
+
+def test_workflow_layout_files_created_by_the_script(tmp_path):
+    results = validate_job_script(str(write_workflow(tmp_path)))
+    assert sorted(os.path.basename(d) for d in results) == ["1_relax", "2_scf", "3_band"]
+
+    relax = results[str(tmp_path / "1_relax")]
+    assert messages(relax) == []
+    assert sorted(issue["file"] for issue in relax) == ["KPOINTS", "POSCAR", "POTCAR"]
+    # 3_band: KPOINTS is copied from KPATH.in and CHGCAR is linked in by the script
+    band = results[str(tmp_path / "3_band")]
+    assert messages(band) == []
+    assert not any(issue["file"] == "CHGCAR" for issue in band)
+
+
+def test_missing_file_not_created_by_the_script_is_an_error(tmp_path):
+    script = write_workflow(tmp_path)
+    workflow = (tmp_path / "run_vasp_workflow.sh").read_text()
+    (tmp_path / "run_vasp_workflow.sh").write_text(workflow.replace("$VASPKIT_EXEC -task 103\n", ""))
+    assert messages(validate_job_script(str(script))[str(tmp_path / "2_scf")]) == ["POTCAR is missing."]
+
+
+def test_validate_job_script_follows_cd(tmp_path):
+    write_task(tmp_path / "1_relax", "ENCUT = 520\n")
+    write_task(tmp_path / "2_scf", "ENCUT = 520\nMAGMOM = 3*5.0\n")
+    script = tmp_path / "submit.pbs"
+    script.write_text("cd $PBS_O_WORKDIR/1_relax\nmpirun vasp_std\ncd ../2_scf\nmpirun vasp_std\n")
+    results = validate_job_script(str(script))
+    assert sorted(os.path.basename(d) for d in results) == ["1_relax", "2_scf"]
+    assert any("MAGMOM" in m for m in messages(results[str(tmp_path / "2_scf")]))
+
+
+def test_validate_job_script_reads_array_job_points(tmp_path):
+    write_task(tmp_path / "encut_400", "ENCUT = 400\n")
+    write_task(tmp_path / "encut_450", "ENCUT = 450\n")
+    script = tmp_path / "scan_array.pbs"
+    script.write_text('#PBS -J 0-1\ncd "$PBS_O_WORKDIR" || exit 1\nPOINTS=("encut_400" "encut_450")\n'
+                      'cd "${POINTS[$PBS_ARRAY_INDEX]}" || exit 1\nmpirun vasp_std\n')
+    assert sorted(os.path.basename(d) for d in validate_job_script(str(script))) == ["encut_400", "encut_450"]
+
+
+@pytest.fixture
+def fake_qsub(monkeypatch):
+    calls = []
+
+    def run(command, cwd=None):
+        calls.append((command, cwd))
+        return "4242.pbs-server\n", 0
+
+    monkeypatch.setattr(pbs_tools, "_run_pbs_command", run)
+    return calls
+
+
+def test_submit_vasp_job_refuses_invalid_inputs(tmp_path, fake_qsub):
+    write_task(tmp_path / "scf", "ENCUT = 520\nMAGMOM = 3*5.0\nISPIN = 2\n")
+    script = tmp_path / "submit.pbs"
+    script.write_text("#PBS -N test\ncd scf\nmpirun vasp_std\n")
+
+    result = submit_vasp_job(str(script))
+    assert result.startswith("Error: Input validation failed")
+    assert "MAGMOM" in result
+    assert fake_qsub == []
+
+
+def test_submit_vasp_job_submits_from_script_directory(tmp_path, fake_qsub):
+    write_task(tmp_path / "scf", "ENCUT = 520\nMAGMOM = 5 0.6\n")
+    script = tmp_path / "submit.pbs"
+    script.write_text("#PBS -N test\ncd scf\nmpirun vasp_std\n")
+
+    result = submit_vasp_job(str(script), queue="workq")
+    assert result.startswith("Job submitted: 4242.pbs-server")
+    assert "ISPIN != 2" in result
+    assert fake_qsub == [(["qsub", "-q", "workq", "submit.pbs"], str(tmp_path))]
+
+
+def test_submit_vasp_job_accepts_the_workflow_layout(tmp_path, fake_qsub):
+    result = submit_vasp_job(str(write_workflow(tmp_path)))
+    assert result.startswith("Job submitted: 4242.pbs-server"), result
+    assert "POSCAR is not present yet" in result
+
+
+def test_submit_vasp_job_rejects_workflow_incar_errors(tmp_path, fake_qsub):
+    script = write_workflow(tmp_path, scf_incar="ENCUT = 520\nLDAU = .TRUE.\n")
+    result = submit_vasp_job(str(script))
+    assert result.startswith("Error: Input validation failed in 1 of 3")
+    assert "LDAUL is missing" in result
+    assert fake_qsub == []
+
+
+def test_validate_vasp_inputs_accepts_a_workflow_script(tmp_path):
+    write_workflow(tmp_path)
+    report = validate_vasp_inputs(str(tmp_path / "run_vasp_workflow.sh"))
+    assert report.startswith("Checked 3 task directories, 0 with errors.")
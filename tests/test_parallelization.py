@@ -0,0 +1,121 @@
+"""
+Tests for OUTCAR timing parsing and the KPAR/NCORE tuner's timing records.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import json
+
+import pytest
+
+from tools import parallelization
+from tools.parallelization import (
+    fft_friendly,
+    measured_best,
+    parse_outcar_timing,
+    rank_settings,
+    record_loop_timings,
+    workload_key,
+)
+
+
+def outcar_text(ranks=64, kpar=4, ncore=4, loops=(12.5, 11.5, 12.0)):
+    lines = [
+        " running on   {} total cores".format(ranks),
+        " distrk:  each k-point on   {} cores,    {} groups".format(ranks // kpar, kpar),
+        " distr:  one band on NCORE=   {} cores,    {} groups".format(ncore, ranks // kpar // ncore),
+        "   POTCAR:    PAW_PBE Mg_pv 13Apr2007",
+        "   TITEL  = PAW_PBE Mg_pv 13Apr2007",
+        "   TITEL  = PAW_PBE O 08Apr2002",
+        "   ions per type =               4   4",
+        "   k-points           NKPTS =     10   k-points in BZ     NKDIM =     10   number of bands    NBANDS=     64",
+        "   ENCUT  =  520.0 eV  38.22 Ry    6.18 a.u.",
+    ]
+    lines += ["      LOOP:  cpu time   {0:.4f}: real time   {0:.4f}".format(t) for t in loops]
+    lines.append("     LOOP+:  cpu time   60.0000: real time   61.0000")
+    return "\n".join(lines) + "\n"
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("VASPGO_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(parallelization, "_TIMINGS_CACHE", None)
+    return tmp_path / "cache"
+
+
+def test_fft_friendly():
+    assert fft_friendly(1) == 2
+    assert fft_friendly(22) == 24
+    assert fft_friendly(97) == 98
+    assert fft_friendly(121) == 126
+
+
+def test_rank_settings_respects_constraints():
+    settings = rank_settings(n_kpoints=3, nbands=40, grid=[48, 48, 48], n_plane_waves=5000,
+                             nodes=1, cores_per_node=16)
+    assert settings
+    for s in settings:
+        assert 16 % s["ranks"] == 0
+        assert s["kpar"] <= 3 and s["ranks"] % (s["kpar"] * s["ncore"]) == 0
+        assert s["nbands"] >= 40 and s["nbands"] % s["band_groups"] == 0
+    no_ncore = rank_settings(3, 40, [48, 48, 48], 5000, 1, 16, allow_ncore=False)
+    assert {s["ncore"] for s in no_ncore} == {1}
+
+
+def test_parse_outcar_timing(tmp_path):
+    path = tmp_path / "OUTCAR"
+    path.write_text(outcar_text())
+    timing = parse_outcar_timing(str(path))
+    assert timing == {
+        "key": workload_key({"Mg": 4, "O": 4}, 10, 520.0),
+        "ranks": 64,
+        "kpar": 4,
+        "ncore": 4,
+        "nbands": 64,
+        "seconds": pytest.approx(12.0),
+        "steps": 3,
+    }
+    assert timing["key"] == "Mg4O4|k10|e520"
+
+
+def test_parse_outcar_timing_needs_loops(tmp_path):
+    path = tmp_path / "OUTCAR"
+    path.write_text(outcar_text(loops=()))
+    assert parse_outcar_timing(str(path)) is None
+
+
+def test_record_loop_timings_keeps_one_record_per_outcar(tmp_path, cache_dir):
+    for name, kpar, loops in (("a", 4, (12.0,)), ("b", 2, (9.0, 10.0))):
+        run = tmp_path / "runs" / name
+        run.mkdir(parents=True)
+        (run / "OUTCAR").write_text(outcar_text(kpar=kpar, loops=loops))
+
+    message = record_loop_timings(str(tmp_path / "runs"))
+    assert message.startswith("Recorded 2 timings for 1 workloads")
+    record_loop_timings(str(tmp_path / "runs"))
+
+    best = measured_best("Mg4O4|k10|e520", 64)
+    assert best["kpar"] == 2 and best["seconds"] == pytest.approx(9.5)
+    assert measured_best("Mg4O4|k10|e520", 32) is None
+    timings = json.loads((cache_dir / "parallelization" / "timings.json").read_text())
+    assert len(timings["Mg4O4|k10|e520"]) == 2
+
+
+def test_timings_reload_when_file_changes(tmp_path, cache_dir):
+    assert measured_best("Mg4O4|k10|e520", 64) is None
+
+    run = tmp_path / "run"
+    run.mkdir()
+    (run / "OUTCAR").write_text(outcar_text())
+    record_loop_timings(str(run))
+    assert measured_best("Mg4O4|k10|e520", 64)["kpar"] == 4
+
+    # Another process rewrites the records
+    path = cache_dir / "parallelization" / "timings.json"
+    timings = json.loads(path.read_text())
+    timings["Mg4O4|k10|e520"][0]["kpar"] = 8
+    path.write_text(json.dumps(timings))
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert measured_best("Mg4O4|k10|e520", 64)["kpar"] == 8
@@ -0,0 +1,113 @@
+"""
+Tests for the array-backed POSCAR reader/writer.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import numpy as np
+import pytest
+
+from tools.poscar_io import ArrayStructure, is_poscar_file, load_structure
+
+
+POSCAR_SELECTIVE = """Mg O slab
+1.0
+  4.2 0.0 0.0
+  0.0 4.2 0.0
+  0.0 0.0 12.0
+Mg O
+2 2
+Selective dynamics
+Direct
+  0.0 0.0 0.0 F F F
+  0.5 0.5 0.0 F F F
+  0.5 0.0 0.0 T T T
+  0.0 0.5 0.0 T T F
+"""
+
+POSCAR_VASP4_CARTESIAN = """Na Cl
+-179.406144
+  1.0 0.0 0.0
+  0.0 1.0 0.0
+  0.0 0.0 1.0
+1 1
+Cartesian
+  0.0 0.0 0.0
+  0.5 0.5 0.5
+"""
+
+
+def test_is_poscar_file():
+    assert is_poscar_file("/a/b/POSCAR")
+    assert is_poscar_file("CONTCAR_relaxed")
+    assert is_poscar_file("slab.vasp")
+    assert not is_poscar_file("structure.cif")
+
+
+def test_round_trip_keeps_species_coords_and_flags():
+    structure = ArrayStructure.from_str(POSCAR_SELECTIVE)
+    assert structure.composition == {"Mg": 2, "O": 2}
+    assert structure.selective_dynamics.tolist()[3] == [True, True, False]
+
+    again = ArrayStructure.from_str(structure.to_str())
+    np.testing.assert_allclose(again.lattice, structure.lattice)
+    np.testing.assert_allclose(again.frac_coords, structure.frac_coords)
+    assert again.species.tolist() == structure.species.tolist()
+    assert again.selective_dynamics.tolist() == structure.selective_dynamics.tolist()
+
+
+def test_vasp4_negative_scale_and_cartesian():
+    structure = ArrayStructure.from_str(POSCAR_VASP4_CARTESIAN)
+    assert structure.species.tolist() == ["Na", "Cl"]
+    assert structure.volume == pytest.approx(179.406144)
+    np.testing.assert_allclose(structure.frac_coords[1], [0.5, 0.5, 0.5], atol=1e-3)
+
+
+def test_write_and_load_structure(tmp_path):
+    structure = ArrayStructure.from_str(POSCAR_SELECTIVE)
+    path = tmp_path / "POSCAR"
+    structure.write(str(path))
+    loaded = load_structure(str(path))
+    np.testing.assert_allclose(loaded.cart_coords, structure.cart_coords)
+
+
+@pytest.mark.parametrize("scaling", [[2, 2, 1], [[1, 1, 0], [-1, 1, 0], [0, 0, 2]]])
+def test_supercell_matches_pymatgen(scaling):
+    pytest.importorskip("pymatgen")
+    structure = ArrayStructure.from_str(POSCAR_SELECTIVE)
+    supercell = structure.make_supercell(scaling)
+    reference = structure.to_pymatgen()
+    reference.make_supercell(scaling)
+
+    assert len(supercell) == len(reference)
+    np.testing.assert_allclose(supercell.lattice, reference.lattice.matrix, atol=1e-8)
+    assert supercell.species.tolist() == [sp.symbol for sp in reference.species]
+    np.testing.assert_allclose(
+        np.mod(supercell.frac_coords - reference.frac_coords + 0.5, 1.0) - 0.5, 0.0, atol=1e-8
+    )
+    assert supercell.selective_dynamics.shape == (len(reference), 3)
+
+
+def test_singular_supercell_is_rejected():
+    structure = ArrayStructure.from_str(POSCAR_SELECTIVE)
+    with pytest.raises(ValueError):
+        structure.make_supercell([[1, 0, 0], [1, 0, 0], [0, 0, 1]])
+
+
+def test_from_pymatgen_treats_missing_flags_as_free():
+    pytest.importorskip("pymatgen")
+    structure = ArrayStructure.from_str(POSCAR_SELECTIVE).to_pymatgen()
+    structure.append("H", [0.25, 0.25, 0.3])  # appended site gets selective_dynamics=None
+    converted = ArrayStructure.from_pymatgen(structure)
+    assert converted.selective_dynamics.tolist()[-1] == [True, True, True]
+    assert converted.selective_dynamics.tolist()[0] == [False, False, False]
+
+
+def test_from_pymatgen_rejects_disordered_structure():
+    pymatgen_core = pytest.importorskip("pymatgen.core")
+    disordered = pymatgen_core.Structure(
+        np.eye(3) * 4.0, [{"Fe": 0.5, "Ni": 0.5}], [[0.0, 0.0, 0.0]]
+    )
+    with pytest.raises(ValueError, match="Disordered"):
+        ArrayStructure.from_pymatgen(disordered)
@@ -0,0 +1,65 @@
+"""
+Tests for POTCAR assembly, the POTCAR store and the POTCAR metadata table.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pytest
+
+pytest.importorskip("pymatgen")
+
+from tools import potcar_data
+from tools.potcar_data import link_potcar, stored_potcar
+
+
+@pytest.fixture
+def library(tmp_path, monkeypatch):
+    """A flat POT_GGA_PAW_PBE library with Fe and O, and an empty store."""
+    from pymatgen.core import SETTINGS
+
+    root = tmp_path / "psp" / "POT_GGA_PAW_PBE"
+    root.mkdir(parents=True)
+    (root / "POTCAR.Fe").write_text("PAW_PBE Fe 06Sep2000\nFe data\n")
+    (root / "POTCAR.O").write_text("PAW_PBE O 08Apr2002\nO data\n")
+    monkeypatch.setitem(SETTINGS, "PMG_VASP_PSP_DIR", str(tmp_path / "psp"))
+    monkeypatch.setenv("VASPGO_POTCAR_STORE", str(tmp_path / "store"))
+    potcar_data.potcar_index.cache_clear()
+    yield root
+    potcar_data.potcar_index.cache_clear()
+
+
+def test_store_file_is_shared(library, tmp_path):
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    link_potcar(["Fe", "O"], str(tmp_path / "a" / "POTCAR"), "PBE")
+    link_potcar(["Fe", "O"], str(tmp_path / "b" / "POTCAR"), "PBE")
+    assert os.path.samefile(tmp_path / "a" / "POTCAR", tmp_path / "b" / "POTCAR")
+    assert (tmp_path / "a" / "POTCAR").read_text() == (
+        "PAW_PBE Fe 06Sep2000\nFe data\nPAW_PBE O 08Apr2002\nO data\n"
+    )
+
+
+def test_updated_library_gets_a_new_store_file(library):
+    old = stored_potcar(["Fe", "O"], "PBE")
+    assert stored_potcar(["Fe", "O"], "PBE") == old
+
+    (library / "POTCAR.Fe").write_text("PAW_PBE Fe_new 02Aug2007\nnew Fe data\n")
+    new = stored_potcar(["Fe", "O"], "PBE")
+    assert new != old
+    assert new.read_text().startswith("PAW_PBE Fe_new 02Aug2007\nnew Fe data\n")
+    assert old.read_text().startswith("PAW_PBE Fe 06Sep2000\n")
+
+
+def test_metadata_table_is_rebuilt_when_a_potcar_changes(library, tmp_path, monkeypatch):
+    from tools import potcar_metadata
+
+    monkeypatch.setenv("VASPGO_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(potcar_metadata, "_METADATA_CACHE", {})
+    (library / "POTCAR.Fe").write_text("PAW_PBE Fe 06Sep2000\n ZVAL   =    8.000\n ENMAX  =  267.882\n")
+    assert potcar_metadata.potcar_metadata("PBE")["Fe"]["enmax"] == 267.882
+
+    # Same path, new contents: the cached table must not be reused
+    (library / "POTCAR.Fe").write_text("PAW_PBE Fe_pv 02Aug2007\n ZVAL   =   14.000\n ENMAX  =  293.238\n")
+    monkeypatch.setattr(potcar_metadata, "_METADATA_CACHE", {})
+    assert potcar_metadata.potcar_metadata("PBE")["Fe"]["enmax"] == 293.238
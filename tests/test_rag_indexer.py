@@ -0,0 +1,101 @@
+"""
+Tests for deterministic chunk IDs and incremental re-indexing in DocumentIndexer.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("chromadb")
+
+from vaspgo.rag.rag_indexer import DocumentIndexer
+from vaspgo.rag.source_manifest import get_source_manifest
+
+from tests.conftest import HashEmbedding
+
+SECTIONS = {
+    "ISTART": "ISTART determines whether or not to read the WAVECAR file.",
+    "ICHARG": "ICHARG determines how VASP constructs the initial charge density.",
+    "LWAVE": "LWAVE determines whether the wavefunctions are written to WAVECAR.",
+}
+
+
+def write_doc(path, sections, mtime=None):
+    path.write_text("\n\n".join(f"# {tag}\n\n{text}" for tag, text in sections.items()) + "\n")
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+def make_indexer(memory):
+    return DocumentIndexer(memory, chunk_tokens=20, overlap_tokens=0, use_cache=False)
+
+
+def collection_ids(memory, source):
+    return sorted(memory._collection.get(where={"source": source})["ids"])
+
+
+def test_chunk_ids_are_deterministic():
+    indexer = make_indexer(None)
+    chunks = [{"content": "alpha"}, {"content": "beta", "heading_path": "A > B"}, {"content": "alpha"}]
+    records = indexer._chunk_records("doc.md", chunks, {"source_hash": "h"})
+    ids = [record[0] for record in records]
+
+    assert ids == [record[0] for record in indexer._chunk_records("doc.md", chunks)]
+    assert len(set(ids)) == 3
+    assert ids[2] == ids[0] + "-1"
+    assert records[1][2]["heading_path"] == "A > B"
+    assert records[1][2]["source_hash"] == "h"
+    # The same text in another source gets another ID
+    assert indexer._chunk_records("other.md", chunks[:1])[0][0] != ids[0]
+    # An unchanged chunk keeps its ID when the rest of the document changes
+    edited = [{"content": "gamma"}] + chunks[1:2]
+    assert indexer._chunk_records("doc.md", edited)[1][0] == ids[1]
+
+
+def test_incremental_reindex(tmp_path, chroma_memory):
+    doc = tmp_path / "incar_tags.md"
+    source = str(doc)
+    write_doc(doc, SECTIONS, mtime=1_000_000)
+    memory = chroma_memory()
+    indexer = make_indexer(memory)
+
+    assert asyncio.run(indexer.index_documents([source])) == 3
+    first_ids = collection_ids(memory, source)
+    assert len(first_ids) == 3
+    assert get_source_manifest(memory).get(source)["chunk_count"] == 3
+
+    # Unchanged file: nothing is fetched or embedded
+    HashEmbedding.texts = 0
+    assert asyncio.run(indexer.index_documents([source])) == 0
+    assert HashEmbedding.texts == 0
+
+    # Same content, new mtime: metadata refreshed, nothing embedded
+    write_doc(doc, SECTIONS, mtime=1_000_100)
+    assert asyncio.run(indexer.index_documents([source])) == 0
+    assert HashEmbedding.texts == 0
+    assert collection_ids(memory, source) == first_ids
+
+    # One section changed: only its chunk is embedded, the old one is removed
+    changed = dict(SECTIONS, ICHARG="ICHARG = 11 reads the CHGCAR for a non-self-consistent run.")
+    write_doc(doc, changed, mtime=1_000_200)
+    assert asyncio.run(indexer.index_documents([source])) == 1
+    new_ids = collection_ids(memory, source)
+    assert len(new_ids) == 3
+    assert len(set(new_ids) & set(first_ids)) == 2
+    entry = get_source_manifest(memory).get(source, with_chunk_ids=True)
+    assert sorted(entry["chunk_ids"]) == new_ids
+    assert entry["last_modified"].startswith(str(1_000_200 * 10**9))
+
+    # A new indexer on the same persistent collection also sees the indexed state
+    assert asyncio.run(make_indexer(chroma_memory()).index_documents([source])) == 0
+
+
+def test_missing_source_does_not_stop_indexing(tmp_path, chroma_memory, capsys):
+    doc = tmp_path / "doc.md"
+    write_doc(doc, SECTIONS)
+    indexer = make_indexer(chroma_memory())
+    assert asyncio.run(indexer.index_documents([str(tmp_path / "missing.md"), str(doc)])) == 3
+    assert "Error indexing" in capsys.readouterr().out
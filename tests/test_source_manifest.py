@@ -0,0 +1,107 @@
+"""
+Tests for the RAG source manifest and its migration from pre-manifest collections.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("chromadb")
+
+from vaspgo.rag import source_manifest
+from vaspgo.rag.rag_indexer import DocumentIndexer
+from vaspgo.rag.source_manifest import MANIFEST_SUFFIX, get_source_manifest
+
+from tests.conftest import HashEmbedding
+
+
+def chunk_collection(memory):
+    memory._ensure_initialized()
+    return memory._client, memory._collection
+
+
+def add_legacy_chunks(collection, source, n, source_hash="", last_modified=""):
+    """Chunks as written before the manifest existed."""
+    collection.upsert(
+        ids=[f"{source}-{i}" for i in range(n)],
+        documents=[f"{source} chunk {i}" for i in range(n)],
+        metadatas=[{"source": source, "chunk_index": i, "source_hash": source_hash,
+                    "etag": "", "last_modified": last_modified} for i in range(n)],
+    )
+
+
+def test_update_get_remove(chroma_memory):
+    manifest = get_source_manifest(chroma_memory())
+    assert manifest.get("a.md") is None
+
+    manifest.update("a.md", ["id1", "id2"], source_hash="h", etag='"e"')
+    entry = manifest.get("a.md")
+    assert entry["chunk_count"] == 2 and entry["source_hash"] == "h" and entry["etag"] == '"e"'
+    assert "chunk_ids" not in entry
+    assert manifest.get("a.md", with_chunk_ids=True)["chunk_ids"] == ["id1", "id2"]
+
+    manifest.update("a.md", ["id3"])
+    assert manifest.get("a.md", with_chunk_ids=True)["chunk_ids"] == ["id3"]
+
+    manifest.update("b.md", [])
+    assert sorted(manifest.sources()) == ["a.md", "b.md"]
+    manifest.remove("a.md")
+    assert list(manifest.sources()) == ["b.md"]
+    manifest.clear()
+    assert manifest.sources() == {}
+
+
+def test_manifest_is_a_side_collection(chroma_memory):
+    memory = chroma_memory()
+    client, chunks = chunk_collection(memory)
+    get_source_manifest(memory).update("a.md", ["id1"])
+    assert client.get_collection(f"{chunks.name}{MANIFEST_SUFFIX}").count() == 1
+    assert chunks.count() == 0
+
+
+def test_sources_are_read_in_pages(chroma_memory, monkeypatch):
+    monkeypatch.setattr(source_manifest, "PAGE_SIZE", 2)
+    manifest = get_source_manifest(chroma_memory())
+    for i in range(5):
+        manifest.update(f"doc{i}.md", [f"id{i}"])
+    assert sorted(manifest.sources()) == [f"doc{i}.md" for i in range(5)]
+
+
+def test_migration_from_pre_manifest_collection(chroma_memory, monkeypatch):
+    monkeypatch.setattr(source_manifest, "PAGE_SIZE", 3)
+    memory = chroma_memory()
+    _, chunks = chunk_collection(memory)
+    add_legacy_chunks(chunks, "a.md", 4, source_hash="ha", last_modified="1:10")
+    add_legacy_chunks(chunks, "b.md", 1, source_hash="hb")
+
+    manifest = get_source_manifest(memory)
+    sources = manifest.sources()
+    assert sorted(sources) == ["a.md", "b.md"]
+    assert sources["a.md"]["chunk_count"] == 4
+    assert sources["a.md"]["source_hash"] == "ha" and sources["a.md"]["last_modified"] == "1:10"
+    assert sorted(manifest.get("a.md", with_chunk_ids=True)["chunk_ids"]) == [f"a.md-{i}" for i in range(4)]
+
+    # Built once: later chunks without manifest updates do not trigger a rebuild
+    add_legacy_chunks(chunks, "c.md", 1)
+    assert "c.md" not in get_source_manifest(memory).sources()
+
+
+def test_indexer_uses_migrated_manifest(tmp_path, chroma_memory):
+    doc = tmp_path / "doc.md"
+    doc.write_text("# ISTART\n\nISTART determines whether or not to read the WAVECAR file.\n")
+    memory = chroma_memory()
+    indexer = DocumentIndexer(memory, chunk_tokens=20, overlap_tokens=0, use_cache=False)
+    assert asyncio.run(indexer.index_documents([str(doc)])) == 1
+
+    # Simulate an index built before the manifest: drop the manifest collection
+    client, chunks = chunk_collection(memory)
+    client.delete_collection(f"{chunks.name}{MANIFEST_SUFFIX}")
+
+    HashEmbedding.texts = 0
+    indexer = DocumentIndexer(chroma_memory(), chunk_tokens=20, overlap_tokens=0, use_cache=False)
+    assert asyncio.run(indexer.index_documents([str(doc)])) == 0
+    assert HashEmbedding.texts == 0
+    assert get_source_manifest(memory).get(str(doc))["chunk_count"] == 1